@@ -6,6 +6,8 @@ datas = []
 datas += collect_data_files('transformers')
 datas += collect_data_files('tokenizers')
 datas += collect_data_files('torch')
+# Reference clip for the first-run ASR autotune
+datas += [('assets/reference_command.wav', 'assets')]
 
 # Collect all torch and transformers submodules
 hiddenimports = []
@@ -31,8 +33,33 @@ hiddenimports += [
     'scipy',
     'scipy.io',
     'scipy.io.wavfile',
+    'scipy.signal',
     'The_Audio_Engine',
     'The_Worker_Thread',
+    'audio_stream',
+    'vad',
+    'startup_metrics',
+    'app_config',
+    'asr_backends',
+    'command_parser',
+    'audio_features',
+    'keyword_spotter',
+    'command_templates',
+    'asr_process',
+    'autotune',
+    'clip_corpus',
+    'phrase_matcher',
+    'fuzzy_index',
+    'command_cache',
+    'playback_clock',
+    'media_index',
+    'thumbnail_cache',
+    'seek_preview',
+    'watch_history',
+    'vlc_profiles',
+    'seek_scheduler',
+    'playlist',
+    'multiprocessing.shared_memory',
 ]
 
 a = Analysis(
@@ -16,10 +16,12 @@ Features:
 
 import sys
 import os
+import multiprocessing
 
 # Add src directory to Python path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
 
+import startup_metrics  # Imported first so startup timings start here
 from main_gui import VLCPlayerGUI
 from PyQt6.QtWidgets import QApplication
 
@@ -31,4 +33,5 @@ def main():
     return app.exec()
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()  # The ASR worker process is spawned from the frozen exe
     sys.exit(main())
\ No newline at end of file
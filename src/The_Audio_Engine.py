@@ -1,54 +1,197 @@
-import sounddevice as sd
-import numpy as np
-from transformers import pipeline
+import threading
+import time
+import app_config
+import autotune
+from asr_backends import create_backend, preprocess_audio
+from audio_stream import MicrophoneStream, PRE_ROLL_SECONDS
+from vad import EnergyVAD, NO_SPEECH_TIMEOUT
+
+# No new samples for this long means the microphone stalled (unplugged, PortAudio hung)
+STALL_GRACE_SECONDS = 1.0
+AUTOTUNE_IDLE_POLL_SECONDS = 5.0  # How often a pending first-run autotune checks for idle
 
 class VoiceEngine:
-    def __init__(self):
-        # Using tiny.en for the fastest possible local execution
-        self.asr = pipeline(
-            "automatic-speech-recognition",
-            model="openai/whisper-tiny.en",
-            device="cpu",
-            chunk_length_s=30
-        )
+    def __init__(self, asr_config=None):
+        # The ASR backend is loaded by load_model()/load_async() so that
+        # constructing the engine never blocks the GUI on torch/transformers
+        self.base_asr_config = asr_config or app_config.get_section("asr")
+        # Settings measured fastest on this machine, if the autotuner has run here
+        self.asr_config, self.needs_tuning = autotune.apply_tuned_config(self.base_asr_config)
+        self.backend = None
+        self.grammar = None
+        self.ready = threading.Event()
+        self.load_error = None
         self.sample_rate = 16000
+        # Set by the GUI: True while a background benchmark would not disturb playback
+        self.is_idle = None
+
+        # Always-on microphone so the pre-roll already holds what was said before the press
+        self.mic = MicrophoneStream(sample_rate=self.sample_rate)
+        try:
+            self.mic.start()
+        except Exception as e:
+            print(f"Engine Error: could not open microphone stream: {e}")
+
+    def load_model(self):
+        """Create and load the configured ASR backend (slow - call off the GUI thread)"""
+        try:
+            if self.asr_config.get("worker_process"):
+                from asr_process import ASRProcessClient
+                backend = ASRProcessClient(self.asr_config, self.sample_rate)
+            else:
+                backend = create_backend(self.asr_config)
+            backend.load()
+            if self.grammar is not None:
+                backend.configure_decoding(self.grammar)
+            self.backend = backend
+            print(f"🎤 ASR backend ready: {backend.name} ({backend.model_id})")
+        except Exception as e:
+            self.load_error = e
+            print(f"Engine Error: could not load ASR backend: {e}")
+        finally:
+            self.ready.set()
+        return self.backend is not None
+
+    def set_grammar(self, grammar):
+        """Use a CommandParser's grammar to bias decoding and stop early (set before loading)"""
+        self.grammar = grammar
+
+    def load_async(self, on_ready=None):
+        """Load the model on a background thread; on_ready(success) is called from that thread"""
+        def _load():
+            success = self.load_model()
+            if on_ready:
+                on_ready(success)
+            if success and self.needs_tuning:
+                # First run (or new hardware): benchmark once idle, the winner is used from next start
+                while self.is_idle is not None and not self.is_idle():
+                    time.sleep(AUTOTUNE_IDLE_POLL_SECONDS)
+                print("🔧 Autotuning ASR settings for this machine in the background...")
+                autotune.run_autotune(self.base_asr_config, should_continue=self.is_idle)
+
+        loader = threading.Thread(target=_load, name="WhisperLoader", daemon=True)
+        loader.start()
+        return loader
+
+    @property
+    def is_ready(self):
+        return self.ready.is_set() and self.backend is not None
+
+    def capture(self, max_duration=4, stop_event=None, pre_roll=PRE_ROLL_SECONDS,
+                no_speech_timeout=NO_SPEECH_TIMEOUT, on_partial=None, partial_interval=0.3,
+                noise_floor=None):
+        """Stream audio until the speaker stops, stop_event is set or max_duration elapses.
+
+        Returns a zero-copy view into the ring buffer trimmed to the detected
+        speech (including any that started in the pre-roll), or an empty view
+        when nobody spoke. Consume it before the buffer wraps around.
+
+        While speech is in progress, on_partial(view) is called about every
+        partial_interval seconds with the utterance so far, but only when new
+        voiced audio arrived since the previous call.
 
-    def record_and_transcribe(self, duration=4):
-        """Captures audio and converts to text with improved preprocessing."""
+        noise_floor seeds the VAD when there is no usable pre-roll to calibrate
+        on (after a wake phrase, the pre-roll would be the phrase itself).
+        """
+        if not self.mic.active:
+            self.mic.start()
+
+        ring = self.mic.ring
+        start = self.mic.pre_roll_start(pre_roll)
+        now = ring.total_written
+        deadline = now + int(max_duration * self.sample_rate)
+        give_up = now + int(no_speech_timeout * self.sample_rate)
+        # A stalled device never reaches those sample counts - watch for samples arriving at all
+        last_written, last_arrival = now, time.monotonic()
+        step = self.mic.block_size
+
+        # The pre-roll doubles as the noise sample for the adaptive floor
+        vad = EnergyVAD(self.sample_rate)
+        if noise_floor is not None:
+            vad.reset(noise_floor=noise_floor)
+        else:
+            vad.calibrate(ring.view(start, now))
+        processed = start
+        partial_step = int(partial_interval * self.sample_rate)
+        next_partial = None
+        last_decoded_frame = None
+
+        while True:
+            end = min(ring.total_written, deadline)
+            if end > processed:
+                if vad.process(ring.view(processed, end)):
+                    break  # Hangover elapsed after speech - endpoint reached
+                processed = end
+
+            if on_partial is not None and vad.in_speech:
+                if next_partial is None:
+                    next_partial = processed + partial_step
+                elif processed >= next_partial and vad.last_speech_frame != last_decoded_frame:
+                    # Whisper re-encodes a padded 30 s window every time, so there is no
+                    # encoder state to carry over - instead skip decodes with nothing new voiced
+                    last_decoded_frame = vad.last_speech_frame
+                    speech_start, _speech_end = vad.speech_bounds()
+                    on_partial(ring.view(start + speech_start, processed))
+                    next_partial = ring.total_written + partial_step
+
+            if processed >= deadline:
+                break
+            if stop_event is not None and stop_event.is_set():
+                break
+            if not vad.speech_detected and processed >= give_up:
+                break
+            # Checked against the buffer, not a fixed deadline: a slow on_partial decode
+            # delays this loop while the device keeps writing
+            if ring.total_written != last_written:
+                last_written, last_arrival = ring.total_written, time.monotonic()
+            elif time.monotonic() - last_arrival >= STALL_GRACE_SECONDS:
+                print("⚠️  Microphone stopped delivering audio - it will be reopened on the next capture")
+                try:
+                    self.mic.stop()
+                except Exception as e:
+                    print(f"Engine Error: could not close microphone stream: {e}")
+                break
+            ring.wait_for(ring.total_written + step, timeout=0.1)
+
+        bounds = vad.speech_bounds()
+        if bounds is None:
+            print("🔇 No speech detected - skipping transcription")
+            return ring.view(start, start)
+        return ring.view(start + bounds[0], start + bounds[1])
+
+    def transcribe(self, audio, partial=False):
+        """Convert captured speech to text."""
+        if audio is None or len(audio) == 0:
+            return ""
+
+        # Requests made while the model is still warming up queue here until it is ready
+        self.ready.wait()
+        if self.backend is None:
+            return ""
+
+        # Same preprocessing for every backend (the copy also detaches from the ring buffer)
+        result = self.backend.transcribe(preprocess_audio(audio))
+        transcribed_text = result["text"].lower().strip()
+
+        print(f"🎤 {'Partial' if partial else 'Transcribed'}: '{transcribed_text}'")  # Debug output
+        return transcribed_text
+
+    def record_and_transcribe(self, duration=4, stop_event=None, pre_roll=PRE_ROLL_SECONDS):
+        """Captures audio and converts to text.
+
+        `duration` is an upper bound - capture ends once speech stops or stop_event is set.
+        """
         try:
-            # Record raw audio (increased to 4 seconds for better capture)
-            recording = sd.rec(
-                int(duration * self.sample_rate),
-                samplerate=self.sample_rate,
-                channels=1,
-                dtype="float32"
-            )
-            sd.wait()  # Block until hardware is done recording
-            
-            # Preprocess audio: Normalize and remove silence
-            audio_flat = np.squeeze(recording)
-            
-            # Normalize audio to prevent clipping
-            max_val = np.abs(audio_flat).max()
-            if max_val > 0:
-                audio_flat = audio_flat / max_val * 0.95
-            
-            # Apply basic noise gate - remove very quiet parts at start/end
-            threshold = 0.01
-            mask = np.abs(audio_flat) > threshold
-            if mask.any():
-                indices = np.where(mask)[0]
-                start_idx = max(0, indices[0] - int(0.1 * self.sample_rate))
-                end_idx = min(len(audio_flat), indices[-1] + int(0.1 * self.sample_rate))
-                audio_flat = audio_flat[start_idx:end_idx]
-            
-            # Process with Whisper
-            result = self.asr(audio_flat, return_timestamps=False)
-            transcribed_text = result["text"].lower().strip()
-            
-            print(f"🎤 Transcribed: '{transcribed_text}'")  # Debug output
-            return transcribed_text
-            
+            audio = self.capture(max_duration=duration, stop_event=stop_event, pre_roll=pre_roll)
+            return self.transcribe(audio)
+
         except Exception as e:
             print(f"Engine Error: {e}")
-            return ""
\ No newline at end of file
+            return ""
+
+    def close(self):
+        """Release the microphone stream and the ASR backend (stops its worker process)"""
+        self.mic.stop()
+        if self.backend is not None:
+            self.backend.close()
+            self.backend = None
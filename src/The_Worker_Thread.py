@@ -1,188 +1,262 @@
-import difflib
-import re
+import queue
+import threading
+import time
 from PyQt6.QtCore import QThread, pyqtSignal
+import app_config
 from The_Audio_Engine import VoiceEngine
+from audio_stream import PRE_ROLL_SECONDS
+from command_cache import CommandCache
+from command_parser import CommandParser
+from command_templates import CommandTemplateClassifier
+
+SHUTDOWN_TIMEOUT_MS = 5000  # Longest we wait for an in-flight transcription on exit
+CORRECTION_WINDOW = 6.0     # Seconds after a voice attempt in which a button press counts as a correction
+
+
+class VoiceJob:
+    """One capture-and-recognise request; cancel() is honoured at the next stage boundary"""
+
+    def __init__(self, max_duration=8, pre_roll=PRE_ROLL_SECONDS, enroll_command=None, noise_floor=None):
+        self.max_duration = max_duration
+        self.pre_roll = pre_roll
+        self.enroll_command = enroll_command
+        self.noise_floor = noise_floor  # Known background level, used instead of calibrating on the pre-roll
+        self.stop_event = threading.Event()    # Ends the capture, recognition still runs
+        self.cancel_event = threading.Event()  # Abandons the job
+
+    def stop(self):
+        self.stop_event.set()
+
+    def cancel(self):
+        self.cancel_event.set()
+        self.stop_event.set()  # Also cut the capture short
+
+    @property
+    def cancelled(self):
+        return self.cancel_event.is_set()
+
 
 class VoiceWorker(QThread):
-    command_found = pyqtSignal(object)  # Changed to object to support both str and dict
+    command_found = pyqtSignal(object)  # str or dict command, or a list of them for "... and ..." utterances
     finished_processing = pyqtSignal()
     transcription_done = pyqtSignal(str)
+    engine_ready = pyqtSignal(bool)  # Emitted once the Whisper model finished loading
+    sample_enrolled = pyqtSignal(str, int)  # Quick command name, samples it now has
 
-    def __init__(self):
+    def __init__(self, engine=None):
         super().__init__()
-        self.engine = VoiceEngine()
-        
-        # Enhanced command dictionary with variations
-        self.command_map = {
-            "play": ["play", "start", "resume", "begin"],
-            "pause": ["pause", "hold", "wait","boss"],
-            "faster": ["faster", "speed up", "fast", "quick"],
-            "slower": ["slower", "slow down", "slow"],
-            "normal": ["normal speed", "normal", "regular speed", "default speed"],
-            "volume up": ["volume up", "louder", "increase volume", "turn up"],
-            "volume down": ["volume down", "quieter", "decrease volume", "turn down", "lower volume"],
-            "mute": ["mute", "silence", "quiet", "no sound"]
-        }
-        
-        # Flatten command variations for matching
-        self.all_variations = []
-        for cmd, variations in self.command_map.items():
-            self.all_variations.extend(variations)
-
-    def run(self):
-        raw_text = self.engine.record_and_transcribe(duration=4)
-        
-        if raw_text:
-            # Emit the raw transcription for debugging
-            self.transcription_done.emit(raw_text)
-            
-            # Clean and normalize text
-            clean_text = raw_text.replace(".", "").replace(",", "").replace("!", "").replace("?", "").strip()
-            
-            # First, check if it's a time jump command
-            time_command = self._parse_time_jump(clean_text)
-            if time_command:
-                print(f"✅ Time jump: {time_command}")
-                self.command_found.emit(time_command)
-            # Second, check if it's a volume command with percentage
-            elif volume_command := self._parse_volume_command(clean_text):
-                print(f"✅ Volume command: {volume_command}")
-                self.command_found.emit(volume_command)
-            else:
-                # Try to find regular command in the text
-                command = self._match_command(clean_text)
-                
-                if command:
-                    print(f"✅ Matched command: '{command}'")
-                    self.command_found.emit(command)
-                else:
-                    print(f"❌ No command matched for: '{clean_text}'")
-        
-        self.finished_processing.emit()
-    
-    def _parse_time_jump(self, text):
-        """Parse time jump commands like 'go to 1 hour 30 minutes' or 'jump to 2:30:15'"""
-        text_lower = text.lower()
-        
-        # Check for time jump keywords
-        time_keywords = ["go to", "jump to", "skip to", "seek to", "go", "jump"]
-        has_time_keyword = any(keyword in text_lower for keyword in time_keywords)
-        
-        if not has_time_keyword:
-            return None
-        
-        total_ms = 0
-        
-        # Pattern 1: "X hour(s) Y minute(s) Z second(s)"
-        # Extract hours
-        hour_match = re.search(r'(\d+)\s*(?:hour|hours|hr|hrs)', text_lower)
-        if hour_match:
-            total_ms += int(hour_match.group(1)) * 3600000
-        
-        # Extract minutes
-        min_match = re.search(r'(\d+)\s*(?:minute|minutes|min|mins)', text_lower)
-        if min_match:
-            total_ms += int(min_match.group(1)) * 60000
-        
-        # Extract seconds
-        sec_match = re.search(r'(\d+)\s*(?:second|seconds|sec|secs)', text_lower)
-        if sec_match:
-            total_ms += int(sec_match.group(1)) * 1000
+        self.engine = engine or VoiceEngine()
+        # The thread lives for the whole session and takes jobs from this queue,
+        # so the model and microphone stay warm between commands
+        self._jobs = queue.Queue()
+        self._job = None         # Job currently being processed
+        self._latest_job = None  # Most recently queued job, the one a button release refers to
         
-        # Pattern 2: "HH:MM:SS" or "MM:SS" format
-        if total_ms == 0:
-            time_format = re.search(r'(\d{1,2}):(\d{1,2})(?::(\d{1,2}))?', text_lower)
-            if time_format:
-                hours = 0
-                minutes = 0
-                seconds = 0
-                
-                if time_format.group(3):  # HH:MM:SS
-                    hours = int(time_format.group(1))
-                    minutes = int(time_format.group(2))
-                    seconds = int(time_format.group(3))
-                else:  # MM:SS
-                    minutes = int(time_format.group(1))
-                    seconds = int(time_format.group(2))
-                
-                total_ms = (hours * 3600000) + (minutes * 60000) + (seconds * 1000)
+        # Text-to-command matching lives in CommandParser so it can run without a GUI
+        self.parser = CommandParser()
+        self.command_map = self.parser.command_map
+        self.all_variations = self.parser.all_variations
+        self.engine.set_grammar(self.parser)
         
-        # Pattern 3: Just numbers (assume minutes if single number)
-        if total_ms == 0:
-            number_match = re.search(r'\b(\d+)\b', text_lower)
-            if number_match and ("minute" in text_lower or "min" in text_lower):
-                total_ms = int(number_match.group(1)) * 60000
+        # Transcripts confirmed by the user resolve instantly next time
+        self.command_cache = CommandCache()
+        self.parser.learned = self.command_cache
+        self._last_heard = None  # (clean text, command or None, time) of the last final transcript
         
-        if total_ms > 0:
-            return {"time_ms": total_ms}
+        # Fast path: enrolled recordings of common commands skip Whisper entirely
+        self.quick_commands = CommandTemplateClassifier(sample_rate=self.engine.sample_rate)
         
-        return None
-    
-    def _parse_volume_command(self, text):
-        """Parse volume commands like 'volume 50 percent' or 'set volume to 75'"""
-        text_lower = text.lower()
-        
-        # Check for volume keywords
-        volume_keywords = ["volume", "sound"]
-        has_volume_keyword = any(keyword in text_lower for keyword in volume_keywords)
-        
-        if not has_volume_keyword:
-            return None
-        
-        # Pattern 1: "volume X percent" or "volume X%"
-        percent_match = re.search(r'(\d+)\s*(?:percent|%)', text_lower)
-        if percent_match:
-            volume = int(percent_match.group(1))
-            volume = max(0, min(100, volume))  # Clamp between 0-100
-            return {"volume_percent": volume}
-        
-        # Pattern 2: "volume X" or "set volume X" (assume it's percentage)
-        volume_match = re.search(r'volume\s+(?:to\s+)?(\d+)', text_lower)
-        if volume_match:
-            volume = int(volume_match.group(1))
-            volume = max(0, min(100, volume))  # Clamp between 0-100
-            return {"volume_percent": volume}
+        # Streaming partials: commands can fire before the speaker has finished
+        voice_config = app_config.get_section("voice")
+        self.partial_results = voice_config.get("partial_results", True)
+        self.partial_interval = voice_config.get("partial_interval_ms", 300) / 1000
+        self._last_partial = None
+        self._dispatched = []  # Commands already emitted for the current utterance
+
+    def warm_up(self):
+        """Start loading the Whisper model and the job loop (connect signals first)"""
+        self.engine.load_async(self.engine_ready.emit)
+        if not self.isRunning():
+            self.start()
+
+    @property
+    def is_busy(self):
+        return self._job is not None or not self._jobs.empty()
+
+    def listen(self, max_duration=8, pre_roll=PRE_ROLL_SECONDS, enroll_command=None, noise_floor=None):
+        """Queue a capture pass that runs until stop_recording() or max_duration.
+
+        With enroll_command set, the utterance is stored as a quick-command
+        sample instead of being recognised. Returns the queued VoiceJob.
+        """
+        job = VoiceJob(max_duration, pre_roll, enroll_command, noise_floor)
+        self._latest_job = job
+        self._jobs.put(job)
+        if not self.isRunning():
+            self.start()
+        return job
+
+    def stop_recording(self):
+        """End the current capture so transcription can start immediately"""
+        # If the job hasn't been picked up yet, its capture ends as soon as it starts
+        if self._latest_job is not None:
+            self._latest_job.stop()
+
+    def cancel(self):
+        """Abandon the current job and everything queued behind it"""
+        with self._jobs.mutex:
+            pending = [job for job in self._jobs.queue if job is not None]
+        for job in pending:
+            job.cancel()
+        job = self._job
+        if job is not None:
+            job.cancel()
+
+    def shutdown(self, timeout_ms=SHUTDOWN_TIMEOUT_MS):
+        """Cancel outstanding work and let the loop exit at the next stage boundary"""
+        self.cancel()
+        self._jobs.put(None)
+        if self.isRunning() and not self.wait(timeout_ms):
+            # Inference can't be interrupted midway; the daemon loader/worker process dies with us
+            print("⚠️  Voice worker still busy at shutdown")
+        self.command_cache.save()  # Hit counts are only written on learn()
+
+    def confirm_command(self, command, manual=False):
+        """Learn from a command the user actually ran.
+
+        Called after a voice command was executed, and with manual=True when
+        the user presses a button: if the last transcript matched nothing a
+        moment ago, the button press is taken as what was meant.
+        """
+        heard = self._last_heard
+        if heard is None or not isinstance(command, str):
+            return
+        clean_text, heard_command, heard_at = heard
+        if manual:
+            if heard_command is not None or time.monotonic() - heard_at > CORRECTION_WINDOW:
+                return
+        elif heard_command != command:
+            return
+        self._last_heard = None
+        # Exact phrases already resolve in one automaton pass - only keep mishearings
+        if not self.parser.find_matches(clean_text):
+            self.command_cache.learn(clean_text, command)
+
+    def _dispatch(self, commands):
+        """Emit the commands this utterance hasn't triggered yet - one command, or a list as one batch"""
+        if self._job is not None and self._job.cancelled:
+            return
+        already = list(self._dispatched)  # Each early dispatch accounts for one occurrence
+        batch = []
+        for command in commands:
+            if command in already:
+                already.remove(command)
+                print(f"↩️  Already dispatched: {command!r}")
+            else:
+                batch.append(command)
+        if not batch:
+            return
+        self._dispatched.extend(batch)
+        self.command_found.emit(batch[0] if len(batch) == 1 else batch)
+
+    def _on_partial(self, audio):
+        """Decode the utterance so far and fire its command as soon as it is stable"""
+        if not self.engine.is_ready or (self._job is not None and self._job.cancelled):
+            return  # Never stall the capture loop waiting for the model
+        try:
+            raw_text = self.engine.transcribe(audio, partial=True)
+        except Exception as e:
+            print(f"Engine Error: {e}")
+            return
         
-        # Pattern 3: "set sound to X"
-        sound_match = re.search(r'sound\s+(?:to\s+)?(\d+)', text_lower)
-        if sound_match:
-            volume = int(sound_match.group(1))
-            volume = max(0, min(100, volume))  # Clamp between 0-100
-            return {"volume_percent": volume}
+        clean_text = self.parser.normalize(raw_text) if raw_text else ""
+        command = self.parser.parse(clean_text) if clean_text else None
+        previous, self._last_partial = self._last_partial, command
+        if command is None or command in self._dispatched:
+            return
         
-        return None
-    
-    def _match_command(self, text):
-        """Smart command matching with multiple strategies"""
-        text_lower = text.lower()
+        # Stable means the grammar says more words can't change it, or - for plain
+        # commands - two decodes in a row agree. Numbers may still grow ("volume 4..."),
+        # so those wait for their unit or the final decode.
+        stable = self.parser.is_complete(clean_text) or (
+            isinstance(command, str) and command == previous)
+        if stable:
+            print(f"⏩ Early command from partial: {command!r}")
+            self.transcription_done.emit(raw_text)
+            self._dispatch([command])
+
+    def run(self):
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                break  # shutdown()
+            self._job = job
+            try:
+                self.process_job(job)
+            except Exception as e:
+                print(f"Engine Error: {e}")
+            finally:
+                self._job = None
+                self.finished_processing.emit()
+
+    def process_job(self, job):
+        """Capture and recognise one utterance, checking for cancellation between stages"""
+        self._job = job
+        self._last_partial = None
+        self._dispatched = []
+        self._last_heard = None
+        if job.cancelled:
+            return
         
-        # Strategy 1: Exact phrase match
-        for command, variations in self.command_map.items():
-            for variation in variations:
-                if variation in text_lower:
-                    return command
+        on_partial = self._on_partial if self.partial_results and not job.enroll_command else None
+        try:
+            audio = self.engine.capture(max_duration=job.max_duration, stop_event=job.stop_event,
+                                        pre_roll=job.pre_roll, on_partial=on_partial,
+                                        partial_interval=self.partial_interval, noise_floor=job.noise_floor)
+        except Exception as e:
+            print(f"Engine Error: {e}")
+            audio = None
+        if job.cancelled:
+            print("🚫 Voice command cancelled")
+            return
         
-        # Strategy 2: Check if command words appear in transcription
-        for command, variations in self.command_map.items():
-            for variation in variations:
-                words = variation.split()
-                if all(word in text_lower for word in words):
-                    return command
+        if audio is not None and len(audio) and job.enroll_command:
+            count = self.quick_commands.enroll(job.enroll_command, audio)
+            print(f"🎙 Recorded quick command sample for '{job.enroll_command}' ({count})")
+            self.sample_enrolled.emit(job.enroll_command, count)
+            return
         
-        # Strategy 3: Fuzzy matching with lower threshold
-        matches = difflib.get_close_matches(text_lower, self.all_variations, n=1, cutoff=0.5)
-        if matches:
-            # Find which command this variation belongs to
-            for command, variations in self.command_map.items():
-                if matches[0] in variations:
-                    return command
+        # Fast path ahead of Whisper and the parsing chain
+        if audio is not None and len(audio):
+            command, confidence = self.quick_commands.classify(audio)
+            if command:
+                print(f"⚡ Quick command: '{command}' (confidence {confidence:.2f})")
+                self.transcription_done.emit(f"⚡ {command}")
+                self._dispatch([command])
+                return
         
-        # Strategy 4: Word-by-word matching
-        text_words = text_lower.split()
-        for word in text_words:
-            for command, variations in self.command_map.items():
-                for variation in variations:
-                    if word == variation or difflib.SequenceMatcher(None, word, variation).ratio() > 0.75:
-                        return command
+        try:
+            raw_text = self.engine.transcribe(audio)
+        except Exception as e:
+            print(f"Engine Error: {e}")
+            raw_text = ""
+        if job.cancelled:
+            print("🚫 Voice command cancelled")
+            return
         
-        return None
\ No newline at end of file
+        if raw_text:
+            # Emit the raw transcription for debugging
+            self.transcription_done.emit(raw_text)
+            
+            # Clean and normalize text, then run the time jump / volume / command chain
+            # on every "and"-separated part
+            clean_text = self.parser.normalize(raw_text)
+            commands = self.parser.parse_all(clean_text)
+            heard = commands[0] if len(commands) == 1 else (commands or None)
+            self._last_heard = (clean_text, heard, time.monotonic())
+            
+            if commands:
+                print(f"✅ Matched command{'s' if len(commands) > 1 else ''}: {heard!r}")
+                self._dispatch(commands)
+            else:
+                print(f"❌ No command matched for: '{clean_text}'")
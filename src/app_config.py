@@ -0,0 +1,123 @@
+# app_config.py - User configuration and per-user data directory
+"""
+Settings are read from config.json in the app data directory
+(~/.ai_vlc_player by default, or the folder named by AI_VLC_HOME).
+Missing keys fall back to DEFAULTS, so the file only needs the values
+a user wants to change.
+"""
+import copy
+import json
+import os
+
+APP_DIR = os.environ.get("AI_VLC_HOME", os.path.join(os.path.expanduser("~"), ".ai_vlc_player"))
+CONFIG_PATH = os.path.join(APP_DIR, "config.json")
+
+DEFAULTS = {
+    "asr": {
+        # "transformers" (PyTorch), "onnx" (ONNX Runtime) or "ctranslate2" (int8 faster-whisper)
+        "backend": "transformers",
+        "model": "openai/whisper-tiny.en",
+        "device": "cpu",
+        # CTranslate2 weight type; int8 is the fastest on CPU-only machines
+        "compute_type": "int8",
+        # transformers backend only: dynamic int8 quantization of the Linear layers
+        "quantize": False,
+        # Tie decoding to the command grammar: "bias", "constrain" or "open"
+        "decoding": "bias",
+        "bias_strength": 4.0,
+        # Longest command ("jump to 1 hour 30 minutes 15 seconds") is well under this
+        "max_new_tokens": 24,
+        # Run inference in a separate process so it never competes with the GUI for the GIL
+        "worker_process": True,
+        # Thread counts (0 = runtime default); normally filled in by the autotuner
+        "num_threads": 0,
+        "interop_threads": 0,
+        # Benchmark model/backend/threads on first run (while idle) and whenever the hardware changes
+        "autotune": True,
+        "latency_target_ms": 1500,
+    },
+    "voice": {
+        # Always-listening mode gated by the enrolled wake phrase
+        "hands_free": False,
+        # Re-decode the growing utterance and fire commands before the speaker stops
+        "partial_results": True,
+        "partial_interval_ms": 300,
+    },
+    "parser": {
+        # Minimum difflib ratio for the whole transcript against a phrase
+        "phrase_cutoff": 0.5,
+        # A single transcript word must score above this against a phrase
+        "word_cutoff": 0.75,
+        # Most transcripts remembered from confirmed commands (see command_cache.py)
+        "learned_commands": 500,
+    },
+    "playback": {
+        # libvlc performance profile: "default", "low-latency", "low-cpu" or "high-quality"
+        "profile": "default",
+        # Extra libvlc arguments on top of the profile, e.g. ["--avcodec-threads=4"]
+        "instance_args": [],
+        # Media options by file pattern, e.g. {"*.ts": [":avcodec-hw=none"]}
+        "media_options": {},
+    },
+    "thumbnails": {
+        # Seek-preview frames, extracted by background processes (see thumbnail_cache.py)
+        "enabled": True,
+        "workers": 2,
+        "width": 160,
+        # One frame every interval_s, spread wider for long videos so there are at most max_count
+        "interval_s": 10,
+        "max_count": 240,
+    },
+}
+
+_config = None
+
+
+def _merge(base, override):
+    """Recursively overlay user values on top of the defaults"""
+    merged = copy.deepcopy(base)
+    for key, value in override.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = _merge(merged[key], value)
+        else:
+            merged[key] = value
+    return merged
+
+
+def load_config(reload=False):
+    """Return the merged configuration dict (cached after the first read)"""
+    global _config
+    if _config is None or reload:
+        user_config = {}
+        if os.path.exists(CONFIG_PATH):
+            try:
+                with open(CONFIG_PATH, "r", encoding="utf-8") as f:
+                    user_config = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"Warning: Ignoring unreadable config {CONFIG_PATH}: {e}")
+        _config = _merge(DEFAULTS, user_config)
+    return _config
+
+
+def get_section(name):
+    """Return one section of the configuration, e.g. get_section('asr')"""
+    return load_config().get(name, {})
+
+
+def save_config(config=None):
+    """Write the configuration back to disk"""
+    global _config
+    if config is not None:
+        _config = config
+    os.makedirs(APP_DIR, exist_ok=True)
+    tmp_path = CONFIG_PATH + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(load_config(), f, indent=2)
+    os.replace(tmp_path, CONFIG_PATH)
+
+
+def data_path(*parts):
+    """Path inside the app data directory, creating parent folders as needed"""
+    path = os.path.join(APP_DIR, *parts)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    return path
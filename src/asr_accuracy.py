@@ -0,0 +1,89 @@
+# asr_accuracy.py - Checks a faster ASR setup still resolves the same commands
+"""
+Runs a labelled clip corpus (see clip_corpus.py) through two ASR
+backends and compares the commands CommandParser resolves for each clip.
+
+    python src/asr_accuracy.py [clips_dir]
+
+compares the fp32 transformers model against the dynamically quantized
+int8 one and exits non-zero if any clip maps to a different command.
+"""
+import sys
+import time
+
+import app_config
+from asr_backends import create_backend, preprocess_audio
+from clip_corpus import DEFAULT_CLIPS_DIR, load_corpus, read_wav
+from command_parser import CommandParser
+
+
+def evaluate_backend(backend, clips, parser=None):
+    """Transcribe every clip and resolve its command; returns one result dict per clip"""
+    parser = parser or CommandParser()
+    results = []
+    for clip in clips:
+        audio = preprocess_audio(read_wav(clip["path"]))
+        start = time.perf_counter()
+        text = backend.transcribe(audio)["text"]
+        elapsed = time.perf_counter() - start
+        clean_text = parser.normalize(text)
+        commands = parser.parse_all(clean_text)  # Multi-command clips are labelled with a list
+        results.append({
+            "name": clip["name"],
+            "text": clean_text,
+            "command": commands[0] if len(commands) == 1 else (commands or None),
+            "expected": clip["command"],
+            "seconds": elapsed,
+        })
+    return results
+
+
+def compare_backends(reference_config, candidate_config, clips_dir=DEFAULT_CLIPS_DIR):
+    """Return (passed, reference_results, candidate_results) for two "asr" configs"""
+    clips = load_corpus(clips_dir)
+    if not clips:
+        print(f"❌ No clips found in {clips_dir}")
+        return False, [], []
+
+    parser = CommandParser()
+    all_results = []
+    for config in (reference_config, candidate_config):
+        backend = create_backend(config)
+        backend.load()
+        backend.configure_decoding(parser)  # Decode exactly as the app does
+        all_results.append(evaluate_backend(backend, clips, parser))
+    reference, candidate = all_results
+
+    passed = True
+    print(f"\n{'clip':<24} {'reference':<28} {'candidate':<28}")
+    print("-" * 82)
+    for ref, cand in zip(reference, candidate):
+        marker = "✓" if ref["command"] == cand["command"] else "✗"
+        if marker == "✗":
+            passed = False
+        print(f"{marker} {ref['name']:<22} {str(ref['command']):<28} {str(cand['command']):<28}")
+
+    for label, results in (("reference", reference), ("candidate", candidate)):
+        correct = sum(1 for r in results if r["command"] == r["expected"])
+        total_time = sum(r["seconds"] for r in results)
+        print(f"{label:>9}: {correct}/{len(results)} match labels, "
+              f"{total_time / len(results) * 1000:.0f} ms per clip")
+
+    return passed, reference, candidate
+
+
+def check_quantized(clips_dir=DEFAULT_CLIPS_DIR, asr_config=None):
+    """Compare the fp32 transformers model with its int8 dynamic quantization"""
+    config = dict(asr_config or app_config.get_section("asr"))
+    config["backend"] = "transformers"
+    reference = dict(config, quantize=False)
+    candidate = dict(config, quantize=True)
+    passed, _reference, _candidate = compare_backends(reference, candidate, clips_dir)
+    print("✅ Quantized model resolves the same commands" if passed
+          else "❌ Quantized model changes some command results")
+    return passed
+
+
+if __name__ == "__main__":
+    clips_dir = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_CLIPS_DIR
+    sys.exit(0 if check_quantized(clips_dir) else 1)
@@ -0,0 +1,315 @@
+# asr_backends.py - Interchangeable speech recognition engines behind VoiceEngine
+"""
+Every backend takes the same preprocessed 16 kHz mono float32 audio
+(see preprocess_audio) and returns the same result shape: {"text": str}.
+The backend is picked by the "asr" section of the user config.
+
+Heavy imports (torch, transformers, onnxruntime, ctranslate2) happen
+inside load() so only the selected runtime is ever imported.
+
+Decoding can be tied to the command grammar (configure_decoding):
+"bias" favours command words, "constrain" forbids everything else and
+"open" decodes freely. All modes cap max_new_tokens to command length.
+"""
+import os
+import numpy as np
+import app_config
+
+SAMPLE_RATE = 16000
+# Utterances longer than this may hold several commands, so decoding must not
+# stop at the first complete one; their token cap grows with the audio instead
+EARLY_STOP_MAX_SECONDS = 1.5
+TOKENS_PER_SECOND = 6
+
+
+def preprocess_audio(audio):
+    """Shared preprocessing: float32 copy, peak-normalized to 0.95 to prevent clipping"""
+    audio = np.asarray(audio, dtype=np.float32)
+    max_val = np.abs(audio).max() if len(audio) else 0.0
+    if max_val > 0:
+        return audio / max_val * 0.95
+    return audio.copy()
+
+
+class ASRBackend:
+    """Base class for speech recognition backends"""
+    name = "base"
+
+    def __init__(self, model="openai/whisper-tiny.en", device="cpu", **options):
+        self.model_id = model
+        self.device = device
+        self.options = options
+        self.grammar = None
+        self.decoding = options.get("decoding", "bias")
+        self.max_new_tokens = options.get("max_new_tokens", 24)
+        # 0 leaves the runtime's own default (see autotune.py)
+        self.num_threads = int(options.get("num_threads") or 0)
+        self.interop_threads = int(options.get("interop_threads") or 0)
+
+    def load(self):
+        """Load model weights (slow - called from the background loader)"""
+        raise NotImplementedError
+
+    def transcribe(self, audio):
+        """Transcribe preprocessed audio and return {"text": str}"""
+        raise NotImplementedError
+
+    def configure_decoding(self, grammar):
+        """Tie decoding to a CommandParser's grammar (call after load)"""
+        self.grammar = grammar
+
+    def close(self):
+        """Release runtime resources"""
+        pass
+
+    def _apply_torch_threads(self):
+        import torch
+
+        if self.num_threads:
+            torch.set_num_threads(self.num_threads)
+        if self.interop_threads:
+            try:
+                torch.set_interop_threads(self.interop_threads)
+            except RuntimeError:
+                # Only allowed before the first parallel op in this process
+                print("Warning: torch inter-op threads already fixed for this process")
+
+    def _grammar_token_ids(self, encode, id_to_token, vocab_size):
+        """Token ids that can spell grammar words, numbers and punctuation"""
+        allowed = set()
+        # Rare words are split into several BPE pieces, so tokenize every spelling Whisper uses
+        for word in self.grammar.vocabulary():
+            for variant in (word, " " + word, word.capitalize(), " " + word.capitalize()):
+                allowed.update(encode(variant))
+        for token_id in range(vocab_size):
+            piece = (id_to_token(token_id) or "").replace("Ġ", " ").strip()
+            if piece and all(ch.isdigit() or ch in ".,!?:%-" for ch in piece):
+                allowed.add(token_id)
+        return allowed
+
+    def _cache_dir(self, kind):
+        """Per-model folder in the app data directory for converted weights"""
+        folder = os.path.join(app_config.APP_DIR, "models", kind, self.model_id.replace("/", "--"))
+        os.makedirs(folder, exist_ok=True)
+        return folder
+
+
+def _grammar_generation_hooks(tokenizer, grammar, allowed_ids, penalty):
+    """Build the logits processor and stopping criteria used by transformers generate()"""
+    import torch
+    from transformers import LogitsProcessor, StoppingCriteria
+
+    class GrammarLogitsProcessor(LogitsProcessor):
+        """Adds `penalty` to every token outside the command grammar"""
+
+        def __init__(self):
+            self.mask = None
+
+        def __call__(self, input_ids, scores):
+            if self.mask is None or self.mask.shape[-1] != scores.shape[-1]:
+                self.mask = torch.full((scores.shape[-1],), penalty, dtype=scores.dtype, device=scores.device)
+                ids = torch.tensor([i for i in allowed_ids if i < scores.shape[-1]], device=scores.device)
+                self.mask[ids] = 0.0
+            return scores + self.mask
+
+    class CommandCompleteCriteria(StoppingCriteria):
+        """Stops generation as soon as the text decoded so far is a whole command"""
+
+        def __call__(self, input_ids, scores, **kwargs):
+            text = tokenizer.decode(input_ids[0], skip_special_tokens=True)
+            done = grammar.is_complete(text)
+            return torch.full((input_ids.shape[0],), done, dtype=torch.bool, device=input_ids.device)
+
+    processor = GrammarLogitsProcessor() if allowed_ids is not None else None
+    return processor, CommandCompleteCriteria()
+
+
+class PipelineBackend(ASRBackend):
+    """Shared decoding for backends built on a transformers ASR pipeline"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.generate_kwargs = {"max_new_tokens": self.max_new_tokens}
+
+    def configure_decoding(self, grammar):
+        from transformers import LogitsProcessorList, StoppingCriteriaList
+
+        super().configure_decoding(grammar)
+        tokenizer = self.asr.tokenizer
+        allowed = None
+        if self.decoding in ("bias", "constrain"):
+            allowed = self._grammar_token_ids(
+                lambda text: tokenizer.encode(text, add_special_tokens=False),
+                tokenizer.convert_ids_to_tokens,
+                len(tokenizer)
+            )
+            allowed.add(tokenizer.eos_token_id)
+        penalty = float("-inf") if self.decoding == "constrain" else -float(self.options.get("bias_strength", 4.0))
+        processor, criteria = _grammar_generation_hooks(tokenizer, grammar, allowed, penalty)
+
+        self.generate_kwargs["stopping_criteria"] = StoppingCriteriaList([criteria])
+        if processor is not None:
+            self.generate_kwargs["logits_processor"] = LogitsProcessorList([processor])
+
+    def transcribe(self, audio):
+        generate_kwargs = self.generate_kwargs
+        duration = len(audio) / SAMPLE_RATE
+        if duration > EARLY_STOP_MAX_SECONDS:
+            # "go to 10 minutes and volume 40" is complete after its first half
+            generate_kwargs = {key: value for key, value in generate_kwargs.items() if key != "stopping_criteria"}
+            generate_kwargs["max_new_tokens"] = max(self.max_new_tokens, int(duration * TOKENS_PER_SECOND))
+        result = self.asr(audio, return_timestamps=False, generate_kwargs=generate_kwargs)
+        return {"text": result["text"]}
+
+
+class TransformersBackend(PipelineBackend):
+    """Hugging Face transformers pipeline running on PyTorch"""
+    name = "transformers"
+
+    def load(self):
+        from transformers import pipeline
+
+        self._apply_torch_threads()
+        if self.options.get("quantize"):
+            self.asr = self._load_quantized_pipeline()
+            return
+
+        self.asr = pipeline(
+            "automatic-speech-recognition",
+            model=self.model_id,
+            device=self.device,
+            chunk_length_s=30
+        )
+
+    def _load_quantized_pipeline(self):
+        """Pipeline around a dynamically int8-quantized model, converted once and cached on disk"""
+        import torch
+        from transformers import AutoProcessor, AutoModelForSpeechSeq2Seq, pipeline
+
+        # Pickled quantized modules are tied to the torch version that produced them
+        cache_path = os.path.join(self._cache_dir("quantized"), f"int8-dynamic-torch{torch.__version__}.pt")
+        processor = AutoProcessor.from_pretrained(self.model_id)
+
+        if os.path.exists(cache_path):
+            model = torch.load(cache_path, weights_only=False)
+        else:
+            print(f"🔧 Quantizing {self.model_id} to int8 (first run only)...")
+            model = AutoModelForSpeechSeq2Seq.from_pretrained(self.model_id)
+            model.eval()
+            model = torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+            tmp_path = cache_path + ".tmp"
+            torch.save(model, tmp_path)
+            os.replace(tmp_path, cache_path)
+
+        return pipeline(
+            "automatic-speech-recognition",
+            model=model,
+            tokenizer=processor.tokenizer,
+            feature_extractor=processor.feature_extractor,
+            device=self.device,
+            chunk_length_s=30
+        )
+
+
+class OnnxBackend(PipelineBackend):
+    """Whisper exported to ONNX and run by ONNX Runtime through optimum"""
+    name = "onnx"
+
+    def load(self):
+        import onnxruntime
+        from optimum.onnxruntime import ORTModelForSpeechSeq2Seq
+        from transformers import AutoProcessor, pipeline
+
+        session_options = onnxruntime.SessionOptions()
+        if self.num_threads:
+            session_options.intra_op_num_threads = self.num_threads
+        if self.interop_threads:
+            session_options.inter_op_num_threads = self.interop_threads
+
+        # Exporting takes a while, so the ONNX graphs are kept for later starts
+        export_dir = self._cache_dir("onnx")
+        if os.path.exists(os.path.join(export_dir, "config.json")):
+            model = ORTModelForSpeechSeq2Seq.from_pretrained(export_dir, session_options=session_options)
+            processor = AutoProcessor.from_pretrained(export_dir)
+        else:
+            print(f"🔧 Exporting {self.model_id} to ONNX (first run only)...")
+            model = ORTModelForSpeechSeq2Seq.from_pretrained(self.model_id, export=True,
+                                                             session_options=session_options)
+            processor = AutoProcessor.from_pretrained(self.model_id)
+            model.save_pretrained(export_dir)
+            processor.save_pretrained(export_dir)
+
+        self.asr = pipeline(
+            "automatic-speech-recognition",
+            model=model,
+            tokenizer=processor.tokenizer,
+            feature_extractor=processor.feature_extractor,
+            chunk_length_s=30
+        )
+
+
+class CTranslate2Backend(ASRBackend):
+    """faster-whisper (CTranslate2) with int8 weights - fastest on CPU-only machines"""
+    name = "ctranslate2"
+
+    def load(self):
+        from faster_whisper import WhisperModel
+
+        # faster-whisper names models by size ("tiny.en") rather than by HF repo
+        model_name = self.model_id
+        if model_name.startswith("openai/whisper-"):
+            model_name = model_name[len("openai/whisper-"):]
+
+        self.model = WhisperModel(
+            model_name,
+            device=self.device,
+            compute_type=self.options.get("compute_type", "int8"),
+            cpu_threads=self.num_threads,
+            download_root=self._cache_dir("ctranslate2")
+        )
+
+        self.transcribe_kwargs = {"max_new_tokens": self.max_new_tokens}
+
+    def configure_decoding(self, grammar):
+        # CTranslate2 has no per-step hook, so there is no early stop: "bias" primes the
+        # decoder with the command words and "constrain" suppresses every other token
+        super().configure_decoding(grammar)
+        if self.decoding == "bias":
+            self.transcribe_kwargs["initial_prompt"] = "Voice commands: " + ", ".join(grammar.all_variations) + "."
+        elif self.decoding == "constrain":
+            tokenizer = self.model.hf_tokenizer
+            end_of_text = tokenizer.token_to_id("<|endoftext|>")
+            allowed = self._grammar_token_ids(
+                lambda text: tokenizer.encode(text, add_special_tokens=False).ids,
+                tokenizer.id_to_token,
+                end_of_text
+            )
+            # -1 keeps the model's default suppression list
+            self.transcribe_kwargs["suppress_tokens"] = [-1] + [i for i in range(end_of_text) if i not in allowed]
+
+    def transcribe(self, audio):
+        segments, _info = self.model.transcribe(
+            audio,
+            language="en",
+            beam_size=1,
+            without_timestamps=True,
+            condition_on_previous_text=False,
+            **self.transcribe_kwargs
+        )
+        return {"text": "".join(segment.text for segment in segments)}
+
+
+BACKENDS = {
+    TransformersBackend.name: TransformersBackend,
+    OnnxBackend.name: OnnxBackend,
+    CTranslate2Backend.name: CTranslate2Backend,
+}
+
+
+def create_backend(config):
+    """Instantiate the backend described by an "asr" config section"""
+    config = dict(config)
+    name = config.pop("backend", TransformersBackend.name)
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown ASR backend '{name}' (choose from {', '.join(BACKENDS)})")
+    return BACKENDS[name](**config)
@@ -0,0 +1,178 @@
+# asr_process.py - Runs the ASR backend in a long-lived worker process
+"""
+Whisper inference in the GUI process competes with the Qt event loop and
+libvlc callbacks for the GIL. ASRProcessClient keeps the backend in a
+separate process instead. Audio is written once into a shared-memory
+block, so only a (job id, sample count) message crosses the pipe. The
+client looks like an ASRBackend to VoiceEngine: load(), transcribe(),
+configure_decoding(), close(). If the worker dies it is restarted and
+the job is retried once.
+"""
+import itertools
+import multiprocessing
+import threading
+from multiprocessing import shared_memory
+
+import numpy as np
+
+MAX_AUDIO_SECONDS = 30     # Whisper never looks at more than one 30 s window
+LOAD_TIMEOUT = 600         # First run may download the model
+JOB_TIMEOUT = 60
+MAX_RESTARTS = 3           # Consecutive failed restarts before giving up
+
+
+def _worker_main(conn, shm_name, capacity, asr_config, command_map):
+    """Child process: load the backend once, then serve transcription jobs"""
+    from asr_backends import create_backend
+    from command_parser import CommandParser
+
+    # Spawned children share the parent's resource tracker, so attaching here
+    # does not create a second owner - the parent alone unlinks the block
+    shm = shared_memory.SharedMemory(name=shm_name)
+    audio = np.ndarray((capacity,), dtype=np.float32, buffer=shm.buf)
+
+    try:
+        backend = create_backend(asr_config)
+        backend.load()
+        if command_map:
+            backend.configure_decoding(CommandParser(command_map))
+        conn.send(("ready", None, None))
+    except Exception as e:
+        conn.send(("error", None, f"{type(e).__name__}: {e}"))
+        return
+
+    while True:
+        try:
+            message = conn.recv()
+        except (EOFError, OSError):
+            break  # Parent went away
+        kind, job_id, payload = message
+        if kind == "stop":
+            break
+        if kind == "grammar":
+            backend.configure_decoding(CommandParser(payload))
+            continue
+        try:
+            # Zero-copy view of the shared block; the parent waits for our reply before reusing it
+            result = backend.transcribe(audio[:payload])
+            conn.send(("result", job_id, result))
+        except Exception as e:
+            conn.send(("error", job_id, f"{type(e).__name__}: {e}"))
+
+    del audio
+    shm.close()
+
+
+class ASRProcessClient:
+    """ASRBackend-compatible proxy that runs the real backend in a worker process"""
+
+    def __init__(self, asr_config, sample_rate=16000):
+        self.asr_config = dict(asr_config)
+        self.name = f"{self.asr_config.get('backend', 'transformers')} (worker process)"
+        self.model_id = self.asr_config.get("model", "")
+        self.command_map = None
+        self.capacity = int(MAX_AUDIO_SECONDS * sample_rate)
+        self.restarts = 0
+        # spawn everywhere: forking a process that already runs Qt/torch threads is unsafe
+        self._context = multiprocessing.get_context("spawn")
+        self._shm = shared_memory.SharedMemory(create=True, size=self.capacity * 4)
+        self._audio = np.ndarray((self.capacity,), dtype=np.float32, buffer=self._shm.buf)
+        self._lock = threading.Lock()
+        self._job_ids = itertools.count(1)
+        self._process = None
+        self._conn = None
+
+    def load(self):
+        """Start the worker and wait until its model is loaded"""
+        with self._lock:
+            self._start_worker()
+
+    def configure_decoding(self, grammar):
+        """Forward the command grammar to the worker (and to any restarted worker)"""
+        with self._lock:
+            self.command_map = grammar.command_map
+            self._conn.send(("grammar", None, self.command_map))
+
+    def transcribe(self, audio):
+        with self._lock:
+            count = min(len(audio), self.capacity)
+            self._audio[:count] = audio[:count]  # The only copy: straight into shared memory
+
+            for attempt in range(2):
+                try:
+                    if self._process is None or not self._process.is_alive():
+                        self._restart_worker()
+                    job_id = next(self._job_ids)
+                    self._conn.send(("transcribe", job_id, count))
+                    kind, _job, payload = self._receive(JOB_TIMEOUT)
+                    if kind == "error":
+                        print(f"ASR worker error: {payload}")
+                        return {"text": ""}
+                    self.restarts = 0
+                    return payload
+                except (EOFError, OSError, TimeoutError) as e:
+                    print(f"⚠️  ASR worker lost ({type(e).__name__}) - restarting (attempt {attempt + 1})")
+                    self._restart_worker()
+            return {"text": ""}
+
+    def close(self):
+        """Stop the worker and release the shared memory"""
+        # Don't wait forever on a job whose caller thread was killed mid-request
+        locked = self._lock.acquire(timeout=2)
+        try:
+            self._stop_worker()
+            del self._audio
+            self._shm.close()
+            self._shm.unlink()
+        finally:
+            if locked:
+                self._lock.release()
+
+    def _start_worker(self):
+        parent_conn, child_conn = self._context.Pipe()
+        self._process = self._context.Process(
+            target=_worker_main,
+            args=(child_conn, self._shm.name, self.capacity, self.asr_config, self.command_map),
+            name="ASRWorker",
+            daemon=True
+        )
+        self._process.start()
+        child_conn.close()
+        self._conn = parent_conn
+        kind, _job, payload = self._receive(LOAD_TIMEOUT)
+        if kind != "ready":
+            self._stop_worker()
+            raise RuntimeError(f"ASR worker failed to load: {payload}")
+
+    def _restart_worker(self):
+        self._stop_worker()
+        self.restarts += 1
+        if self.restarts > MAX_RESTARTS:
+            raise RuntimeError("ASR worker keeps crashing - giving up")
+        self._start_worker()
+
+    def _stop_worker(self):
+        if self._conn is not None:
+            try:
+                self._conn.send(("stop", None, None))
+            except (OSError, ValueError):
+                pass
+            self._conn.close()
+            self._conn = None
+        if self._process is not None:
+            self._process.join(timeout=5)
+            if self._process.is_alive():
+                self._process.terminate()
+                self._process.join()
+            self._process = None
+
+    def _receive(self, timeout):
+        """Wait for the worker's reply while watching for it dying"""
+        waited = 0.0
+        while not self._conn.poll(0.1):
+            waited += 0.1
+            if not self._process.is_alive():
+                raise EOFError("worker exited")
+            if waited >= timeout:
+                raise TimeoutError("worker did not answer")
+        return self._conn.recv()
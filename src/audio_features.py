@@ -0,0 +1,93 @@
+# audio_features.py - Vectorized log-mel / MFCC features and DTW matching in NumPy
+import numpy as np
+
+SAMPLE_RATE = 16000
+N_FFT = 400       # 25ms analysis window
+HOP_LENGTH = 160  # 10ms hop
+N_MELS = 40
+N_MFCC = 13
+
+_filterbanks = {}
+_dct_matrices = {}
+_windows = {}
+
+
+def mel_filterbank(sample_rate=SAMPLE_RATE, n_fft=N_FFT, n_mels=N_MELS, fmin=20.0, fmax=None):
+    """Triangular mel filterbank of shape (n_mels, n_fft // 2 + 1), cached per configuration"""
+    key = (sample_rate, n_fft, n_mels, fmin, fmax)
+    if key not in _filterbanks:
+        fmax = fmax or sample_rate / 2
+        to_mel = lambda hz: 2595.0 * np.log10(1.0 + hz / 700.0)
+        to_hz = lambda mel: 700.0 * (10.0 ** (mel / 2595.0) - 1.0)
+        edges = to_hz(np.linspace(to_mel(fmin), to_mel(fmax), n_mels + 2))
+        bins = np.fft.rfftfreq(n_fft, 1.0 / sample_rate)
+        lower, center, upper = edges[:-2, None], edges[1:-1, None], edges[2:, None]
+        rising = (bins - lower) / (center - lower)
+        falling = (upper - bins) / (upper - center)
+        _filterbanks[key] = np.maximum(0.0, np.minimum(rising, falling)).astype(np.float32)
+    return _filterbanks[key]
+
+
+def _dct_matrix(n_mfcc, n_mels):
+    """Orthonormal DCT-II basis of shape (n_mfcc, n_mels)"""
+    key = (n_mfcc, n_mels)
+    if key not in _dct_matrices:
+        k = np.arange(n_mfcc)[:, None]
+        n = np.arange(n_mels)[None, :]
+        basis = np.cos(np.pi / n_mels * (n + 0.5) * k) * np.sqrt(2.0 / n_mels)
+        basis[0] /= np.sqrt(2.0)
+        _dct_matrices[key] = basis.astype(np.float32)
+    return _dct_matrices[key]
+
+
+def frame_signal(audio, frame_length=N_FFT, hop_length=HOP_LENGTH):
+    """Strided (zero-copy) view of overlapping frames, shape (n_frames, frame_length)"""
+    audio = np.asarray(audio, dtype=np.float32)
+    if len(audio) < frame_length:
+        audio = np.pad(audio, (0, frame_length - len(audio)))
+    return np.lib.stride_tricks.sliding_window_view(audio, frame_length)[::hop_length]
+
+
+def log_mel_spectrogram(audio, sample_rate=SAMPLE_RATE, n_fft=N_FFT, hop_length=HOP_LENGTH, n_mels=N_MELS):
+    """Log mel energies, shape (n_frames, n_mels)"""
+    if n_fft not in _windows:
+        _windows[n_fft] = np.hanning(n_fft).astype(np.float32)
+    frames = frame_signal(audio, n_fft, hop_length) * _windows[n_fft]
+    power = np.abs(np.fft.rfft(frames, n=n_fft, axis=1)) ** 2
+    mel = power @ mel_filterbank(sample_rate, n_fft, n_mels).T
+    return np.log(mel + 1e-10).astype(np.float32)
+
+
+def mfcc(audio, sample_rate=SAMPLE_RATE, n_mfcc=N_MFCC, n_mels=N_MELS):
+    """MFCCs with cepstral mean normalization, shape (n_frames, n_mfcc)"""
+    features = log_mel_spectrogram(audio, sample_rate, n_mels=n_mels) @ _dct_matrix(n_mfcc, n_mels).T
+    # Removing the per-utterance mean cancels most microphone/channel colouring
+    return features - features.mean(axis=0, keepdims=True)
+
+
+def dtw_distance(a, b):
+    """Length-normalized DTW distance between two feature sequences (frames x dims).
+
+    Each row of the cost matrix is computed with array operations: the
+    horizontal dependency cost[i, j-1] is unrolled into a running minimum
+    over cumulative sums, so the only Python loop is over the frames of `a`.
+    """
+    if len(a) == 0 or len(b) == 0:
+        return np.inf
+    # Pairwise Euclidean frame distances
+    sq = (a * a).sum(axis=1)[:, None] + (b * b).sum(axis=1)[None, :] - 2.0 * (a @ b.T)
+    local = np.sqrt(np.maximum(sq, 0.0))
+
+    cost = np.cumsum(local[0])
+    for i in range(1, len(a)):
+        d = local[i]
+        # Best predecessor from the previous row: diagonal or vertical step
+        best_prev = np.empty_like(cost)
+        best_prev[0] = cost[0]
+        np.minimum(cost[:-1], cost[1:], out=best_prev[1:])
+        # cost[i, j] = d[j] + min(best_prev[j], cost[i, j-1]) unrolled:
+        #            = S[j] + min_{k<=j}(best_prev[k] - S[k-1])
+        cumulative = np.cumsum(d)
+        shifted = np.concatenate(([0.0], cumulative[:-1]))
+        cost = cumulative + np.minimum.accumulate(best_prev - shifted)
+    return float(cost[-1] / (len(a) + len(b)))
@@ -0,0 +1,127 @@
+# audio_stream.py - Always-on microphone capture into a pre-roll ring buffer
+import threading
+import numpy as np
+import sounddevice as sd
+
+SAMPLE_RATE = 16000
+BLOCK_SIZE = 480          # 30ms blocks keep the callback cheap and latency low
+PRE_ROLL_SECONDS = 1.0    # Audio kept from before the button press
+BUFFER_SECONDS = 20.0     # Total history held in the ring buffer
+
+
+class AudioRingBuffer:
+    """Preallocated float32 ring buffer that hands out contiguous, zero-copy views"""
+
+    def __init__(self, capacity):
+        self.capacity = int(capacity)
+        # Every sample is stored twice (at i and i + capacity) so any window of
+        # up to `capacity` samples is one contiguous slice - no copy on wrap-around
+        self._data = np.zeros(self.capacity * 2, dtype=np.float32)
+        self._total = 0  # Monotonic count of samples ever written
+        self._cond = threading.Condition()
+
+    @property
+    def total_written(self):
+        """Absolute index one past the newest sample"""
+        return self._total
+
+    def write(self, samples):
+        """Append samples (called from the audio callback thread)"""
+        samples = np.asarray(samples, dtype=np.float32).reshape(-1)
+        n = len(samples)
+        if n == 0:
+            return
+        skipped = 0
+        if n > self.capacity:
+            skipped = n - self.capacity
+            samples = samples[skipped:]
+            n = self.capacity
+
+        cap = self.capacity
+        start = (self._total + skipped) % cap
+        first = min(n, cap - start)
+        self._data[start:start + first] = samples[:first]
+        self._data[start + cap:start + cap + first] = samples[:first]
+        rest = n - first
+        if rest:
+            self._data[:rest] = samples[first:]
+            self._data[cap:cap + rest] = samples[first:]
+
+        with self._cond:
+            self._total += skipped + n
+            self._cond.notify_all()
+
+    def oldest_available(self):
+        """Absolute index of the oldest sample still held in the buffer"""
+        return max(0, self._total - self.capacity)
+
+    def view(self, start, end):
+        """Return a read-only view of samples [start, end) in absolute indices"""
+        start = max(int(start), self.oldest_available())
+        end = min(int(end), self._total)
+        if end <= start:
+            return self._data[:0]
+        offset = start % self.capacity
+        window = self._data[offset:offset + (end - start)]
+        window.flags.writeable = False
+        return window
+
+    def wait_for(self, index, timeout=None):
+        """Block until the absolute sample index has been written; returns True if it was"""
+        with self._cond:
+            return self._cond.wait_for(lambda: self._total >= index, timeout=timeout)
+
+
+class MicrophoneStream:
+    """Keeps an sd.InputStream running and feeds it into an AudioRingBuffer"""
+
+    def __init__(self, sample_rate=SAMPLE_RATE, buffer_seconds=BUFFER_SECONDS, block_size=BLOCK_SIZE):
+        self.sample_rate = sample_rate
+        self.block_size = block_size
+        self.ring = AudioRingBuffer(int(buffer_seconds * sample_rate))
+        self.overflow_count = 0
+        self._stream = None
+
+    @property
+    def active(self):
+        return self._stream is not None and self._stream.active
+
+    def start(self):
+        """Open the input device and start streaming (no-op if already running)"""
+        if self.active:
+            return
+        if self._stream is not None:
+            self.stop()  # Opened but no longer running (device lost, stream aborted) - reopen
+        stream = sd.InputStream(
+            samplerate=self.sample_rate,
+            channels=1,
+            dtype="float32",
+            blocksize=self.block_size,
+            callback=self._callback
+        )
+        try:
+            stream.start()
+        except Exception:
+            stream.close()
+            raise
+        # Only a running stream is kept, so a failed start is retried by the next call
+        self._stream = stream
+
+    def stop(self):
+        """Stop streaming and release the input device"""
+        stream, self._stream = self._stream, None
+        if stream is not None:
+            try:
+                stream.stop()
+            finally:
+                stream.close()
+
+    def _callback(self, indata, frames, time_info, status):
+        # Runs on the PortAudio thread - keep it allocation-free and never print here
+        if status.input_overflow:
+            self.overflow_count += 1
+        self.ring.write(indata[:, 0])
+
+    def pre_roll_start(self, seconds=PRE_ROLL_SECONDS):
+        """Absolute index that starts `seconds` before the newest sample"""
+        return max(self.ring.oldest_available(), self.ring.total_written - int(seconds * self.sample_rate))
@@ -0,0 +1,234 @@
+# autotune.py - Picks the fastest ASR setup for this machine
+"""
+Benchmarks candidate ASR configurations (model size, backend, intra-op
+and inter-op thread counts) on a reference clip and stores the fastest
+one that recognises the clip correctly within the latency target.
+The reference clip ships in assets/. Without it nothing is stored,
+because timing noise says nothing about recognition, and neither is a
+setup that misses the latency target. VoiceEngine applies the stored
+result on later starts, but only to the tuned keys the user left at
+their defaults. It tunes on first run, and again when the hardware
+fingerprint changes, while nothing is playing; a tune interrupted by
+playback is dropped and retried on the next start.
+
+Each candidate runs in a fresh process. torch only lets inter-op threads
+be set once per process, and a fresh process keeps one candidate's
+memory from affecting the next one's timing.
+
+    python src/autotune.py             # tune now and print the results
+    python src/autotune.py --dry-run   # time the candidates without saving
+"""
+import importlib.util
+import json
+import multiprocessing
+import os
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime
+
+import numpy as np
+
+import app_config
+
+RESULTS_FILE = "autotune.json"
+MODELS = ["openai/whisper-tiny.en", "openai/whisper-base.en"]
+# Next to the sources, or unpacked by PyInstaller under sys._MEIPASS
+ASSETS_DIR = os.path.join(getattr(sys, "_MEIPASS", os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")),
+                          "assets")
+REFERENCE_CLIP = os.path.join(ASSETS_DIR, "reference_command.wav")
+REFERENCE_COMMAND = {"time_ms": 600000}  # What the reference clip says: "go to 10 minutes"
+BENCHMARK_RUNS = 3
+CANDIDATE_TIMEOUT = 900  # Seconds, including a possible first-time model download
+
+# Which backends need which packages
+BACKEND_MODULES = {
+    "transformers": "transformers",
+    "onnx": "optimum",
+    "ctranslate2": "faster_whisper",
+}
+# Settings the tuner owns; everything else in the "asr" section is left alone
+TUNED_KEYS = ("backend", "model", "num_threads", "interop_threads")
+
+
+def hardware_fingerprint():
+    """Identifies the machine closely enough that a new CPU triggers a re-tune"""
+    return "|".join([
+        platform.system(),
+        platform.machine(),
+        platform.processor() or "unknown-cpu",
+        str(os.cpu_count()),
+    ])
+
+
+def available_backends():
+    return [name for name, module in BACKEND_MODULES.items() if importlib.util.find_spec(module)]
+
+
+def thread_options():
+    cpus = os.cpu_count() or 1
+    return sorted({n for n in (1, 2, 4, cpus // 2, cpus) if 1 <= n <= cpus})
+
+
+def candidate_configs(base_config):
+    """Every configuration worth timing, cheapest models first"""
+    candidates = []
+    for model in MODELS:
+        for backend in available_backends():
+            for threads in thread_options():
+                # Only PyTorch has a separate inter-op pool worth tuning
+                for interop in ((1, 2) if backend == "transformers" else (1,)):
+                    config = dict(base_config, model=model, backend=backend,
+                                  num_threads=threads, interop_threads=interop, worker_process=False)
+                    candidates.append(config)
+    return candidates
+
+
+def load_reference_clip():
+    """Return (audio, expected_command); expected is None if only latency can be checked"""
+    from clip_corpus import DEFAULT_CLIPS_DIR, read_wav, load_corpus
+
+    if os.path.exists(REFERENCE_CLIP):
+        return read_wav(REFERENCE_CLIP), REFERENCE_COMMAND
+    if os.path.exists(os.path.join(DEFAULT_CLIPS_DIR, "labels.json")):
+        for clip in load_corpus(DEFAULT_CLIPS_DIR):
+            if clip["command"] and not isinstance(clip["command"], list):
+                return read_wav(clip["path"]), clip["command"]
+    # No recording available: time a speech-like chirp, correctness can't be judged
+    print("⚠️  No reference clip found - timing a synthetic signal")
+    t = np.arange(int(1.5 * 16000)) / 16000
+    return (0.3 * np.sin(2 * np.pi * (150 + 100 * t) * t)).astype(np.float32), None
+
+
+def _benchmark_candidate(config, audio, expected):
+    """Runs in a fresh process: load the backend, warm up, time BENCHMARK_RUNS transcriptions"""
+    from asr_backends import create_backend, preprocess_audio
+    from command_parser import CommandParser
+
+    parser = CommandParser()
+    start = time.perf_counter()
+    backend = create_backend(config)
+    backend.load()
+    backend.configure_decoding(parser)
+    load_seconds = time.perf_counter() - start
+
+    audio = preprocess_audio(audio)
+    backend.transcribe(audio)  # Warm-up: first call allocates buffers and JIT paths
+    timings, text = [], ""
+    for _ in range(BENCHMARK_RUNS):
+        start = time.perf_counter()
+        text = backend.transcribe(audio)["text"]
+        timings.append((time.perf_counter() - start) * 1000)
+
+    command = parser.parse(parser.normalize(text))
+    return {
+        "load_s": round(load_seconds, 2),
+        "median_ms": round(statistics.median(timings), 1),
+        "text": text.strip(),
+        "correct": expected is None or command == expected,
+    }
+
+
+def run_autotune(base_config=None, latency_target_ms=None, progress=print, save=True, should_continue=None):
+    """Benchmark every candidate, persist the winner (if save) and return it (or None)
+
+    should_continue() is checked before each candidate; once it returns False
+    the run stops and nothing is saved.
+    """
+    base_config = dict(base_config or app_config.get_section("asr"))
+    latency_target_ms = latency_target_ms or base_config.get("latency_target_ms", 1500)
+    audio, expected = load_reference_clip()
+    if expected is None and save:
+        # Every candidate would count as correct, so the fastest wins whatever it transcribes
+        progress("❌ Autotune needs a recorded reference clip (see assets/README.md) - nothing tuned")
+        return None
+
+    context = multiprocessing.get_context("spawn")
+    results = []
+    slow_model_backends = set()
+    for config in candidate_configs(base_config):
+        if should_continue is not None and not should_continue():
+            progress("⏸ Autotune interrupted - it will run again on the next start")
+            return None
+        # A bigger model can't beat a smaller one that already missed the target
+        if config["backend"] in slow_model_backends and config["model"] != MODELS[0]:
+            continue
+        label = (f"{config['model'].split('/')[-1]} / {config['backend']} / "
+                 f"{config['num_threads']}t x {config['interop_threads']}")
+        with context.Pool(1, maxtasksperchild=1) as pool:
+            try:
+                outcome = pool.apply_async(_benchmark_candidate, (config, audio, expected)).get(CANDIDATE_TIMEOUT)
+            except Exception as e:
+                progress(f"  {label}: failed ({type(e).__name__}: {e})")
+                continue
+        results.append(dict(outcome, config={key: config[key] for key in TUNED_KEYS}))
+        progress(f"  {label}: {outcome['median_ms']:.0f} ms, "
+                 f"{'correct' if outcome['correct'] else 'WRONG'} ('{outcome['text']}')")
+        if outcome["median_ms"] > latency_target_ms and config["model"] == MODELS[0]:
+            slow_model_backends.add(config["backend"])
+
+    usable = [r for r in results if r["correct"]]
+    within_target = [r for r in usable if r["median_ms"] <= latency_target_ms]
+    if not within_target:
+        if usable:
+            fastest = min(usable, key=lambda r: r["median_ms"])
+            progress(f"❌ No configuration met {latency_target_ms} ms - fastest was {fastest['config']} "
+                     f"({fastest['median_ms']:.0f} ms); nothing saved, raise latency_target_ms to accept it")
+        else:
+            progress("❌ Autotune found no working configuration")
+        return None
+
+    best = min(within_target, key=lambda r: r["median_ms"])
+    if save:
+        save_results(best, results, latency_target_ms)
+    progress(f"✅ Autotune picked {best['config']} ({best['median_ms']:.0f} ms)")
+    return best["config"]
+
+
+def save_results(best, results, latency_target_ms):
+    data = {
+        "fingerprint": hardware_fingerprint(),
+        "tuned_at": datetime.now().isoformat(timespec="seconds"),
+        "latency_target_ms": latency_target_ms,
+        "config": best["config"],
+        "results": results,
+    }
+    path = app_config.data_path(RESULTS_FILE)
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+    os.replace(path + ".tmp", path)
+
+
+def load_tuned_config():
+    """Stored winning settings for this machine, or None if missing or stale"""
+    path = app_config.data_path(RESULTS_FILE)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if data.get("fingerprint") != hardware_fingerprint():
+        return None
+    return data.get("config")
+
+
+def apply_tuned_config(asr_config):
+    """Overlay stored autotune results; returns (config, needs_tuning)
+
+    Only keys still at their DEFAULTS value are filled in - a backend, model
+    or thread count the user chose always wins over the tuner's pick.
+    """
+    if not asr_config.get("autotune"):
+        return asr_config, False
+    tuned = load_tuned_config()
+    if tuned is None:
+        return asr_config, True
+    defaults = app_config.DEFAULTS["asr"]
+    unset = {key: value for key, value in tuned.items()
+             if key in TUNED_KEYS and asr_config.get(key) == defaults.get(key)}
+    return dict(asr_config, **unset), False
+
+
+if __name__ == "__main__":
+    sys.exit(0 if run_autotune(save="--dry-run" not in sys.argv[1:]) else 1)
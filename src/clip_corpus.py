@@ -0,0 +1,63 @@
+# clip_corpus.py - Labelled voice command clips for offline accuracy checks
+"""
+A corpus is a directory of WAV files plus a labels.json describing them:
+
+    {
+        "pause_01.wav": {"text": "pause", "command": "pause"},
+        "jump_90.wav": {"text": "go to 1 hour 30 minutes", "command": {"time_ms": 5400000}},
+        "nothing.wav": {"text": "", "command": null}
+    }
+
+"text" (optional) is the reference transcript, "command" is what
+CommandParser should produce for the clip (null when no command, a
+list for clips with several commands joined by "and").
+"""
+import json
+import os
+from math import gcd
+
+import numpy as np
+
+SAMPLE_RATE = 16000
+LABELS_FILE = "labels.json"
+DEFAULT_CLIPS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "tests", "command_clips")
+
+
+def read_wav(path, sample_rate=SAMPLE_RATE):
+    """Load a WAV file as mono float32 in [-1, 1] at the requested sample rate"""
+    from scipy.io import wavfile
+
+    rate, data = wavfile.read(path)
+    if np.issubdtype(data.dtype, np.integer):
+        data = data.astype(np.float32) / float(np.iinfo(data.dtype).max)
+    else:
+        data = data.astype(np.float32)
+    if data.ndim > 1:
+        data = data.mean(axis=1)
+    if rate != sample_rate:
+        from scipy.signal import resample_poly
+
+        factor = gcd(rate, sample_rate)
+        data = resample_poly(data, sample_rate // factor, rate // factor).astype(np.float32)
+    return data
+
+
+def load_corpus(directory):
+    """Return a list of clip dicts: {"name", "path", "text", "command"} for clips that exist"""
+    labels_path = os.path.join(directory, LABELS_FILE)
+    with open(labels_path, "r", encoding="utf-8") as f:
+        labels = json.load(f)
+
+    clips = []
+    for name, label in sorted(labels.items()):
+        path = os.path.join(directory, name)
+        if not os.path.exists(path):
+            print(f"⚠️  Missing clip: {path}")
+            continue
+        clips.append({
+            "name": name,
+            "path": path,
+            "text": label.get("text"),
+            "command": label.get("command"),
+        })
+    return clips
@@ -0,0 +1,137 @@
+# command_cache.py - Learned transcript -> command shortcuts that persist across sessions
+"""
+Some users are consistently misheard in the same way ("boss" for
+"pause"). When such a transcript leads to a confirmed command, either
+because the voice command ran or because the user pressed the right
+button right after a miss, the mapping is stored here. CommandParser
+checks it before its fuzzy strategies, so the next time the same
+transcript resolves with one dictionary lookup.
+
+The cache is bounded. Eviction picks the least-hit entry from the least
+recently used half, so a phrase that is used often but not lately
+survives a burst of one-off transcripts.
+
+    python src/command_cache.py           # list learned entries
+    python src/command_cache.py --clear   # forget them all
+"""
+import json
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from itertools import islice
+
+import app_config
+
+CACHE_FILE = "command_cache.json"
+MAX_ENTRIES = 500
+
+
+class CommandCache:
+    """Bounded, persistent map from normalized transcripts to commands"""
+
+    def __init__(self, path=None, max_entries=None):
+        self.path = path or app_config.data_path(CACHE_FILE)
+        self.max_entries = max_entries or app_config.get_section("parser").get("learned_commands", MAX_ENTRIES)
+        self._entries = OrderedDict()  # transcript -> {"command", "hits", "last_used"}, oldest first
+        self._lock = threading.Lock()  # The GUI thread learns while the voice worker looks up
+        self._dirty = False
+        self.load()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, transcript):
+        """Command learned for this transcript, or None"""
+        with self._lock:
+            entry = self._entries.get(transcript)
+            if entry is None:
+                return None
+            entry["hits"] += 1
+            entry["last_used"] = time.time()
+            self._entries.move_to_end(transcript)
+            self._dirty = True
+            return entry["command"]
+
+    def learn(self, transcript, command):
+        """Record a confirmed transcript -> command pair (replacing a different command)"""
+        if not transcript:
+            return
+        with self._lock:
+            entry = self._entries.get(transcript)
+            if entry is None or entry["command"] != command:
+                entry = {"command": command, "hits": 0}
+            entry["hits"] += 1
+            entry["last_used"] = time.time()
+            self._entries[transcript] = entry
+            self._entries.move_to_end(transcript)
+            self._evict()
+            self._dirty = True
+        self.save()
+        print(f"📚 Learned '{transcript}' → {command!r}")
+
+    def forget(self, transcript):
+        with self._lock:
+            if self._entries.pop(transcript, None) is not None:
+                self._dirty = True
+        self.save()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._dirty = True
+        self.save()
+
+    def entries(self):
+        """Snapshot for display: most used first"""
+        with self._lock:
+            items = [dict(entry, transcript=transcript) for transcript, entry in self._entries.items()]
+        return sorted(items, key=lambda entry: (-entry["hits"], entry["transcript"]))
+
+    def _evict(self):
+        while len(self._entries) > self.max_entries:
+            # Least frequently used among the least recently used half
+            oldest = islice(self._entries.items(), max(1, len(self._entries) // 2))
+            victim = min(oldest, key=lambda item: item[1]["hits"])[0]
+            del self._entries[victim]
+
+    def save(self):
+        """Write to disk if anything changed (hit counts included)"""
+        with self._lock:
+            if not self._dirty:
+                return
+            data = {"version": 1, "entries": [dict(entry, transcript=transcript)
+                                              for transcript, entry in self._entries.items()]}
+            self._dirty = False
+        try:
+            with open(self.path + ".tmp", "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=2)
+            os.replace(self.path + ".tmp", self.path)
+        except OSError as e:
+            print(f"⚠️  Could not save learned commands: {e}")
+
+    def load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            for item in data.get("entries", []):
+                self._entries[item["transcript"]] = {
+                    "command": item["command"],
+                    "hits": int(item.get("hits", 1)),
+                    "last_used": float(item.get("last_used", 0.0)),
+                }
+        except (OSError, ValueError, KeyError, TypeError):
+            self._entries = OrderedDict()
+        self._evict()
+
+
+if __name__ == "__main__":
+    cache = CommandCache()
+    if "--clear" in sys.argv[1:]:
+        cache.clear()
+        print("🗑 Learned commands cleared")
+    else:
+        for entry in cache.entries():
+            print(f"{entry['hits']:>5}  {entry['transcript']!r} → {entry['command']!r}")
+        print(f"{len(cache)} learned command(s) in {cache.path}")
@@ -0,0 +1,309 @@
+# command_parser.py - Maps transcribed text to player commands
+import difflib
+import re
+
+import app_config
+from fuzzy_index import FuzzyIndex
+from phrase_matcher import PhraseAutomaton
+
+# Extra words the time jump and volume parsers understand
+TIME_WORDS = ["go", "to", "jump", "skip", "seek", "hour", "hours", "hr", "hrs",
+              "minute", "minutes", "min", "mins", "second", "seconds", "sec", "secs"]
+VOLUME_WORDS = ["volume", "sound", "set", "to", "percent"]
+# Words that join several commands in one utterance ("pause and volume 40")
+CONJUNCTION_WORDS = ["and", "then", "also"]
+
+# Compiled once at import instead of on every re.search call
+TIME_KEYWORD_RE = re.compile(r'go to|jump to|skip to|seek to|go|jump')
+HOUR_RE = re.compile(r'(\d+)\s*(?:hour|hours|hr|hrs)')
+MINUTE_RE = re.compile(r'(\d+)\s*(?:minute|minutes|min|mins)')
+SECOND_RE = re.compile(r'(\d+)\s*(?:second|seconds|sec|secs)')
+CLOCK_RE = re.compile(r'(\d{1,2}):(\d{1,2})(?::(\d{1,2}))?')
+NUMBER_RE = re.compile(r'\b(\d+)\b')
+VOLUME_KEYWORD_RE = re.compile(r'volume|sound')
+PERCENT_RE = re.compile(r'(\d+)\s*(?:percent|%)')
+VOLUME_LEVEL_RE = re.compile(r'volume\s+(?:to\s+)?(\d+)')
+SOUND_LEVEL_RE = re.compile(r'sound\s+(?:to\s+)?(\d+)')
+DIGIT_RE = re.compile(r'\d')
+CONJUNCTION_RE = re.compile(r'\b(?:and then|and|then|also)\b')
+# "1 hour and 30 minutes" is one duration, not two commands
+TIME_UNIT = r'(?:hours?|hrs?|minutes?|mins?|seconds?|secs?)'
+COMPOUND_TIME_RE = re.compile(rf'(\d+\s*{TIME_UNIT})\s+and\s+(?=\d+\s*{TIME_UNIT}\b)')
+TIME_COMPLETE_RE = re.compile(r'(?:\d+\s*(?:second|seconds|sec|secs)|\d{1,2}:\d{1,2}:\d{1,2})$')
+VOLUME_COMPLETE_RE = re.compile(r'\d+\s*(?:percent|%)$')
+
+
+class CommandParser:
+    """Turns a transcript into a player command (str) or a parameterised dict command"""
+
+    def __init__(self, command_map=None, phrase_cutoff=None, word_cutoff=None):
+        # Enhanced command dictionary with variations
+        self.command_map = command_map or {
+            "play": ["play", "start", "resume", "begin"],
+            "pause": ["pause", "hold", "wait","boss"],
+            "faster": ["faster", "speed up", "fast", "quick"],
+            "slower": ["slower", "slow down", "slow"],
+            "normal": ["normal speed", "normal", "regular speed", "default speed"],
+            "volume up": ["volume up", "louder", "increase volume", "turn up"],
+            "volume down": ["volume down", "quieter", "decrease volume", "turn down", "lower volume"],
+            "mute": ["mute", "silence", "quiet", "no sound"]
+        }
+        
+        # Fuzzy match cutoffs for strategies 3 and 4 of _match_command
+        parser_config = app_config.get_section("parser")
+        self.phrase_cutoff = phrase_cutoff if phrase_cutoff is not None else parser_config["phrase_cutoff"]
+        self.word_cutoff = word_cutoff if word_cutoff is not None else parser_config["word_cutoff"]
+        # Optional CommandCache of confirmed mishearings, consulted before the fuzzy strategies
+        self.learned = None
+        
+        # Flattened command variations, filled in by compile()
+        self.all_variations = []
+        self.compile()
+
+    def compile(self):
+        """Build the phrase automaton and lookup tables (call again after editing command_map)"""
+        self.all_variations[:] = [v for variations in self.command_map.values() for v in variations]
+        self._variation_command = {}  # variation -> command, first listed command wins
+        self._variation_rank = {}     # variation -> (command order, variation order)
+        self._word_variations = {}    # word -> multi-word variations that use it
+        for command_index, (command, variations) in enumerate(self.command_map.items()):
+            for variation_index, variation in enumerate(variations):
+                if variation in self._variation_command:
+                    continue
+                self._variation_command[variation] = command
+                self._variation_rank[variation] = (command_index, variation_index)
+                for word in set(variation.split()):
+                    self._word_variations.setdefault(word, []).append(variation)
+        # Whole variations and their single words in one automaton: one pass finds both
+        self._matcher = PhraseAutomaton(list(self._variation_command) + list(self._word_variations))
+        self._fuzzy = FuzzyIndex(self._variation_command)
+
+    def normalize(self, raw_text):
+        """Lower-case and strip punctuation Whisper likes to add"""
+        return raw_text.lower().replace(".", "").replace(",", "").replace("!", "").replace("?", "").strip()
+
+    def parse(self, clean_text):
+        """Run the full matching chain: time jump, then volume, then simple commands"""
+        # First, check if it's a time jump command
+        time_command = self._parse_time_jump(clean_text)
+        if time_command:
+            return time_command
+        # Second, check if it's a volume command with percentage
+        volume_command = self._parse_volume_command(clean_text)
+        if volume_command:
+            return volume_command
+        # Try to find regular command in the text
+        return self._match_command(clean_text)
+
+    def parse_all(self, clean_text):
+        """Ordered list of every command in the text, e.g. "go to 10 minutes and volume 40"
+
+        The text is split at "and" / "then" / "also" only when every part is a
+        command on its own by exact, time or volume matching. Otherwise the
+        whole text is parsed once, as parse() would ("rock and roll" must not
+        become "rock" + a fuzzy match for "roll"). "<n> <unit> and <n> <unit>"
+        always stays one time expression.
+        """
+        clean_text = COMPOUND_TIME_RE.sub(r'\1 ', clean_text)
+        segments = [segment.strip() for segment in CONJUNCTION_RE.split(clean_text)]
+        if len(segments) > 1:
+            commands = [self._parse_exact(segment) if segment else None for segment in segments]
+            if all(commands):
+                return commands
+        command = self.parse(clean_text)
+        return [command] if command else []
+
+    def _parse_exact(self, clean_text):
+        """parse() without the fuzzy strategies - None unless the text names a command outright"""
+        return (self._parse_time_jump(clean_text) or self._parse_volume_command(clean_text)
+                or self._match_exact(clean_text.lower()))
+    
+    def find_matches(self, clean_text):
+        """Every command phrase in the text with its span, in reading order"""
+        matches = [
+            {"command": self._variation_command[phrase], "phrase": phrase, "start": start, "end": end}
+            for phrase, start, end in self._matcher.find_all(clean_text.lower())
+            if phrase in self._variation_command
+        ]
+        return sorted(matches, key=lambda match: (match["start"], -match["end"]))
+
+    def fuzzy_candidates(self, clean_text, cutoff=None, limit=5):
+        """Closest command phrases to the text, best first: [{"command", "phrase", "score"}]"""
+        cutoff = self.phrase_cutoff if cutoff is None else cutoff
+        text_lower = clean_text.lower()
+        scored = [(difflib.SequenceMatcher(None, phrase, text_lower).ratio(), phrase)
+                  for phrase in self._fuzzy.candidates(text_lower, cutoff)]
+        scored = sorted((match for match in scored if match[0] >= cutoff), reverse=True)[:limit]
+        return [{"command": self._variation_command[phrase], "phrase": phrase, "score": score}
+                for score, phrase in scored]
+
+    def vocabulary(self):
+        """Every word the grammar can use (numbers are handled separately by decoders)"""
+        words = set(TIME_WORDS) | set(VOLUME_WORDS) | set(CONJUNCTION_WORDS)
+        for variation in self.all_variations:
+            words.update(variation.split())
+        return sorted(words)
+
+    def is_complete(self, text):
+        """True once a partial transcript holds a whole command that more words could not change.
+
+        Used to stop decoding early. Numeric commands are only complete once a
+        closing unit is heard ("... 15 seconds", "... 40 percent") because
+        more digits or units may follow; otherwise the decoder's end token ends them.
+        """
+        clean_text = self.normalize(text)
+        if not clean_text:
+            return False
+
+        if DIGIT_RE.search(clean_text):
+            if self._parse_time_jump(clean_text):
+                return bool(TIME_COMPLETE_RE.search(clean_text))
+            if self._parse_volume_command(clean_text):
+                return bool(VOLUME_COMPLETE_RE.search(clean_text))
+            return False
+
+        command = self._variation_command.get(clean_text)
+        if command is None:
+            return False
+        # "quiet" (mute) must wait - it may still become "quieter" (volume down)
+        return not any(other != command and variation.startswith(clean_text)
+                       for variation, other in self._variation_command.items())
+
+    def _parse_time_jump(self, text):
+        """Parse time jump commands like 'go to 1 hour 30 minutes' or 'jump to 2:30:15'"""
+        text_lower = text.lower()
+        
+        # Check for time jump keywords
+        if not TIME_KEYWORD_RE.search(text_lower):
+            return None
+        
+        total_ms = 0
+        
+        # Pattern 1: "X hour(s) Y minute(s) Z second(s)"
+        # Extract hours
+        hour_match = HOUR_RE.search(text_lower)
+        if hour_match:
+            total_ms += int(hour_match.group(1)) * 3600000
+        
+        # Extract minutes
+        min_match = MINUTE_RE.search(text_lower)
+        if min_match:
+            total_ms += int(min_match.group(1)) * 60000
+        
+        # Extract seconds
+        sec_match = SECOND_RE.search(text_lower)
+        if sec_match:
+            total_ms += int(sec_match.group(1)) * 1000
+        
+        # Pattern 2: "HH:MM:SS" or "MM:SS" format
+        if total_ms == 0:
+            time_format = CLOCK_RE.search(text_lower)
+            if time_format:
+                hours = 0
+                minutes = 0
+                seconds = 0
+                
+                if time_format.group(3):  # HH:MM:SS
+                    hours = int(time_format.group(1))
+                    minutes = int(time_format.group(2))
+                    seconds = int(time_format.group(3))
+                else:  # MM:SS
+                    minutes = int(time_format.group(1))
+                    seconds = int(time_format.group(2))
+                
+                total_ms = (hours * 3600000) + (minutes * 60000) + (seconds * 1000)
+        
+        # Pattern 3: Just numbers (assume minutes if single number)
+        if total_ms == 0:
+            number_match = NUMBER_RE.search(text_lower)
+            if number_match and ("minute" in text_lower or "min" in text_lower):
+                total_ms = int(number_match.group(1)) * 60000
+        
+        if total_ms > 0:
+            return {"time_ms": total_ms}
+        
+        return None
+    
+    def _parse_volume_command(self, text):
+        """Parse volume commands like 'volume 50 percent' or 'set volume to 75'"""
+        text_lower = text.lower()
+        
+        # Check for volume keywords
+        if not VOLUME_KEYWORD_RE.search(text_lower):
+            return None
+        
+        # Pattern 1: "volume X percent" or "volume X%"
+        percent_match = PERCENT_RE.search(text_lower)
+        if percent_match:
+            volume = int(percent_match.group(1))
+            volume = max(0, min(100, volume))  # Clamp between 0-100
+            return {"volume_percent": volume}
+        
+        # Pattern 2: "volume X" or "set volume X" (assume it's percentage)
+        volume_match = VOLUME_LEVEL_RE.search(text_lower)
+        if volume_match:
+            volume = int(volume_match.group(1))
+            volume = max(0, min(100, volume))  # Clamp between 0-100
+            return {"volume_percent": volume}
+        
+        # Pattern 3: "set sound to X"
+        sound_match = SOUND_LEVEL_RE.search(text_lower)
+        if sound_match:
+            volume = int(sound_match.group(1))
+            volume = max(0, min(100, volume))  # Clamp between 0-100
+            return {"volume_percent": volume}
+        
+        return None
+    
+    def _match_command(self, text):
+        """Smart command matching with multiple strategies"""
+        text_lower = text.lower()
+        
+        # Strategies 1 and 2: the text contains a command phrase or all of its words
+        command = self._match_exact(text_lower)
+        if command:
+            return command
+        
+        # Learned shortcut: a transcript that was confirmed before resolves in one lookup
+        if self.learned is not None:
+            command = self.learned.get(text_lower)
+            if command in self.command_map:
+                return command
+        
+        # Strategy 3: Fuzzy matching of the whole text with lower threshold.
+        # The index only rules phrases out; difflib decides, as get_close_matches
+        # did: best ratio >= cutoff, ties to the alphabetically last phrase
+        best = None
+        for variation in self._fuzzy.candidates(text_lower, self.phrase_cutoff):
+            score = difflib.SequenceMatcher(None, variation, text_lower).ratio()
+            if score >= self.phrase_cutoff and (best is None or (score, variation) > best):
+                best = (score, variation)
+        if best:
+            return self._variation_command[best[1]]
+        
+        # Strategy 4: Word-by-word matching, first word with a close phrase wins;
+        # within a word the first variation in command_map order above the cutoff
+        for word in text_lower.split():
+            for variation in self._fuzzy.candidates(word, self.word_cutoff):
+                if word == variation or difflib.SequenceMatcher(None, word, variation).ratio() > self.word_cutoff:
+                    return self._variation_command[variation]
+        
+        return None
+
+    def _match_exact(self, text_lower):
+        """Strategies 1 and 2 of _match_command: no fuzzy scoring"""
+        # One automaton pass finds every variation and variation word in the text
+        found = self._matcher.found(text_lower)
+        
+        # Strategy 1: Exact phrase match (earliest command in command_map wins)
+        phrases = [phrase for phrase in found if phrase in self._variation_command]
+        if phrases:
+            return self._variation_command[min(phrases, key=self._variation_rank.get)]
+        
+        # Strategy 2: Check if command words appear in transcription
+        candidates = {variation for word in found for variation in self._word_variations.get(word, ())}
+        complete = [variation for variation in candidates if all(word in found for word in variation.split())]
+        if complete:
+            return self._variation_command[min(complete, key=self._variation_rank.get)]
+        
+        return None
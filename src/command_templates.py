@@ -0,0 +1,139 @@
+# command_templates.py - Few-shot fast path that recognises enrolled commands without Whisper
+"""
+The user records a few examples of the commands they use most
+("pause", "louder", ...). Each recording is stored as an MFCC sequence.
+A new utterance is first compared to every template with a cheap
+embedding (per-coefficient mean and spread) to shortlist candidates,
+then the shortlist is re-ranked with DTW. The command is accepted only
+when it is within the enrolled spread for that command and clearly
+closer than the runner-up; anything else falls back to Whisper.
+
+The runner-up check is what rejects words that merely resemble a
+template, so the fast path stays off until at least MIN_COMMANDS
+commands have usable recordings.
+"""
+import numpy as np
+
+import app_config
+from audio_features import mfcc, dtw_distance
+
+TEMPLATES_FILE = "command_templates.npz"
+MAX_QUICK_SECONDS = 1.6   # Longer utterances are sentences - leave them to Whisper
+SHORTLIST_SIZE = 4        # Templates re-ranked with DTW after the embedding search
+THRESHOLD_MARGIN = 1.3    # Accept up to 30% beyond the spread between enrolled takes
+RUNNER_UP_RATIO = 0.8     # Best match must be at least 20% closer than another command
+MIN_COMMANDS = 2          # Commands with two or more takes needed before the fast path answers
+
+
+def _embedding(features):
+    """Fixed-size summary of an MFCC sequence for the nearest-neighbour prefilter"""
+    return np.concatenate((features.mean(axis=0), features.std(axis=0)))
+
+
+class CommandTemplateClassifier:
+    """Nearest-neighbour classifier over enrolled command recordings"""
+
+    def __init__(self, path=None, sample_rate=16000):
+        self.path = path or app_config.data_path(TEMPLATES_FILE)
+        self.sample_rate = sample_rate
+        self.templates = {}   # command -> list of MFCC arrays
+        self.thresholds = {}  # command -> accepted DTW distance
+        self._index = None
+        self.load()
+
+    def enroll(self, command, audio):
+        """Add one recorded example of a command; returns how many the command now has"""
+        self.templates.setdefault(command, []).append(mfcc(audio, self.sample_rate))
+        self._update_threshold(command)
+        self._index = None
+        self.save()
+        return len(self.templates[command])
+
+    def clear(self, command=None):
+        """Forget one command's recordings, or all of them"""
+        if command is None:
+            self.templates = {}
+            self.thresholds = {}
+        else:
+            self.templates.pop(command, None)
+            self.thresholds.pop(command, None)
+        self._index = None
+        self.save()
+
+    def sample_counts(self):
+        return {command: len(samples) for command, samples in self.templates.items()}
+
+    @property
+    def is_active(self):
+        """True once enough commands are enrolled for classify() to answer"""
+        return len(self.thresholds) >= MIN_COMMANDS
+
+    def _update_threshold(self, command):
+        samples = self.templates[command]
+        if len(samples) < 2:
+            self.thresholds.pop(command, None)  # One take says nothing about natural variation
+            return
+        spread = max(dtw_distance(a, b) for i, a in enumerate(samples) for b in samples[i + 1:])
+        self.thresholds[command] = spread * THRESHOLD_MARGIN
+
+    def _build_index(self):
+        """Stack every usable template's embedding into one matrix for vectorized search"""
+        labels, sequences, embeddings = [], [], []
+        for command, samples in self.templates.items():
+            if command not in self.thresholds:
+                continue
+            for features in samples:
+                labels.append(command)
+                sequences.append(features)
+                embeddings.append(_embedding(features))
+        matrix = np.stack(embeddings) if embeddings else np.zeros((0, 1), dtype=np.float32)
+        self._index = (labels, sequences, matrix)
+
+    def classify(self, audio):
+        """Return (command, confidence) for a confident match, else (None, 0.0)"""
+        if self._index is None:
+            self._build_index()
+        labels, sequences, matrix = self._index
+        if not self.is_active or len(audio) > MAX_QUICK_SECONDS * self.sample_rate:
+            return None, 0.0  # With one command there is no runner-up to tell it from any short word
+
+        features = mfcc(audio, self.sample_rate)
+        gaps = np.linalg.norm(matrix - _embedding(features), axis=1)
+        order = np.argsort(gaps)
+        shortlist = list(order[:SHORTLIST_SIZE])
+        # Always re-rank at least one other command so the runner-up check means something
+        if len({labels[i] for i in shortlist}) == 1:
+            shortlist += [i for i in order[SHORTLIST_SIZE:] if labels[i] != labels[shortlist[0]]][:1]
+
+        best = {}
+        for i in shortlist:
+            distance = dtw_distance(features, sequences[i])
+            command = labels[i]
+            best[command] = min(distance, best.get(command, np.inf))
+
+        ranked = sorted(best.items(), key=lambda item: item[1])
+        command, distance = ranked[0]
+        if distance > self.thresholds[command]:
+            return None, 0.0
+        runner_up = ranked[1][1]
+        if distance > RUNNER_UP_RATIO * runner_up:
+            return None, 0.0
+        return command, float(1.0 - distance / runner_up)
+
+    def save(self):
+        arrays = {}
+        for command, samples in self.templates.items():
+            for i, features in enumerate(samples):
+                arrays[f"{command}::{i}"] = features
+        np.savez(self.path, **arrays)
+
+    def load(self):
+        try:
+            with np.load(self.path) as data:
+                for key in sorted(data.files, key=lambda k: (k.rsplit("::", 1)[0], int(k.rsplit("::", 1)[1]))):
+                    command = key.rsplit("::", 1)[0]
+                    self.templates.setdefault(command, []).append(data[key])
+        except (OSError, ValueError):
+            self.templates = {}
+        for command in self.templates:
+            self._update_threshold(command)
@@ -1,16 +1,22 @@
 # fullscreen_widget.py - Fullscreen video display widget
-import sys
 from PyQt6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QSlider, QLabel
 from PyQt6.QtCore import Qt, QTimer, QPropertyAnimation, QRect
 from PyQt6.QtGui import QCursor
+from seek_preview import SeekPreview
+
+SEEK_STEP_MS = 10000  # Left/Right arrow keys
 
 
 class FullscreenVideoWidget(QWidget):
     """Fullscreen video-only display widget with auto-hiding controls"""
     
-    def __init__(self, media_player, parent=None):
+    def __init__(self, video_player, parent=None, clock=None, thumbnails=None):
         super().__init__(parent)
-        self.media_player = media_player
+        # The VideoPlayer, not its libvlc player: profile switches and playlist swaps replace that
+        self.video_player = video_player
+        self.clock = clock  # Shared PlaybackClock - the main window's, so both views agree
+        self.thumbnails = thumbnails  # Shared ThumbnailCache for seek previews
+        self.seek_preview = None
         self.parent_window = parent
         self.setWindowFlags(Qt.WindowType.FramelessWindowHint | Qt.WindowType.WindowStaysOnTopHint)
         self.setStyleSheet("background-color: black;")
@@ -25,9 +31,8 @@ class FullscreenVideoWidget(QWidget):
         self.hide_timer.timeout.connect(self.hide_controls)
         self.hide_timer.setSingleShot(True)
         
-        # Set the video output to this widget
-        if sys.platform.startswith('win'):
-            self.media_player.set_hwnd(self.winId())
+        # Set the video output to this widget; VideoPlayer keeps it across player rebuilds
+        self.video_player.set_window(self.winId())
         
         self.setup_ui()
         self.setup_shortcuts()
@@ -65,6 +70,8 @@ class FullscreenVideoWidget(QWidget):
         self.progress_slider.setRange(0, 1000)
         self.progress_slider.setStyleSheet(ui_styles.PROGRESS_SLIDER_STYLE)
         controls_layout.addWidget(self.progress_slider)
+        if self.thumbnails is not None:
+            self.seek_preview = SeekPreview(self.progress_slider, self.thumbnails)
         
         # Buttons row
         buttons_layout = QHBoxLayout()
@@ -113,6 +120,7 @@ class FullscreenVideoWidget(QWidget):
         self.exit_fullscreen_btn.clicked.connect(self.close)
         self.voice_btn.clicked.connect(self.trigger_voice_command)
         self.progress_slider.sliderMoved.connect(self.on_slider_moved)
+        self.progress_slider.sliderReleased.connect(self.on_slider_released)
         
         # Position controls panel at bottom (hidden initially)
         self.position_controls()
@@ -122,10 +130,13 @@ class FullscreenVideoWidget(QWidget):
         self.voice_panel.move(self.width() - 180, 20)
         self.voice_panel.show()
         
-        # Update timer for timestamp
-        self.update_timer = QTimer()
-        self.update_timer.timeout.connect(self.update_ui)
-        self.update_timer.start(500)
+        # Follow the shared playback clock instead of polling libvlc
+        if self.clock is not None:
+            self.clock.time_changed.connect(self.update_ui)
+            self.clock.duration_changed.connect(self.update_ui)
+            self.clock.playing_changed.connect(self.update_play_button)
+            self.update_play_button(self.clock.is_playing)
+            self.update_ui()
     
     def setup_shortcuts(self):
         """Create shortcuts for fullscreen mode"""
@@ -186,22 +197,14 @@ class FullscreenVideoWidget(QWidget):
         if hasattr(self, 'voice_panel'):
             self.voice_panel.move(self.width() - 180, 20)
     
-    def update_ui(self):
-        """Update UI elements"""
-        if self.media_player and self.media_player.is_playing():
-            # Update progress
-            position = int(self.media_player.get_position() * 1000)
-            self.progress_slider.setValue(position)
-            
-            # Update timestamp
-            current_time = self.media_player.get_time()
-            duration = self.media_player.get_length()
-            self.timestamp_label.setText(f"{self.format_time(current_time)} / {self.format_time(duration)}")
-            
-            # Update play/pause button
-            self.play_pause_btn.setText("⏸ Pause")
-        else:
-            self.play_pause_btn.setText("▶ Play")
+    def update_ui(self, *_args):
+        """Update progress and timestamp from the playback clock"""
+        if not self.progress_slider.isSliderDown():
+            self.progress_slider.setValue(self.clock.position)
+        self.timestamp_label.setText(f"{self.format_time(self.clock.time_ms)} / {self.format_time(self.clock.duration_ms)}")
+
+    def update_play_button(self, playing):
+        self.play_pause_btn.setText("⏸ Pause" if playing else "▶ Play")
     
     def format_time(self, milliseconds):
         """Convert milliseconds to HH:MM:SS format"""
@@ -217,11 +220,25 @@ class FullscreenVideoWidget(QWidget):
         """Handle slider movement"""
         if self.parent_window:
             self.parent_window.set_position(position)
+
+    def on_slider_released(self):
+        """Land exactly where the drag ended"""
+        if self.parent_window:
+            self.parent_window.set_position(self.progress_slider.value(), precise=True)
+
+    def seek_backward(self):
+        if self.parent_window:
+            self.parent_window.seek_relative(-SEEK_STEP_MS)
+
+    def seek_forward(self):
+        if self.parent_window:
+            self.parent_window.seek_relative(SEEK_STEP_MS)
     
     def trigger_voice_command(self):
         """Trigger voice command from parent window"""
         if self.parent_window and hasattr(self.parent_window, 'start_voice_recording'):
-            self.parent_window.start_voice_recording()
+            # No button to hold in fullscreen - VAD ends the capture, 4s is only the cap
+            self.parent_window.start_voice_recording(max_duration=4)
             self.voice_status.setText("Listening...")
     
     def keyPressEvent(self, event):
@@ -244,8 +261,15 @@ class FullscreenVideoWidget(QWidget):
     
     def closeEvent(self, event):
         """Restore video to main window when closing fullscreen"""
-        if hasattr(self, 'update_timer'):
-            self.update_timer.stop()
+        if self.clock is not None:
+            # The clock outlives this widget - stop it calling into a closed view
+            self.clock.time_changed.disconnect(self.update_ui)
+            self.clock.duration_changed.disconnect(self.update_ui)
+            self.clock.playing_changed.disconnect(self.update_play_button)
+            self.clock = None
+        if self.seek_preview is not None:
+            self.seek_preview.detach()
+            self.seek_preview = None
         if self.parent_window:
             self.parent_window.exit_fullscreen()
         event.accept()
\ No newline at end of file
@@ -0,0 +1,121 @@
+# fuzzy_index.py - Approximate phrase lookup with an n-gram index and bounded edit distance
+"""
+Scores are 2 * common characters / total length, where "common" is the
+longest common subsequence. This is NOT difflib's ratio: SequenceMatcher
+counts greedily chosen matching blocks, which can be fewer characters than
+the LCS, so its ratio is never higher than this score and is often lower.
+The same cutoff therefore accepts more phrases here than in difflib.
+What does hold is the bound: a phrase difflib scores at or above a
+cutoff always scores at or above it here too. candidates() relies on
+that to return a superset, and the parser re-scores it with difflib.
+In edit-distance terms the score is 1 - d / (len(a) + len(b)), with d
+the insert/delete distance, so a cutoff fixes the largest distance worth
+computing.
+
+Phrases are indexed once by characters and padded bigrams. For a query,
+only phrases sharing a character are considered, best upper bound first.
+The character overlap bounds the common subsequence (like difflib's
+quick_ratio), and the q-gram lemma (one edit destroys at most n of a
+string's n-grams) bounds the distance. A phrase is only scored when both
+bounds can still beat the cutoff or the current top `limit`. Scoring
+uses a bit-parallel LCS over precomputed character masks, costing one
+big-int step per query character.
+"""
+from collections import Counter
+
+PAD = "\x00"
+
+
+def _grams(text, n):
+    padded = PAD * (n - 1) + text + PAD * (n - 1)
+    return Counter(padded[i:i + n] for i in range(len(padded) - n + 1))
+
+
+def _char_masks(text):
+    """Bit i of masks[char] is set where text[i] == char"""
+    masks = {}
+    for i, char in enumerate(text):
+        masks[char] = masks.get(char, 0) | (1 << i)
+    return masks
+
+
+def lcs_length(text, masks, length):
+    """Longest common subsequence of text and the string behind masks (Hyyro's bit-vector algorithm)"""
+    full = (1 << length) - 1
+    row = full
+    for char in text:
+        matches = row & masks.get(char, 0)
+        row = ((row + matches) | (row - matches)) & full
+    return length - bin(row).count("1")
+
+
+class FuzzyIndex:
+    """Ranked approximate matching against a fixed phrase list"""
+
+    def __init__(self, phrases, n=2):
+        self.n = n
+        self.phrases = list(dict.fromkeys(phrases))
+        self._ids = {phrase: phrase_id for phrase_id, phrase in enumerate(self.phrases)}
+        self._masks = [_char_masks(phrase) for phrase in self.phrases]
+        self._postings = {}       # n-gram -> [(phrase id, count in phrase)]
+        self._char_postings = {}  # character -> [(phrase id, count in phrase)]
+        for phrase_id, phrase in enumerate(self.phrases):
+            for gram, count in _grams(phrase, n).items():
+                self._postings.setdefault(gram, []).append((phrase_id, count))
+            for char, count in Counter(phrase).items():
+                self._char_postings.setdefault(char, []).append((phrase_id, count))
+
+    @staticmethod
+    def _overlap(query_counts, postings):
+        """Per phrase, how many of the query's items (with multiplicity) it also has"""
+        shared = {}
+        for item, query_count in query_counts.items():
+            for phrase_id, count in postings.get(item, ()):
+                shared[phrase_id] = shared.get(phrase_id, 0) + min(query_count, count)
+        return shared
+
+    def candidates(self, text, cutoff=0.5):
+        """Phrases scoring at least cutoff, in the order they were indexed
+
+        A superset of what difflib.SequenceMatcher would accept at the same
+        cutoff, since its ratio never exceeds the LCS score.
+        """
+        matches = self.search(text, cutoff, limit=len(self.phrases))
+        return sorted((phrase for phrase, _ in matches), key=self._ids.get)
+
+    def search(self, text, cutoff=0.5, limit=5):
+        """Phrases scoring at least cutoff, best first: [(phrase, score), ...]"""
+        if not text or limit <= 0:
+            return []
+        common_chars = self._overlap(Counter(text), self._char_postings)
+        shared_grams = self._overlap(_grams(text, self.n), self._postings)
+
+        # Shared characters bound the common subsequence, so this bounds the score
+        bounds = []
+        for phrase_id, common in common_chars.items():
+            upper = 2.0 * common / (len(text) + len(self.phrases[phrase_id]))
+            if upper >= cutoff:
+                bounds.append((-upper, phrase_id))
+        bounds.sort()
+
+        results = []
+        floor = cutoff  # Rises to the current limit-th best score once the list is full
+        for negative_upper, phrase_id in bounds:
+            if -negative_upper < floor:
+                break  # Every remaining phrase has a lower upper bound
+            phrase = self.phrases[phrase_id]
+            total = len(text) + len(phrase)
+            bound = int((1.0 - floor) * total + 1e-9)
+            # q-gram lemma: each edit removes at most n of the padded n-grams
+            if shared_grams.get(phrase_id, 0) < max(len(text), len(phrase)) + self.n - 1 - bound * self.n:
+                continue
+            score = 2.0 * lcs_length(text, self._masks[phrase_id], len(phrase)) / total
+            if score >= floor:
+                results.append((-score, phrase_id))
+                if len(results) >= limit:
+                    results.sort()
+                    del results[limit:]
+                    floor = max(floor, -results[-1][0])
+
+        results.sort()
+        return [(self.phrases[phrase_id], -score) for score, phrase_id in results[:limit]]
@@ -0,0 +1,187 @@
+# keyword_spotter.py - Lightweight wake-word detection for hands-free voice control
+"""
+The wake phrase is enrolled by saying it a few times; each recording is
+stored as an MFCC template. While hands-free mode is on, WakeWordListener
+follows the shared microphone ring buffer with the energy VAD and only
+computes features for short voiced segments, which are matched against
+the templates with DTW. Whisper never runs until the wake phrase is heard,
+so idle cost is one RMS per 30ms frame.
+"""
+import threading
+
+import numpy as np
+from PyQt6.QtCore import QThread, pyqtSignal
+
+import app_config
+from audio_features import mfcc, dtw_distance
+from vad import EnergyVAD
+
+WAKE_WORD_FILE = "wake_word.npz"
+ENROLLMENT_SAMPLES = 3
+MIN_WAKE_SECONDS = 0.25   # Shorter voiced bursts are clicks/coughs
+MAX_WAKE_SECONDS = 2.0    # Longer ones are sentences or programme audio
+THRESHOLD_MARGIN = 1.3    # Accept up to 30% beyond the spread between enrolled takes
+WAKE_HANGOVER_MS = 250
+
+
+class KeywordSpotter:
+    """DTW template matcher for an enrolled wake phrase"""
+
+    def __init__(self, path=None, sample_rate=16000):
+        self.path = path or app_config.data_path(WAKE_WORD_FILE)
+        self.sample_rate = sample_rate
+        self.templates = []
+        self.threshold = None
+        self.load()
+
+    @property
+    def is_enrolled(self):
+        return len(self.templates) >= 2 and self.threshold is not None
+
+    def add_template(self, audio):
+        """Store one spoken example of the wake phrase"""
+        self.templates.append(mfcc(audio, self.sample_rate))
+        self._update_threshold()
+
+    def clear(self):
+        self.templates = []
+        self.threshold = None
+
+    def _update_threshold(self):
+        if len(self.templates) < 2:
+            self.threshold = None
+            return
+        # Calibrate against how much the user's own takes differ from each other
+        spread = max(dtw_distance(a, b)
+                     for i, a in enumerate(self.templates)
+                     for b in self.templates[i + 1:])
+        self.threshold = spread * THRESHOLD_MARGIN
+
+    def score(self, audio):
+        """Smallest DTW distance between the audio and any template"""
+        features = mfcc(audio, self.sample_rate)
+        return min(dtw_distance(features, template) for template in self.templates)
+
+    def detect(self, audio):
+        """True if the audio matches the enrolled wake phrase"""
+        if not self.is_enrolled:
+            return False
+        return self.score(audio) <= self.threshold
+
+    def save(self):
+        arrays = {f"template_{i}": template for i, template in enumerate(self.templates)}
+        np.savez(self.path, threshold=np.float32(self.threshold or 0.0), **arrays)
+
+    def load(self):
+        try:
+            with np.load(self.path) as data:
+                names = sorted((k for k in data.files if k.startswith("template_")),
+                               key=lambda k: int(k.split("_")[1]))
+                self.templates = [data[name] for name in names]
+                self.threshold = float(data["threshold"]) or None
+        except (OSError, KeyError, ValueError):
+            self.clear()
+
+
+class WakeWordListener(QThread):
+    """Watches the always-on microphone stream for the wake phrase"""
+    wake_detected = pyqtSignal()
+    enrollment_progress = pyqtSignal(int, int)  # Samples recorded, samples needed
+
+    def __init__(self, mic, spotter=None):
+        super().__init__()
+        self.mic = mic
+        self.spotter = spotter or KeywordSpotter(sample_rate=mic.sample_rate)
+        self._running = threading.Event()
+        self._paused = threading.Event()
+        self._enroll_needed = 0
+        self._enrolled = 0
+        self.noise_floor = None  # Background level tracked between utterances, for the command capture
+
+    def start_listening(self):
+        """Start (or un-pause) continuous wake-word detection"""
+        self._paused.clear()
+        if not self.isRunning():
+            self._running.set()
+            self.start()
+
+    def stop_listening(self):
+        """Stop the listener thread"""
+        self._running.clear()
+        self.wait()
+
+    def pause(self):
+        """Ignore audio (e.g. while a command is being captured)"""
+        self._paused.set()
+
+    def resume(self):
+        self._paused.clear()
+
+    def start_enrollment(self, samples=ENROLLMENT_SAMPLES):
+        """Treat the next voiced segments as wake-phrase examples instead of detecting"""
+        self.spotter.clear()
+        self._enroll_needed = samples
+        self._enrolled = 0
+        self.start_listening()
+
+    @property
+    def is_enrolling(self):
+        return self._enrolled < self._enroll_needed
+
+    def run(self):
+        ring = self.mic.ring
+        sample_rate = self.mic.sample_rate
+        vad = EnergyVAD(sample_rate, hangover_ms=WAKE_HANGOVER_MS)
+        if self.noise_floor is not None:
+            vad.reset(noise_floor=self.noise_floor)
+        processed = ring.total_written
+        segment_base = processed  # Absolute sample index of the VAD's frame 0
+
+        while self._running.is_set():
+            ring.wait_for(processed + self.mic.block_size, timeout=0.2)
+            end = ring.total_written
+            if end <= processed:
+                continue
+
+            if self._paused.is_set():
+                # Skip audio heard while paused and start fresh afterwards
+                processed = segment_base = end
+                vad.reset(noise_floor=vad.noise_floor)
+                continue
+
+            ended = vad.process(ring.view(processed, end))
+            processed = end
+            self.noise_floor = vad.noise_floor  # The VAD only adapts it while nobody is talking
+
+            if ended:
+                start, stop = vad.speech_bounds(padding_ms=50)
+                audio = ring.view(segment_base + start, segment_base + stop)
+                self._handle_segment(audio, sample_rate)
+                vad.reset(noise_floor=vad.noise_floor)
+                segment_base = processed
+            elif not vad.in_speech and vad.frames_seen > 1000:
+                # Long silence - rebase so frame counters stay small
+                vad.reset(noise_floor=vad.noise_floor)
+                segment_base = processed
+
+    def _handle_segment(self, audio, sample_rate):
+        duration = len(audio) / sample_rate
+        if not MIN_WAKE_SECONDS <= duration <= MAX_WAKE_SECONDS:
+            return
+
+        if self.is_enrolling:
+            self.spotter.add_template(audio)
+            self._enrolled += 1
+            if not self.is_enrolling:
+                self.spotter.save()
+                print(f"👂 Wake word enrolled (threshold {self.spotter.threshold:.2f})")
+            self.enrollment_progress.emit(self._enrolled, self._enroll_needed)
+            return
+
+        if not self.spotter.is_enrolled:
+            return
+        score = self.spotter.score(audio)
+        if score <= self.spotter.threshold:
+            print(f"👂 Wake word detected (score {score:.2f})")
+            self._paused.set()  # The GUI resumes us once the command is handled
+            self.wake_detected.emit()
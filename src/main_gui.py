@@ -2,15 +2,25 @@ import os
 import sys
 from PyQt6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, 
                             QHBoxLayout, QPushButton, QSlider, QLabel, 
-                            QFileDialog, QMessageBox, QFrame, QDialog)
+                            QFileDialog, QMessageBox, QFrame, QDialog, QComboBox,
+                            QStackedLayout)
 from PyQt6.QtCore import Qt
 from PyQt6.QtGui import QKeySequence, QShortcut
 
 # Import our custom modules
-from video_player import VideoPlayer
+import app_config
+import startup_metrics
+from video_player import VideoPlayer, PLAYING, ERROR
 from fullscreen_widget import FullscreenVideoWidget
+from media_index import MediaIndex, chapter_names
+from thumbnail_cache import ThumbnailCache
+from playlist import Playlist
+from seek_preview import SeekPreview
 from The_Worker_Thread import VoiceWorker
+from keyword_spotter import WakeWordListener
+from audio_stream import PRE_ROLL_SECONDS
 import ui_styles
+import vlc_profiles
 
 
 class VLCPlayerGUI(QMainWindow):
@@ -19,17 +29,31 @@ class VLCPlayerGUI(QMainWindow):
     def __init__(self):
         super().__init__()
         self.video_player = VideoPlayer()
+        self.playlist = Playlist(self.video_player, self)
         self.current_file = None
+        self.current_metadata = None  # From the media index; known before playback starts
+        self.media_index = MediaIndex()
+        self.thumbnails = ThumbnailCache(parent=self)
         self.is_fullscreen = False
         self.fullscreen_widget = None
         
         # Voice control setup
         self.voice_thread = VoiceWorker() # Initialize the worker
+        self.wake_listener = WakeWordListener(self.voice_thread.engine.mic)
+        self.hands_free = False
         self.is_recording = False
         self.slider_being_dragged = False
+        self.voice_ready = None  # None while the model is still loading
         
         self.init_ui()
         self.connect_signals()
+        # The first-run ASR autotune spawns benchmark processes - only while nothing plays
+        self.voice_thread.engine.is_idle = lambda: self.video_player.state != PLAYING
+        self.voice_thread.warm_up()  # Model loads in the background; UI shows "warming up"
+        
+        # Restore hands-free mode from the last session
+        if app_config.get_section("voice").get("hands_free") and self.wake_listener.spotter.is_enrolled:
+            self.hands_free_btn.setChecked(True)
         
     def init_ui(self):
         """Initialize the user interface"""
@@ -41,12 +65,13 @@ class VLCPlayerGUI(QMainWindow):
         self.setCentralWidget(central_widget)
         main_layout = QVBoxLayout(central_widget)
         
-        # Video display area
-        self.video_frame = QWidget()
-        self.video_frame.setStyleSheet(ui_styles.VIDEO_FRAME_STYLE)
-        self.video_frame.setMinimumHeight(420)
-        self.video_frame.mouseDoubleClickEvent = self.toggle_fullscreen
-        main_layout.addWidget(self.video_frame)
+        # Video display area: two stacked frames, so a prefetched playlist item can take over without a gap
+        self.video_stack = QStackedLayout()
+        self.video_frame = self.create_video_frame()    # The one on screen
+        self.standby_frame = self.create_video_frame()  # Where the next playlist item waits
+        self.video_stack.addWidget(self.video_frame)
+        self.video_stack.addWidget(self.standby_frame)
+        main_layout.addLayout(self.video_stack)
         
         # Controls area
         controls_layout = QVBoxLayout()
@@ -54,6 +79,7 @@ class VLCPlayerGUI(QMainWindow):
         self.progress_slider.setRange(0, 1000)
         self.progress_slider.setStyleSheet(ui_styles.PROGRESS_SLIDER_STYLE)
         controls_layout.addWidget(self.progress_slider)
+        self.seek_preview = SeekPreview(self.progress_slider, self.thumbnails)
         
         buttons_layout = QHBoxLayout()
         self.open_btn = QPushButton(ui_styles.BUTTON_TEXTS['open'])
@@ -107,8 +133,8 @@ class VLCPlayerGUI(QMainWindow):
         
         # UPDATED: Voice control UI
         voice_indicator_layout = QHBoxLayout()
-        self.voice_status_label = QLabel("🎤 Whisper Engine: Standby")
-        self.voice_status_label.setStyleSheet("color: #888888; font-weight: bold;")
+        self.voice_status_label = QLabel("🎤 Whisper Engine: Warming up...")
+        self.voice_status_label.setStyleSheet("color: #f39c12; font-weight: bold;")
         voice_indicator_layout.addWidget(self.voice_status_label)
         voice_indicator_layout.addStretch()
         
@@ -116,16 +142,24 @@ class VLCPlayerGUI(QMainWindow):
         self.voice_cmd_btn = QPushButton("🎤 Hold to Speak")
         self.voice_cmd_btn.setStyleSheet(ui_styles.BUTTON_STYLE)
         self.voice_cmd_btn.setMinimumWidth(150)
-        # Connect to the recording trigger
-        self.voice_cmd_btn.clicked.connect(self.start_voice_recording)
+        # Push-to-talk: capture while the button is held down
+        self.voice_cmd_btn.pressed.connect(self.start_voice_recording)
+        self.voice_cmd_btn.released.connect(self.stop_voice_recording)
         
         voice_indicator_layout.addWidget(self.voice_cmd_btn)
+        
+        # Hands-free: a wake phrase starts the capture instead of the button
+        self.hands_free_btn = QPushButton("👂 Hands-free: Off")
+        self.hands_free_btn.setCheckable(True)
+        self.hands_free_btn.setStyleSheet(ui_styles.BUTTON_STYLE)
+        self.hands_free_btn.toggled.connect(self.toggle_hands_free)
+        voice_indicator_layout.addWidget(self.hands_free_btn)
         controls_layout.addLayout(voice_indicator_layout)
         
         main_layout.addLayout(controls_layout)
         
-        if sys.platform.startswith('win'):
-            self.video_player.media_player.set_hwnd(self.video_frame.winId())
+        self.video_player.set_window(self.video_frame.winId())
+        self.video_player.set_standby_window(self.standby_frame.winId())
         
         # Initialize volume
         initial_volume = self.volume_slider.value()
@@ -157,6 +191,9 @@ class VLCPlayerGUI(QMainWindow):
         self.open_btn.clicked.connect(self.open_file)
         self.play_btn.clicked.connect(self.play_video)
         self.pause_btn.clicked.connect(self.pause_video)
+        # A button pressed right after an unrecognised voice command teaches the cache
+        self.play_btn.clicked.connect(lambda: self.voice_thread.confirm_command("play", manual=True))
+        self.pause_btn.clicked.connect(lambda: self.voice_thread.confirm_command("pause", manual=True))
         self.settings_btn.clicked.connect(self.show_settings)
         self.volume_slider.valueChanged.connect(self.set_volume)
         self.progress_slider.sliderMoved.connect(self.set_position)
@@ -164,27 +201,140 @@ class VLCPlayerGUI(QMainWindow):
         self.progress_slider.sliderReleased.connect(self.on_slider_released)
         self.video_player.position_changed.connect(self.update_progress)
         self.video_player.duration_changed.connect(self.update_duration)
+        self.video_player.state_changed.connect(self.on_player_state)
+        self.video_player.output_swapped.connect(self.on_output_swapped)
+        # After a jump, make the thumbnails around the new position first
+        self.video_player.seeker.seeked.connect(self.thumbnails.focus)
+        self.playlist.current_changed.connect(self.on_playlist_item)
+        self.media_index.metadata_ready.connect(self.on_media_metadata)
 
         # Voice Thread Signals
         self.voice_thread.command_found.connect(self.handle_voice_command)
         self.voice_thread.finished_processing.connect(self.reset_voice_ui)
         self.voice_thread.transcription_done.connect(self.show_transcription)
+        self.voice_thread.engine_ready.connect(self.on_voice_engine_ready)
+        self.voice_thread.sample_enrolled.connect(self.on_quick_sample_enrolled)
+        
+        # Wake word signals
+        self.wake_listener.wake_detected.connect(self.on_wake_word)
+        self.wake_listener.enrollment_progress.connect(self.on_wake_enrollment_progress)
+
+    def showEvent(self, event):
+        """Record time-to-first-frame the first time the window is shown"""
+        super().showEvent(event)
+        startup_metrics.mark("first_frame")
+
+    def on_voice_engine_ready(self, success):
+        """Whisper finished loading in the background"""
+        startup_metrics.mark("voice_ready")
+        self.voice_ready = success
+        if self.is_recording:
+            return  # reset_voice_ui will show the new state once the queued command finishes
+        self.voice_status_label.setText(self.voice_engine_status_text())
+        if success:
+            self.voice_status_label.setStyleSheet("color: #888888; font-weight: bold;")
+        else:
+            self.voice_status_label.setStyleSheet("color: #e74c3c; font-weight: bold;")
+
+    def voice_engine_status_text(self):
+        """Idle status line for the current model loading state"""
+        if self.voice_ready is None:
+            return "🎤 Whisper Engine: Warming up..."
+        if self.voice_ready:
+            return "🎤 Whisper Engine: Standby"
+        return "🎤 Whisper Engine: Failed to load"
 
-    def start_voice_recording(self):
-        """Triggered by the button to start the 4-second window"""
+    def toggle_hands_free(self, enabled):
+        """Switch the always-listening wake-word mode on or off"""
+        if enabled and not self.wake_listener.spotter.is_enrolled:
+            QMessageBox.information(self, "Hands-free",
+                                    "Record your wake word first (⚙ Settings → Record Wake Word).")
+            self.hands_free_btn.setChecked(False)
+            return
+        
+        self.hands_free = enabled
+        self.hands_free_btn.setText("👂 Hands-free: On" if enabled else "👂 Hands-free: Off")
+        if enabled:
+            self.wake_listener.start_listening()
+        elif not self.wake_listener.is_enrolling:
+            self.wake_listener.stop_listening()
+        
+        app_config.load_config()["voice"]["hands_free"] = enabled
+        app_config.save_config()
+        
+        if self.fullscreen_widget and hasattr(self.fullscreen_widget, 'voice_status'):
+            self.fullscreen_widget.voice_status.setText("Say the wake word" if enabled else "Standby")
+
+    def on_wake_word(self):
+        """Wake phrase heard - capture the command that follows it"""
+        # No pre-roll: it would contain the wake phrase itself. So the VAD can't calibrate on
+        # it either - reuse the background level the wake listener has been tracking
+        self.start_voice_recording(max_duration=6, pre_roll=0, noise_floor=self.wake_listener.noise_floor)
         if not self.is_recording:
+            self.wake_listener.resume()  # Nothing started (engine unavailable or busy)
+
+    def on_wake_enrollment_progress(self, recorded, needed):
+        """Show wake word enrollment progress"""
+        if recorded < needed:
+            self.status_label.setText(f"🎙 Wake word sample {recorded}/{needed} recorded - say it again")
+            return
+        self.status_label.setText("✅ Wake word saved - hands-free mode is available")
+        if not self.hands_free:
+            self.wake_listener.stop_listening()
+
+    def start_wake_enrollment(self):
+        """Record the wake phrase a few times to build its templates"""
+        self.status_label.setText("🎙 Say your wake word (e.g. 'hey player') with a short pause after it")
+        self.wake_listener.start_enrollment()
+
+    def record_quick_command_sample(self, command):
+        """Record one example of a command for the Whisper-free fast path"""
+        self.status_label.setText(f"🎙 Say '{command}' now")
+        self.start_voice_recording(max_duration=3, enroll_command=command)
+
+    def clear_quick_command_samples(self, command):
+        """Forget recorded samples so the command goes back to Whisper"""
+        self.voice_thread.quick_commands.clear(command)
+        self.status_label.setText(f"🗑 Cleared quick command samples for '{command}'")
+
+    def on_quick_sample_enrolled(self, command, count):
+        """A quick-command sample was stored"""
+        if count < 2:
+            self.status_label.setText(f"🎙 '{command}': {count} sample - record at least one more")
+        elif not self.voice_thread.quick_commands.is_active:
+            self.status_label.setText(f"🎙 '{command}': {count} samples - record another command too")
+        else:
+            self.status_label.setText(f"✅ '{command}': {count} samples - recognised instantly")
+
+    def start_voice_recording(self, max_duration=8, pre_roll=PRE_ROLL_SECONDS, enroll_command=None,
+                              noise_floor=None):
+        """Start streaming capture; it ends on button release or after max_duration"""
+        if self.voice_ready is False and not enroll_command:
+            self.status_label.setText("❌ Voice engine unavailable")
+            return
+        if not self.is_recording and not self.voice_thread.is_busy:
             self.is_recording = True
-            self.voice_cmd_btn.setText("🔴 Listening... (4s)")
-            self.voice_cmd_btn.setEnabled(False)
+            self.voice_cmd_btn.setText("🔴 Listening... release to send")
             self.voice_cmd_btn.setStyleSheet("background-color: #e74c3c; color: white; font-weight: bold;")
-            self.voice_status_label.setText("🎤 Listening: Speak clearly now!")
+            if self.voice_ready:
+                self.voice_status_label.setText("🎤 Listening: Speak clearly now!")
+            else:
+                self.voice_status_label.setText("🎤 Listening: command will run once the engine has warmed up")
             self.voice_status_label.setStyleSheet("color: #e74c3c; font-weight: bold; font-size: 13px;")
             
             # Update fullscreen voice status if in fullscreen
             if self.fullscreen_widget and hasattr(self.fullscreen_widget, 'voice_status'):
                 self.fullscreen_widget.voice_status.setText("Listening...")
             
-            self.voice_thread.start() # Runs the 4s recording logic in background
+            if self.hands_free:
+                self.wake_listener.pause()  # Don't spot wake words inside the command
+            self.voice_thread.listen(max_duration, pre_roll, enroll_command, noise_floor) # Streams audio in background
+
+    def stop_voice_recording(self):
+        """Button released - stop capturing and hand the utterance to Whisper"""
+        if self.is_recording:
+            self.voice_thread.stop_recording()
+            self.voice_cmd_btn.setText("⏳ Transcribing...")
     
     def show_transcription(self, text):
         """Display what was heard"""
@@ -197,13 +347,28 @@ class VLCPlayerGUI(QMainWindow):
         self.voice_cmd_btn.setText("🎤 Hold to Speak")
         self.voice_cmd_btn.setEnabled(True)
         self.voice_cmd_btn.setStyleSheet(ui_styles.BUTTON_STYLE)
-        self.voice_status_label.setText("🎤 Whisper Engine: Standby")
+        self.voice_status_label.setText(self.voice_engine_status_text())
         
         # Update fullscreen voice status if in fullscreen
         if self.fullscreen_widget and hasattr(self.fullscreen_widget, 'voice_status'):
-            self.fullscreen_widget.voice_status.setText("Standby")
+            self.fullscreen_widget.voice_status.setText("Say the wake word" if self.hands_free else "Standby")
+        
+        # Listen for the next wake phrase
+        if self.hands_free:
+            self.wake_listener.resume()
 
     def handle_voice_command(self, command):
+        """Execute a matched command, or a batch of them in the order they were spoken"""
+        if isinstance(command, list):
+            # All in this one slot call, so the player never renders a half-applied batch
+            for item in command:
+                self._apply_voice_command(item)
+            if len(command) > 1:
+                self.status_label.setText(f"✅ Executed {len(command)} commands")
+            return
+        self._apply_voice_command(command)
+
+    def _apply_voice_command(self, command):
         """Execute logic based on the fuzzy-matched command"""
         if not command:
             self.status_label.setText("❌ No command recognized")
@@ -252,19 +417,80 @@ class VLCPlayerGUI(QMainWindow):
         elif command == "mute":
             self.volume_slider.setValue(0)
             self.status_label.setText("✅ Muted")
+        else:
+            return
+        self.voice_thread.confirm_command(command)
 
     # ... (Keep existing open_file, play_video, pause_video, etc. methods) ...
 
+    def create_video_frame(self):
+        frame = QWidget()
+        frame.setStyleSheet(ui_styles.VIDEO_FRAME_STYLE)
+        frame.setMinimumHeight(420)
+        frame.mouseDoubleClickEvent = self.toggle_fullscreen
+        return frame
+
     def open_file(self):
-        file_path, _ = QFileDialog.getOpenFileName(self, "Open Video", "", "Videos (*.mp4 *.mkv *.avi)")
-        if file_path:
-            self.current_file = file_path
-            self.status_label.setText(f"Loaded: {os.path.basename(file_path)}")
+        # Several files at once make a playlist that plays through without gaps
+        file_paths, _ = QFileDialog.getOpenFileNames(self, "Open Video", "", "Videos (*.mp4 *.mkv *.avi)")
+        if file_paths:
+            self.playlist.set_items(file_paths)
+
+    def on_playlist_item(self, index, file_path):
+        """A playlist item became current - opened by the user or reached by playback"""
+        self.current_file = file_path
+        self.current_metadata = None
+        self.thumbnails.cancel()  # Stop extracting frames for the previous file
+        self.status_label.setText(f"Loaded: {self.playlist_label(file_path)}")
+        # Instant for files seen before; otherwise parsed in the background
+        metadata = self.media_index.request(file_path)
+        if metadata is not None:
+            self.on_media_metadata(file_path, metadata)
+
+    def playlist_label(self, file_path):
+        name = os.path.basename(file_path)
+        if len(self.playlist.items) > 1:
+            name += f" [{self.playlist.index + 1}/{len(self.playlist.items)}]"
+        return name
+
+    def on_output_swapped(self, window_id):
+        """The standby player took over - show its frame; the other one waits for the next item"""
+        if int(self.standby_frame.winId()) == int(window_id):
+            self.video_frame, self.standby_frame = self.standby_frame, self.video_frame
+            self.video_stack.setCurrentWidget(self.video_frame)
+
+    def on_media_metadata(self, file_path, metadata):
+        """Show duration and resolution of the loaded file without playing it"""
+        if file_path != self.current_file:
+            return
+        self.current_metadata = metadata
+        details = [self.format_time(metadata["duration_ms"])]
+        if metadata["width"]:
+            details.append(f"{metadata['width']}x{metadata['height']}")
+        self.status_label.setText(f"Loaded: {self.playlist_label(file_path)} ({', '.join(details)})")
+        self.update_timestamp()
+        aspect = metadata["width"] / metadata["height"] if metadata["height"] else None
+        self.thumbnails.load(file_path, metadata["duration_ms"], aspect, self.playback_position(file_path))
+
+    def on_player_state(self, state):
+        """Report failures; chapter names are only available from a playing player - index them once"""
+        if state == ERROR:
+            self.status_label.setText(f"❌ Could not play {os.path.basename(self.video_player.loaded_path or '')}")
+            return
+        if state != PLAYING or self.current_metadata is None or self.current_metadata["chapters"] is not None:
+            return
+        chapters = chapter_names(self.video_player.media_player)
+        self.current_metadata["chapters"] = chapters
+        self.media_index.update_chapters(self.current_file, chapters)
 
     def play_video(self):
         if self.current_file:
-            self.video_player.load_video(self.current_file)
-            self.status_label.setText("Playing...")
+            resume = self.video_player.load_video(self.current_file)
+            if resume is not None:
+                self.volume_slider.setValue(resume.volume)  # Volume and speed come back with the position
+                self.status_label.setText(f"▶ Resumed at {self.format_time(resume.position_ms)}")
+            else:
+                self.status_label.setText("Playing...")
         else:
             QMessageBox.warning(self, "Warning", "Select a file first")
 
@@ -318,6 +544,63 @@ class VLCPlayerGUI(QMainWindow):
         speed_normal_btn.clicked.connect(lambda: self.set_speed(1.0))
         speed_faster_btn.clicked.connect(lambda: self.set_speed(1.5))
         
+        # libvlc performance profile - switching rebuilds the player and keeps the position
+        profile_title = QLabel("Performance Profile")
+        profile_title.setStyleSheet("font-size: 18px; color: white; font-weight: bold;")
+        profile_title.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        layout.addWidget(profile_title)
+        
+        profile_combo = QComboBox()
+        profile_combo.addItems(vlc_profiles.profile_names())
+        profile_combo.setCurrentText(self.video_player.profile)
+        profile_combo.setStyleSheet("color: black; background-color: white; padding: 4px;")
+        profile_combo.currentTextChanged.connect(self.set_playback_profile)
+        layout.addWidget(profile_combo)
+        
+        # Quick commands: recorded samples recognised without Whisper
+        quick_title = QLabel("Quick Commands")
+        quick_title.setStyleSheet("font-size: 18px; color: white; font-weight: bold;")
+        quick_title.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        layout.addWidget(quick_title)
+        
+        quick_combo = QComboBox()
+        quick_combo.addItems(list(self.voice_thread.command_map.keys()))
+        quick_combo.setStyleSheet("color: black; background-color: white; padding: 4px;")
+        layout.addWidget(quick_combo)
+        
+        quick_record_btn = QPushButton("🎙 Record Sample")
+        quick_clear_btn = QPushButton("🗑 Clear Samples")
+        for btn in [quick_record_btn, quick_clear_btn]:
+            btn.setStyleSheet(ui_styles.BUTTON_STYLE + "min-height: 40px; font-size: 14px;")
+            layout.addWidget(btn)
+        quick_record_btn.clicked.connect(lambda: self.record_quick_command_sample(quick_combo.currentText()))
+        quick_clear_btn.clicked.connect(lambda: self.clear_quick_command_samples(quick_combo.currentText()))
+        
+        # Learned mishearings (transcript -> command) picked up from confirmed commands
+        learned = self.voice_thread.command_cache.entries()
+        learned_label = QLabel(f"Learned phrases: {len(learned)}")
+        learned_label.setStyleSheet("color: white; font-size: 13px;")
+        learned_label.setToolTip("\n".join(f"'{e['transcript']}' → {e['command']} ({e['hits']}×)"
+                                           for e in learned[:20]) or "Nothing learned yet")
+        learned_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        layout.addWidget(learned_label)
+        learned_clear_btn = QPushButton("🗑 Forget Learned Phrases")
+        learned_clear_btn.setStyleSheet(ui_styles.BUTTON_STYLE + "min-height: 40px; font-size: 14px;")
+        learned_clear_btn.clicked.connect(lambda: (self.voice_thread.command_cache.clear(),
+                                                   learned_label.setText("Learned phrases: 0")))
+        layout.addWidget(learned_clear_btn)
+        
+        # Wake word enrollment for hands-free mode
+        wake_title = QLabel("Hands-free Wake Word")
+        wake_title.setStyleSheet("font-size: 18px; color: white; font-weight: bold;")
+        wake_title.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        layout.addWidget(wake_title)
+        
+        wake_btn = QPushButton("🎙 Record Wake Word")
+        wake_btn.setStyleSheet(ui_styles.BUTTON_STYLE + "min-height: 40px; font-size: 14px;")
+        wake_btn.clicked.connect(self.start_wake_enrollment)
+        layout.addWidget(wake_btn)
+        
         # Close button
         close_btn = QPushButton("✓ Close")
         close_btn.setStyleSheet(ui_styles.BUTTON_STYLE + "min-height: 35px; background-color: #2ecc71;")
@@ -327,14 +610,26 @@ class VLCPlayerGUI(QMainWindow):
         dialog.setLayout(layout)
         dialog.exec()
 
-    def set_position(self, position):
-        """Set video position from slider (0-1000)"""
-        self.video_player.set_position(position)
+    def set_playback_profile(self, profile):
+        """Switch libvlc performance profile now and remember it for the next start"""
+        self.video_player.set_profile(profile)
+        app_config.load_config()["playback"]["profile"] = profile
+        app_config.save_config()
+        self.status_label.setText(f"✅ Performance profile: {profile}")
+
+    def set_position(self, position, precise=False):
+        """Set video position from slider (0-1000); drags are coalesced, a release seeks exactly"""
+        duration = self.video_player.clock.duration_ms
+        if duration <= 0:
+            self.video_player.set_position(position)  # Length not known yet - let libvlc resolve it
+            return
+        new_time = int((position / 1000.0) * duration)
+        if precise:
+            self.video_player.seeker.seek(new_time)
+        else:
+            self.video_player.seeker.scrub(new_time)
         # Update timestamp immediately for smooth feedback
-        duration = self.video_player.media_player.get_length()
-        if duration > 0:
-            new_time = int((position / 1000.0) * duration)
-            self.timestamp_label.setText(f"{self.format_time(new_time)} / {self.format_time(duration)}")
+        self.timestamp_label.setText(f"{self.format_time(new_time)} / {self.format_time(duration)}")
     
     def on_slider_pressed(self):
         """Called when user starts dragging the slider"""
@@ -345,16 +640,21 @@ class VLCPlayerGUI(QMainWindow):
         self.slider_being_dragged = False
         # Set the final position when released
         position = self.progress_slider.value()
-        self.set_position(position)
+        self.set_position(position, precise=True)
     
     def set_speed(self, rate):
         """Set playback speed"""
-        self.video_player.media_player.set_rate(rate)
+        self.video_player.set_rate(rate)
         self.status_label.setText(f"✅ Speed: {rate}x")
     
     def jump_to_time(self, time_ms):
         """Jump to specific time in milliseconds"""
-        self.video_player.media_player.set_time(time_ms)
+        self.video_player.seeker.seek(time_ms)
+
+    def seek_relative(self, delta_ms):
+        """Step forward or back; repeated steps (a held arrow key) are coalesced"""
+        if self.current_file:
+            self.video_player.seeker.seek_by(delta_ms)
     
     def format_time(self, milliseconds):
         """Convert milliseconds to HH:MM:SS format"""
@@ -373,25 +673,35 @@ class VLCPlayerGUI(QMainWindow):
         
         # Always update timestamp (unless user is actively dragging)
         if not self.slider_being_dragged:
-            current_time = self.video_player.media_player.get_time()
-            duration = self.video_player.media_player.get_length()
-            self.timestamp_label.setText(f"{self.format_time(current_time)} / {self.format_time(duration)}")
+            self.update_timestamp()
     
     def update_duration(self, duration):
         """Update total duration display"""
-        pass  # Duration is now shown in update_progress
+        self.update_timestamp()
+        if duration > 0 and self.current_file and self.thumbnails.media_path != self.current_file:
+            # The media index could not parse it
+            self.thumbnails.load(self.current_file, duration, position_ms=self.playback_position(self.current_file))
+
+    def playback_position(self, file_path):
+        """Where file_path is playing, or will resume from - thumbnails are made outward from here"""
+        if self.video_player.loaded_path == file_path:
+            return self.video_player.clock.time_ms
+        resume = self.video_player.history.resume_point(file_path)
+        return resume.position_ms if resume is not None else 0
+
+    def update_timestamp(self):
+        """Show the shared playback clock's time - no libvlc calls"""
+        clock = self.video_player.clock
+        duration = clock.duration_ms or (self.current_metadata or {}).get("duration_ms", 0)
+        self.timestamp_label.setText(f"{self.format_time(clock.time_ms)} / {self.format_time(duration)}")
     
     def toggle_play_pause(self):
         """Toggle between play and pause"""
-        if self.video_player.media_player.is_playing():
+        if self.video_player.state == PLAYING:
             self.pause_video()
         else:
-            # Resume playback from current position, don't reload
-            if self.current_file:
-                self.video_player.play()
-                self.status_label.setText("Playing...")
-            else:
-                self.play_video()
+            # Resumes the loaded file in place; only a newly opened file is loaded
+            self.play_video()
 
     def toggle_fullscreen(self, event=None):
         if not self.current_file: return
@@ -399,7 +709,12 @@ class VLCPlayerGUI(QMainWindow):
             self.exit_fullscreen()
         else:
             self.is_fullscreen = True
-            self.fullscreen_widget = FullscreenVideoWidget(self.video_player.media_player, self)
+            self.video_player.set_standby_window(None)  # The fullscreen view has a single video surface
+            self.fullscreen_widget = FullscreenVideoWidget(self.video_player, self,
+                                                           clock=self.video_player.clock,
+                                                           thumbnails=self.thumbnails)
+            if self.hands_free:
+                self.fullscreen_widget.voice_status.setText("Say the wake word")
     
     def exit_fullscreen(self):
         """Exit fullscreen mode and restore video to main window"""
@@ -407,19 +722,24 @@ class VLCPlayerGUI(QMainWindow):
         if self.fullscreen_widget:
             self.fullscreen_widget.close()
             self.fullscreen_widget = None
-        if sys.platform.startswith('win'):
-            self.video_player.media_player.set_hwnd(self.video_frame.winId())
+        self.video_player.set_window(self.video_frame.winId())
+        self.video_player.set_standby_window(self.standby_frame.winId())
         self.show()
         self.activateWindow()
 
     def closeEvent(self, event):
         """Clean up resources when closing the application"""
-        if self.voice_thread and self.voice_thread.isRunning():
-            self.voice_thread.terminate()
-            self.voice_thread.wait()
+        if self.voice_thread:
+            self.voice_thread.shutdown()  # Cancels at the next stage boundary, never mid-inference
+        if self.wake_listener.isRunning():
+            self.wake_listener.stop_listening()
+        if self.voice_thread:
+            self.voice_thread.engine.close()
         if self.fullscreen_widget:
             self.fullscreen_widget.close()
-        self.video_player.stop()
+        self.video_player.close()  # Also writes the final resume point
+        self.media_index.close()
+        self.thumbnails.close()
         event.accept()
 
 if __name__ == "__main__":
@@ -0,0 +1,229 @@
+# media_index.py - Persistent media metadata, parsed by libvlc in the background
+"""
+Duration, resolution, tracks and chapters are stored in a small SQLite
+database, keyed by path and checked against the file's size and mtime.
+A file that has not changed since it was indexed is answered from the
+database without touching libvlc. Anything new or modified is handed to
+a small worker pool that runs Media.parse_with_options() on a headless
+libvlc instance. The result is saved, then announced with metadata_ready
+(a queued signal, so slots run on the GUI thread). A file libvlc cannot
+parse is remembered as failed with the same fingerprint and is not tried
+again until it changes.
+
+libvlc 3 only reports chapter names from a playing media player, so
+chapters start out as None ("unknown") and are filled in with
+update_chapters() the first time the file plays.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import vlc
+from PyQt6.QtCore import QObject, pyqtSignal
+
+import app_config
+
+INDEX_FILE = "media_index.sqlite3"
+PARSE_WORKERS = 2
+PARSE_TIMEOUT_MS = 10000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS media (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    duration_ms INTEGER NOT NULL,
+    width INTEGER NOT NULL,
+    height INTEGER NOT NULL,
+    tracks TEXT NOT NULL,
+    chapters TEXT,
+    parsed_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS failed (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    failed_at REAL NOT NULL
+)
+"""
+
+TRACK_TYPES = {0: "audio", 1: "video", 2: "subtitle"}
+
+
+def _fourcc(code):
+    """libvlc codec id (a little-endian FourCC) as text, e.g. 'h264'"""
+    return code.to_bytes(4, "little").decode("ascii", "replace").strip("\x00 ")
+
+
+def _text(value):
+    return value.decode("utf-8", "replace") if value else None
+
+
+def chapter_names(media_player):
+    """Chapter names of the current title of a playing media player ([] when it has none)"""
+    if media_player.get_chapter_count() <= 0:
+        return []
+    descriptions = media_player.video_get_chapter_description(media_player.get_title())
+    return [vlc.bytes_to_str(name) if name else "" for _id, name in vlc.track_description_list(descriptions)]
+
+
+def _fingerprint(path):
+    """(size, mtime_ns), or None when the file is gone"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_size, stat.st_mtime_ns
+
+
+class MediaIndex(QObject):
+    """Path -> metadata, remembered across sessions and refreshed when a file changes"""
+    metadata_ready = pyqtSignal(str, object)  # Path as requested, metadata dict
+
+    def __init__(self, path=None, workers=PARSE_WORKERS):
+        super().__init__()
+        self.path = path or app_config.data_path(INDEX_FILE)
+        self._lock = threading.Lock()  # One connection, shared by the GUI thread and the parsers
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(SCHEMA)
+        self._db.commit()
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="MediaIndex")
+        self._pending = set()
+        self._instance = None  # Headless libvlc instance, created by the first parse
+
+    @staticmethod
+    def key(path):
+        return os.path.normcase(os.path.abspath(path))
+
+    def lookup(self, path):
+        """Stored metadata if the file is unchanged since it was indexed, else None"""
+        fingerprint = _fingerprint(path)
+        if fingerprint is None:
+            return None
+        with self._lock:
+            row = self._db.execute(
+                "SELECT size, mtime_ns, duration_ms, width, height, tracks, chapters FROM media WHERE path = ?",
+                (self.key(path),)).fetchone()
+        if row is None or (row[0], row[1]) != fingerprint:
+            return None
+        return {
+            "duration_ms": row[2],
+            "width": row[3],
+            "height": row[4],
+            "tracks": json.loads(row[5]),
+            "chapters": json.loads(row[6]) if row[6] is not None else None,
+        }
+
+    def request(self, path):
+        """Metadata right away when indexed; otherwise None and metadata_ready follows
+
+        Nothing follows for a file that failed to parse and has not changed since.
+        """
+        metadata = self.lookup(path)
+        fingerprint = _fingerprint(path)
+        if metadata is None and fingerprint is not None:
+            key = self.key(path)
+            with self._lock:
+                if key in self._pending:
+                    return None
+                row = self._db.execute("SELECT size, mtime_ns FROM failed WHERE path = ?", (key,)).fetchone()
+                if row is not None and (row[0], row[1]) == fingerprint:
+                    return None
+                self._pending.add(key)
+            self._pool.submit(self._index, path, key)
+        return metadata
+
+    def update_chapters(self, path, chapters):
+        """Store chapter names read from a playing media player"""
+        with self._lock:
+            self._db.execute("UPDATE media SET chapters = ? WHERE path = ?",
+                             (json.dumps(chapters), self.key(path)))
+            self._db.commit()
+
+    def close(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
+        with self._lock:
+            self._db.close()
+
+    # Worker threads
+    def _index(self, path, key):
+        try:
+            fingerprint = _fingerprint(path)
+            if fingerprint is None:
+                return
+            try:
+                metadata = self._parse(path)
+            except Exception as e:  # One unreadable file must not take the worker down
+                print(f"⚠️  Media parse error for {os.path.basename(path)}: {e}")
+                metadata = None
+            if metadata is None:
+                print(f"⚠️  Could not read media info for {os.path.basename(path)}")
+                with self._lock:
+                    self._db.execute("INSERT OR REPLACE INTO failed VALUES (?, ?, ?, ?)",
+                                     (key, fingerprint[0], fingerprint[1], time.time()))
+                    self._db.commit()
+                return
+            with self._lock:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO media VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (key, fingerprint[0], fingerprint[1], metadata["duration_ms"], metadata["width"],
+                     metadata["height"], json.dumps(metadata["tracks"]), None, time.time()))
+                self._db.execute("DELETE FROM failed WHERE path = ?", (key,))
+                self._db.commit()
+            self.metadata_ready.emit(path, metadata)
+        except sqlite3.Error as e:
+            print(f"⚠️  Media index error: {e}")
+        finally:
+            with self._lock:
+                self._pending.discard(key)
+
+    def _parse(self, path):
+        """Run libvlc's parser on one file and wait for it to finish"""
+        with self._lock:
+            if self._instance is None:
+                self._instance = vlc.Instance("--quiet", "--no-video", "--no-audio")
+            instance = self._instance
+        media = instance.media_new_path(path)
+        done = threading.Event()
+        events = media.event_manager()
+        events.event_attach(vlc.EventType.MediaParsedChanged, lambda _event: done.set())
+        try:
+            if media.parse_with_options(vlc.MediaParseFlag.local, PARSE_TIMEOUT_MS) == -1:
+                return None
+            done.wait(PARSE_TIMEOUT_MS / 1000 + 1)
+            if media.get_parsed_status() != vlc.MediaParsedStatus.done:
+                return None
+            return self._describe(media)
+        finally:
+            events.event_detach(vlc.EventType.MediaParsedChanged)
+            media.release()
+
+    @staticmethod
+    def _describe(media):
+        tracks = []
+        width = height = 0
+        for track in media.tracks_get() or ():
+            kind = TRACK_TYPES.get(track.type.value, "unknown")
+            info = {"type": kind, "codec": _fourcc(track.codec), "language": _text(track.language)}
+            if kind == "video" and track.video:
+                video = track.video.contents
+                info.update(width=video.width, height=video.height)
+                if video.frame_rate_den:
+                    info["fps"] = round(video.frame_rate_num / video.frame_rate_den, 3)
+                if not width:
+                    width, height = video.width, video.height
+            elif kind == "audio" and track.audio:
+                audio = track.audio.contents
+                info.update(channels=audio.channels, rate=audio.rate)
+            tracks.append(info)
+        return {
+            "duration_ms": max(0, media.get_duration()),
+            "width": width,
+            "height": height,
+            "tracks": tracks,
+            "chapters": None,
+        }
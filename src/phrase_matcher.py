@@ -0,0 +1,69 @@
+# phrase_matcher.py - Aho-Corasick automaton for finding many phrases in one pass
+"""
+Every pattern is compiled once into a character trie with failure and
+output links. find_all() then walks the text a single time and reports
+every occurrence of every pattern, including overlapping ones. The cost
+depends on the text length and the number of hits, not on how many
+phrases are in the vocabulary.
+"""
+from collections import deque
+
+
+class PhraseAutomaton:
+    """Multi-pattern substring matcher over a fixed set of phrases"""
+
+    def __init__(self, patterns=()):
+        # Node 0 is the root; each node has transitions, a failure link and the patterns ending there
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [[]]
+        self.patterns = []
+        for pattern in dict.fromkeys(patterns):  # Keep first-seen order, drop duplicates
+            if pattern:
+                self._add(pattern)
+        self._link()
+
+    def _add(self, pattern):
+        node = 0
+        for char in pattern:
+            next_node = self._goto[node].get(char)
+            if next_node is None:
+                next_node = len(self._goto)
+                self._goto[node][char] = next_node
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+            node = next_node
+        self._output[node].append(pattern)
+        self.patterns.append(pattern)
+
+    def _link(self):
+        """Breadth-first pass that sets failure links and merges suffix outputs"""
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fallback = self._fail[node]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[child] = target if target != child else 0
+                self._output[child] = self._output[child] + self._output[self._fail[child]]
+
+    def find_all(self, text):
+        """Every (pattern, start, end) occurrence in text, ordered by end position"""
+        matches = []
+        goto, fail, output = self._goto, self._fail, self._output
+        node = 0
+        for index, char in enumerate(text):
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            for pattern in output[node]:
+                matches.append((pattern, index + 1 - len(pattern), index + 1))
+        return matches
+
+    def found(self, text):
+        """Set of patterns that occur anywhere in text"""
+        return {pattern for pattern, _start, _end in self.find_all(text)}
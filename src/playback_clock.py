@@ -0,0 +1,175 @@
+# playback_clock.py - One event-driven playback clock shared by every view
+"""
+libvlc reports TimeChanged / LengthChanged / state events from its own
+threads. The callbacks only forward the values through queued Qt signals,
+because calling back into libvlc from inside an event callback can
+deadlock. On the GUI thread the clock re-anchors on each event. While
+playing, a short timer interpolates between events (anchor + elapsed x
+rate) so sliders and labels move smoothly without polling libvlc. The
+timer only runs while playing, so a paused or stopped player costs
+nothing.
+"""
+import time
+
+import vlc
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal
+
+TICK_MS = 50  # Interpolation step while playing
+
+
+class PlaybackClock(QObject):
+    """Playback time, length and play state for one libvlc media player"""
+    time_changed = pyqtSignal(int)       # Milliseconds
+    position_changed = pyqtSignal(int)   # 0-1000, for sliders
+    duration_changed = pyqtSignal(int)   # Milliseconds
+    playing_changed = pyqtSignal(bool)
+    state_changed = pyqtSignal(str)      # "opening", "playing", "paused", "stopped", "ended", "error"
+
+    # Forwarded from libvlc threads; connected (queued) to the GUI-thread handlers below
+    _vlc_time = pyqtSignal(int)
+    _vlc_length = pyqtSignal(int)
+    _vlc_state = pyqtSignal(str)
+
+    VLC_STATE_EVENTS = [
+        (vlc.EventType.MediaPlayerOpening, "opening"),
+        (vlc.EventType.MediaPlayerPlaying, "playing"),
+        (vlc.EventType.MediaPlayerPaused, "paused"),
+        (vlc.EventType.MediaPlayerStopped, "stopped"),
+        (vlc.EventType.MediaPlayerEndReached, "ended"),
+        (vlc.EventType.MediaPlayerEncounteredError, "error"),
+    ]
+
+    def __init__(self, media_player=None, parent=None):
+        super().__init__(parent)
+        self.media_player = None
+        self.duration_ms = 0
+        self.is_playing = False
+        self.rate = 1.0
+        self._anchor_ms = 0                       # Last time reported by libvlc (or a seek)
+        self._anchor_at = time.monotonic()        # When that was
+        self._last_emitted = None
+
+        self._timer = QTimer(self)
+        self._timer.setInterval(TICK_MS)
+        self._timer.timeout.connect(self._emit_time)
+
+        self._vlc_time.connect(self._on_time)
+        self._vlc_length.connect(self._on_length)
+        self._vlc_state.connect(self._on_state)
+        if media_player is not None:
+            self.attach(media_player)
+
+    def attach(self, media_player):
+        """Follow a (new) media player's events"""
+        self.detach()
+        self.media_player = media_player
+        events = media_player.event_manager()
+        events.event_attach(vlc.EventType.MediaPlayerTimeChanged, self._vlc_time_event)
+        events.event_attach(vlc.EventType.MediaPlayerLengthChanged, self._vlc_length_event)
+        for event_type, state in self.VLC_STATE_EVENTS:
+            events.event_attach(event_type, self._vlc_state_event, state)
+
+    def detach(self):
+        if self.media_player is None:
+            return
+        events = self.media_player.event_manager()
+        events.event_detach(vlc.EventType.MediaPlayerTimeChanged)
+        events.event_detach(vlc.EventType.MediaPlayerLengthChanged)
+        for event_type, _state in self.VLC_STATE_EVENTS:
+            events.event_detach(event_type)
+        self.media_player = None
+        self._set_playing(False)
+
+    # libvlc threads: forward only, never call into libvlc here
+    def _vlc_time_event(self, event):
+        self._vlc_time.emit(int(event.u.new_time))
+
+    def _vlc_length_event(self, event):
+        self._vlc_length.emit(int(event.u.new_length))
+
+    def _vlc_state_event(self, event, state):
+        self._vlc_state.emit(state)
+
+    # GUI thread
+    @property
+    def time_ms(self):
+        """Current playback time, interpolated while playing"""
+        if not self.is_playing:
+            return self._anchor_ms
+        elapsed = (time.monotonic() - self._anchor_at) * 1000 * self.rate
+        current = self._anchor_ms + int(elapsed)
+        return min(current, self.duration_ms) if self.duration_ms > 0 else current
+
+    @property
+    def position(self):
+        """Current position on the 0-1000 slider scale"""
+        if self.duration_ms <= 0:
+            return 0
+        return max(0, min(1000, self.time_ms * 1000 // self.duration_ms))
+
+    def sync(self):
+        """Read time and length straight from the player - for one attached after it was opened"""
+        if self.media_player is None:
+            return
+        self._on_length(max(0, self.media_player.get_length()))
+        self._anchor(max(0, self.media_player.get_time()))
+        self._emit_time()
+
+    def seek_hint(self, time_ms):
+        """Jump the clock right away after a seek; libvlc's TimeChanged confirms it later"""
+        self._anchor(max(0, int(time_ms)))
+        self._emit_time()
+
+    def set_rate(self, rate):
+        self._anchor(self.time_ms)  # Keep elapsed time measured at the old rate
+        self.rate = rate
+
+    def _anchor(self, time_ms):
+        self._anchor_ms = time_ms
+        self._anchor_at = time.monotonic()
+
+    def _on_time(self, time_ms):
+        self._anchor(time_ms)
+        if not self.is_playing:
+            self._emit_time()  # Seeks while paused still move the slider
+
+    def _on_length(self, length_ms):
+        if length_ms != self.duration_ms:
+            self.duration_ms = length_ms
+            self.duration_changed.emit(length_ms)
+
+    def _on_state(self, state):
+        if state == "playing" and self.media_player is not None:
+            self.rate = self.media_player.get_rate() or 1.0
+        self._set_playing(state == "playing")
+        if state == "opening":
+            self._on_length(0)  # New media - LengthChanged follows once it is known
+        if state in ("stopped", "opening"):
+            self._anchor(0)
+            self._emit_time()
+        elif state == "ended":
+            self._anchor(self.duration_ms)
+            self._emit_time()
+        self.state_changed.emit(state)
+
+    def _set_playing(self, playing):
+        if playing == self.is_playing:
+            return
+        if not playing:
+            self._anchor(self.time_ms)  # Freeze at the interpolated time
+        else:
+            self._anchor_at = time.monotonic()
+        self.is_playing = playing
+        if playing:
+            self._timer.start()
+        else:
+            self._timer.stop()
+        self.playing_changed.emit(playing)
+
+    def _emit_time(self):
+        current = self.time_ms
+        if current == self._last_emitted:
+            return
+        self._last_emitted = current
+        self.time_changed.emit(current)
+        self.position_changed.emit(self.position)
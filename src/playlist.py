@@ -0,0 +1,103 @@
+# playlist.py - Play queue with gapless transitions
+"""
+The playlist follows the current item on the playback clock. Once fewer
+than PREFETCH_SECONDS remain, it asks VideoPlayer to open the next item
+on a standby media player. That player uses the same libvlc Instance and
+renders into a second, hidden video frame. The next file is demuxed and
+its first frame decoded while the current one is still playing. When the
+current item ends, the standby player is unpaused and its frame raised,
+so there is no black gap while a file opens.
+
+Only one item is ever prefetched. If prefetching isn't available
+(fullscreen, platforms without embedded output) or the next item wasn't
+ready, the playlist falls back to an ordinary load.
+"""
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal
+
+from video_player import ENDED
+
+PREFETCH_SECONDS = 10
+
+
+class Playlist(QObject):
+    """Ordered play queue driving one VideoPlayer"""
+    current_changed = pyqtSignal(int, str)  # Index, path
+
+    def __init__(self, player, parent=None):
+        super().__init__(parent)
+        self.player = player
+        self.items = []
+        self.index = -1
+        self._prefetched = None  # Index handed to the standby player
+        player.clock.time_changed.connect(self._check_prefetch)
+        player.state_changed.connect(self._on_state)
+
+    @property
+    def current(self):
+        return self.items[self.index] if 0 <= self.index < len(self.items) else None
+
+    def has_next(self):
+        return self.index + 1 < len(self.items)
+
+    def set_items(self, paths, start=0):
+        """Replace the queue; the item at `start` becomes current (not played yet)"""
+        self.player.release_standby()
+        self._prefetched = None
+        self.items = list(paths)
+        self.index = -1
+        if self.items:
+            self._set_index(max(0, min(start, len(self.items) - 1)))
+
+    def add(self, path):
+        self.items.append(path)
+        if self.index < 0:
+            self._set_index(0)
+
+    def clear(self):
+        self.set_items([])
+
+    def play_index(self, index):
+        """Jump to an item and play it"""
+        if 0 <= index < len(self.items):
+            self._set_index(index)
+            self.player.load_video(self.items[index])
+
+    def next(self):
+        if self.has_next():
+            self._advance()
+
+    def previous(self):
+        if self.index > 0:
+            self.play_index(self.index - 1)
+
+    def _set_index(self, index):
+        self.index = index
+        if self._prefetched is not None and self._prefetched != index + 1:
+            self._prefetched = None  # The standby item is no longer next; prepare_standby replaces it
+        self.current_changed.emit(index, self.items[index])
+
+    def _check_prefetch(self, time_ms):
+        """Clock tick: open the next item on the standby player shortly before this one ends"""
+        if not self.has_next() or self._prefetched == self.index + 1 or not self.player.can_prefetch:
+            return
+        if self.player.loaded_path != self.current:
+            return  # Something outside the playlist is playing
+        duration = self.player.clock.duration_ms
+        if duration > 0 and duration - time_ms <= PREFETCH_SECONDS * 1000:
+            if self.player.prepare_standby(self.items[self.index + 1]):
+                self._prefetched = self.index + 1
+
+    def _on_state(self, state):
+        if state == ENDED and self.has_next() and self.player.loaded_path == self.current:
+            # Not from inside the state_changed emission - other slots should still see "ended" first
+            QTimer.singleShot(0, self._advance)
+
+    def _advance(self):
+        if not self.has_next():
+            return
+        next_path = self.items[self.index + 1]
+        swapped = self._prefetched == self.index + 1 and self.player.swap_to_standby(next_path)
+        self._prefetched = None
+        self._set_index(self.index + 1)
+        if not swapped:
+            self.player.load_video(next_path)
@@ -0,0 +1,93 @@
+# seek_preview.py - Thumbnail popup for hovering over or dragging a progress slider
+from PyQt6.QtCore import Qt, QEvent, QPoint
+from PyQt6.QtGui import QPixmap
+from PyQt6.QtWidgets import QLabel, QStyle, QStyleOptionSlider, QVBoxLayout, QWidget
+
+
+class SeekPreview(QWidget):
+    """Shows the thumbnail and time under the cursor above a 0-1000 progress slider"""
+
+    def __init__(self, slider, thumbnails):
+        # A tooltip-type window stays above the native video surface, even in fullscreen
+        super().__init__(slider, Qt.WindowType.ToolTip)
+        self.setAttribute(Qt.WidgetAttribute.WA_ShowWithoutActivating)
+        self.setAttribute(Qt.WidgetAttribute.WA_TransparentForMouseEvents)
+        self.setStyleSheet("background-color: black; border: 1px solid #e45a92;")
+        self.slider = slider
+        self.thumbnails = thumbnails
+        self._value = None
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(2, 2, 2, 2)
+        layout.setSpacing(2)
+        self.image_label = QLabel()
+        layout.addWidget(self.image_label)
+        self.time_label = QLabel()
+        self.time_label.setStyleSheet("color: white; font-weight: bold; border: none;")
+        self.time_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        layout.addWidget(self.time_label)
+
+        slider.setMouseTracking(True)
+        slider.installEventFilter(self)
+        slider.sliderMoved.connect(self.show_at)
+        slider.sliderReleased.connect(self.hide)
+        thumbnails.thumbnail_ready.connect(self._on_thumbnail_ready)
+
+    def detach(self):
+        """Stop following the slider (its window is closing)"""
+        self.slider.removeEventFilter(self)
+        self.slider.sliderMoved.disconnect(self.show_at)
+        self.slider.sliderReleased.disconnect(self.hide)
+        self.thumbnails.thumbnail_ready.disconnect(self._on_thumbnail_ready)
+        self.hide()
+
+    def eventFilter(self, watched, event):
+        if event.type() == QEvent.Type.MouseMove and not self.slider.isSliderDown():
+            self.show_at(self._value_at(int(event.position().x())))
+        elif event.type() == QEvent.Type.Leave and not self.slider.isSliderDown():
+            self.hide()
+        return False
+
+    def _geometry(self):
+        option = QStyleOptionSlider()
+        self.slider.initStyleOption(option)
+        style = self.slider.style()
+        groove = style.subControlRect(QStyle.ComplexControl.CC_Slider, option,
+                                      QStyle.SubControl.SC_SliderGroove, self.slider)
+        handle = style.subControlRect(QStyle.ComplexControl.CC_Slider, option,
+                                      QStyle.SubControl.SC_SliderHandle, self.slider)
+        return groove, handle
+
+    def _value_at(self, x):
+        groove, handle = self._geometry()
+        return QStyle.sliderValueFromPosition(self.slider.minimum(), self.slider.maximum(),
+                                              x - groove.x() - handle.width() // 2,
+                                              groove.width() - handle.width())
+
+    def show_at(self, value):
+        duration = self.thumbnails.duration_ms
+        if self.thumbnails.atlas is None or duration <= 0:
+            self.hide()
+            return
+        self._value = value
+        time_ms = value * duration // 1000
+        self.thumbnails.focus(time_ms)  # Generate around what the user is looking at
+        image = self.thumbnails.thumbnail(time_ms)
+        self.image_label.setVisible(image is not None)
+        if image is not None:
+            self.image_label.setPixmap(QPixmap.fromImage(image))
+        seconds = time_ms // 1000
+        self.time_label.setText(f"{seconds // 3600:02d}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}")
+        self.adjustSize()
+
+        groove, handle = self._geometry()
+        x = groove.x() + handle.width() // 2 + QStyle.sliderPositionFromValue(
+            self.slider.minimum(), self.slider.maximum(), value, groove.width() - handle.width())
+        anchor = self.slider.mapToGlobal(QPoint(x, 0))
+        self.move(anchor.x() - self.width() // 2, anchor.y() - self.height() - 6)
+        self.show()
+
+    def _on_thumbnail_ready(self, slot):
+        if self.isVisible() and self._value is not None and self.thumbnails.atlas is not None:
+            if abs(slot - self.thumbnails.slot(self._value * self.thumbnails.duration_ms // 1000)) <= 1:
+                self.show_at(self._value)
@@ -0,0 +1,77 @@
+# seek_scheduler.py - Coalesces seek requests so libvlc is never flooded
+"""
+Dragging a slider produces a mouse-move event every few milliseconds.
+Passing each one to libvlc queues seek after seek, and on long-GOP files
+every seek has to decode from the previous keyframe, so playback stalls.
+
+scrub() only records the latest target. At most one seek is issued per
+SCRUB_INTERVAL_MS, always to the newest target, and older targets are
+dropped. seek() is for final positions (slider release, voice "jump to",
+keyboard steps). It cancels any pending scrub and seeks at once.
+
+libvlc 3 has no per-call "fast" flag: keyframe-only seeking is the
+input-fast-seek option, fixed when a media is opened. So drag seeks are
+kept cheap by rate, the seek preview thumbnails show where the drag is,
+and the release lands exactly.
+"""
+import time
+
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal
+
+SCRUB_INTERVAL_MS = 200
+
+
+class SeekScheduler(QObject):
+    """Latest-target-wins, rate-capped seeking for one VideoPlayer"""
+    seeked = pyqtSignal(int)  # Target of every seek actually sent to libvlc
+
+    def __init__(self, player, interval_ms=SCRUB_INTERVAL_MS, parent=None):
+        super().__init__(parent)
+        self.player = player
+        self.interval_ms = interval_ms
+        self._pending = None        # Newest scrub target not yet sent to libvlc
+        self._last_seek = 0.0       # time.monotonic() of the last seek issued
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self._flush)
+
+    @property
+    def target_ms(self):
+        """Where playback is heading: the pending target, else the clock's time"""
+        return self._pending if self._pending is not None else self.player.clock.time_ms
+
+    def scrub(self, time_ms):
+        """Intermediate target while dragging; coalesced and rate-capped"""
+        self._pending = self._clamp(time_ms)
+        if not self._timer.isActive():
+            elapsed_ms = (time.monotonic() - self._last_seek) * 1000
+            self._timer.start(max(0, int(self.interval_ms - elapsed_ms)))
+
+    def seek(self, time_ms):
+        """Final target: replaces anything pending and seeks now"""
+        self._timer.stop()
+        self._pending = None
+        self._issue(self._clamp(time_ms))
+
+    def seek_by(self, delta_ms):
+        """Step relative to where playback is heading, so repeated steps add up"""
+        self.scrub(self.target_ms + delta_ms)
+
+    def cancel(self):
+        self._timer.stop()
+        self._pending = None
+
+    def _clamp(self, time_ms):
+        duration = self.player.clock.duration_ms
+        time_ms = max(0, int(time_ms))
+        return min(time_ms, duration) if duration > 0 else time_ms
+
+    def _flush(self):
+        if self._pending is not None:
+            target, self._pending = self._pending, None
+            self._issue(target)
+
+    def _issue(self, time_ms):
+        self._last_seek = time.monotonic()
+        self.player.set_time(time_ms)
+        self.seeked.emit(time_ms)
@@ -0,0 +1,31 @@
+# startup_metrics.py - Lightweight startup timing marks
+"""
+Records how long startup milestones take, measured from the first import
+of this module (main.py imports it before anything heavy).
+
+Milestones used by the app:
+    first_frame  - main window painted and interactive
+    voice_ready  - Whisper model loaded and able to transcribe
+"""
+import time
+
+PROCESS_START = time.perf_counter()
+_marks = {}
+
+
+def mark(name):
+    """Record a milestone once and print its offset from process start"""
+    if name in _marks:
+        return _marks[name]
+    elapsed_ms = (time.perf_counter() - PROCESS_START) * 1000
+    _marks[name] = elapsed_ms
+    print(f"⏱ Startup: {name} at {elapsed_ms:.0f} ms")
+    if "first_frame" in _marks and "voice_ready" in _marks:
+        print(f"⏱ Startup summary: time-to-first-frame {_marks['first_frame']:.0f} ms, "
+              f"time-to-voice-ready {_marks['voice_ready']:.0f} ms")
+    return elapsed_ms
+
+
+def get_marks():
+    """Return a copy of all recorded milestones (milliseconds since start)"""
+    return dict(_marks)
@@ -0,0 +1,350 @@
+# thumbnail_cache.py - Seek-preview thumbnails, extracted in background processes
+"""
+Each video gets one sprite file in the app data directory. The file
+holds a small header, one "ready" byte per slot and fixed-size RV32
+frames taken every `interval` milliseconds. Worker processes render
+frames with a headless libvlc player (video callbacks, no window), then
+write them straight into the memory-mapped file. The GUI maps the same
+file read-only, so a hover preview is a slice of the mapping, with no
+decoding and no IPC.
+
+The GUI process hands out small batches of slots, always the missing
+slots nearest the position the user is looking at. When the focus moves,
+the next batch follows it. Loading another file bumps a shared generation
+counter; workers check it between frames and drop the old batch. A
+partially filled sprite is kept, so generation resumes where it stopped
+the next time the file is opened.
+"""
+import ctypes
+import hashlib
+import os
+import struct
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import multiprocessing
+
+import numpy as np
+from PyQt6.QtCore import QObject, pyqtSignal
+from PyQt6.QtGui import QImage
+
+import app_config
+
+THUMB_DIR = "thumbnails"
+MAGIC = b"AVTHUMB1"
+HEADER = struct.Struct("<8sIIII")  # magic, width, height, interval_ms, count
+FRAME_ALIGN = 64
+BATCH_SIZE = 6           # Slots per worker task; small so the focus can move between batches
+GRAB_TIMEOUT = 5.0       # Seconds to wait for a decoded frame after a seek
+FRAMES_AFTER_SEEK = 2    # The first frame shown after set_time() can predate the seek
+MAX_SPRITE_FILES = 30    # Least recently opened sprites beyond this are deleted
+
+
+class SpriteAtlas:
+    """Memory-mapped sprite file: header, ready flags, then count frames of height x width x 4"""
+
+    def __init__(self, path, writable=False):
+        self.path = path
+        with open(path, "rb") as f:
+            magic, self.width, self.height, self.interval_ms, self.count = HEADER.unpack(f.read(HEADER.size))
+        if magic != MAGIC:
+            raise ValueError(f"Not a thumbnail sprite: {path}")
+        mode = "r+" if writable else "r"
+        self.flags = np.memmap(path, np.uint8, mode, offset=HEADER.size, shape=(self.count,))
+        self.frames = np.memmap(path, np.uint8, mode, offset=self._frames_offset(self.count),
+                                shape=(self.count, self.height, self.width, 4))
+
+    @staticmethod
+    def _frames_offset(count):
+        return -(-(HEADER.size + count) // FRAME_ALIGN) * FRAME_ALIGN
+
+    @classmethod
+    def create(cls, path, width, height, interval_ms, count):
+        """Write an empty (sparse) sprite file"""
+        size = cls._frames_offset(count) + count * height * width * 4
+        with open(path + ".tmp", "wb") as f:
+            f.write(HEADER.pack(MAGIC, width, height, interval_ms, count))
+            f.truncate(size)
+        os.replace(path + ".tmp", path)
+        return cls(path)
+
+    def ready(self, slot):
+        return bool(self.flags[slot])
+
+    def store(self, slot, frame):
+        self.frames[slot] = frame
+        self.flags[slot] = 1  # Set after the pixels, so readers never see a half-written frame
+
+    def close(self):
+        # The mapping goes away with the last array referencing it (Windows can't delete a mapped file)
+        self.flags = self.frames = None
+
+
+class FrameGrabber:
+    """Headless libvlc player that renders into a numpy buffer through video callbacks"""
+
+    def __init__(self, media_path, width, height):
+        import vlc
+        self.media_path = media_path
+        self.instance = vlc.Instance("--quiet", "--no-audio", "--no-spu", "--no-osd")
+        self.player = self.instance.media_player_new()
+        self.player.set_media(self.instance.media_new_path(media_path))
+
+        # libvlc wants planes aligned on 32 bytes
+        size = height * width * 4
+        raw = np.empty(size + 32, np.uint8)
+        start = -raw.ctypes.data % 32
+        self._raw = raw
+        self.buffer = raw[start:start + size].reshape(height, width, 4)
+        self._plane = ctypes.c_void_p(self.buffer.ctypes.data)
+
+        self._frames = 0
+        self._wanted = None
+        self._captured = None
+        self._cond = threading.Condition()
+        # Keep references: libvlc calls these from its own threads
+        self._callbacks = (vlc.CallbackDecorators.VideoLockCb(self._lock),
+                           vlc.CallbackDecorators.VideoUnlockCb(self._unlock),
+                           vlc.CallbackDecorators.VideoDisplayCb(self._display))
+        self.player.video_set_callbacks(*self._callbacks, None)
+        self.player.video_set_format("RV32", width, height, width * 4)
+        self.player.play()
+        with self._cond:  # Seeks are ignored until the first frame is out
+            self._cond.wait_for(lambda: self._frames > 0, GRAB_TIMEOUT)
+
+    def _lock(self, _opaque, planes):
+        planes[0] = self._plane.value
+        return None
+
+    def _unlock(self, _opaque, _picture, _planes):
+        pass
+
+    def _display(self, _opaque, _picture):
+        with self._cond:
+            self._frames += 1
+            if self._wanted is not None and self._frames >= self._wanted:
+                self._captured = self.buffer.copy()
+                self._wanted = None
+                self._cond.notify_all()
+
+    def grab(self, time_ms):
+        """Frame at (about) time_ms, or None if nothing was decoded in time"""
+        with self._cond:
+            self._captured = None
+            self._wanted = self._frames + FRAMES_AFTER_SEEK
+        self.player.set_time(int(time_ms))
+        with self._cond:
+            self._cond.wait_for(lambda: self._captured is not None, GRAB_TIMEOUT)
+            self._wanted = None
+            return self._captured
+
+    def pause(self):
+        self.player.set_pause(1)
+
+    def resume(self):
+        self.player.set_pause(0)
+
+    def release(self):
+        self.player.stop()
+        self.player.release()
+        self.instance.release()
+
+
+# Worker process state
+_generation = None
+_grabber = None
+
+
+def _init_worker(generation):
+    global _generation
+    _generation = generation
+
+
+def _extract(sprite_path, media_path, slots, generation):
+    """Worker process: render the given slots into the sprite; returns the slots written"""
+    global _grabber
+    atlas = SpriteAtlas(sprite_path, writable=True)
+    if _grabber is None or _grabber.media_path != media_path:
+        if _grabber is not None:
+            _grabber.release()
+        _grabber = FrameGrabber(media_path, atlas.width, atlas.height)
+    _grabber.resume()
+    written = []
+    try:
+        for slot in slots:
+            if _generation.value != generation:
+                break  # Another file was loaded
+            if atlas.ready(slot):
+                continue
+            frame = _grabber.grab(slot * atlas.interval_ms)
+            if frame is not None:
+                atlas.store(slot, frame)
+                written.append(slot)
+    finally:
+        _grabber.pause()  # Don't keep decoding between batches
+        atlas.close()
+    return written
+
+
+def _prune(directory, keep):
+    """Delete the least recently opened sprite files beyond `keep`"""
+    try:
+        paths = [os.path.join(directory, name) for name in os.listdir(directory) if name.endswith(".sprite")]
+        paths.sort(key=os.path.getmtime, reverse=True)
+        for path in paths[keep:]:
+            os.remove(path)
+    except OSError:
+        pass  # In use elsewhere or already gone - try again next time
+
+
+class ThumbnailCache(QObject):
+    """Schedules thumbnail extraction for the current file and serves previews from its sprite"""
+    thumbnail_ready = pyqtSignal(int)        # Slot index
+    _batch_done = pyqtSignal(int, object)    # (generation, future) from the executor's thread
+
+    def __init__(self, config=None, parent=None):
+        super().__init__(parent)
+        config = config or app_config.get_section("thumbnails")
+        self.enabled = config.get("enabled", True)
+        self.workers = max(1, int(config.get("workers", 2)))
+        self.width = int(config.get("width", 160))
+        self.interval_ms = int(config.get("interval_s", 10) * 1000)
+        self.max_count = int(config.get("max_count", 240))
+        self.directory = os.path.join(app_config.APP_DIR, THUMB_DIR)
+
+        self.media_path = None
+        self.duration_ms = 0
+        self.atlas = None
+        self._focus = 0
+        self._claimed = set()   # Slots in batches that have not come back yet
+        self._failed = set()    # Slots that could not be decoded; not retried for this file
+        self._in_flight = 0
+        self._executor = None   # Worker processes start with the first file, not at startup
+        self._context = multiprocessing.get_context("spawn")
+        self._generation = self._context.Value("i", 0)
+        self._batch_done.connect(self._on_batch_done)
+
+    def load(self, media_path, duration_ms, aspect=None, position_ms=0):
+        """Start (or resume) thumbnails for a file, nearest position_ms first; aspect is width / height when known"""
+        if not self.enabled or duration_ms <= 0 or media_path == self.media_path:
+            return
+        self.cancel()
+        interval = max(self.interval_ms, -(-duration_ms // self.max_count))
+        count = duration_ms // interval + 1
+        height = max(2, int(round(self.width / (aspect or 16 / 9) / 2)) * 2)
+        try:
+            stat = os.stat(media_path)
+        except OSError:
+            return
+        key = f"{os.path.normcase(os.path.abspath(media_path))}|{stat.st_size}|{stat.st_mtime_ns}|{self.width}x{height}|{interval}"
+        sprite_path = os.path.join(self.directory, hashlib.sha1(key.encode("utf-8")).hexdigest() + ".sprite")
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            if os.path.exists(sprite_path):
+                atlas = SpriteAtlas(sprite_path)
+                os.utime(sprite_path)  # Most recently opened survives pruning
+            else:
+                _prune(self.directory, MAX_SPRITE_FILES - 1)
+                atlas = SpriteAtlas.create(sprite_path, self.width, height, interval, count)
+        except (OSError, ValueError) as e:
+            print(f"⚠️  Thumbnails unavailable: {e}")
+            return
+        self.media_path = media_path
+        self.duration_ms = duration_ms
+        self.atlas = atlas
+        self._focus = self.slot(position_ms)
+        self._schedule()
+
+    def cancel(self):
+        """Stop work for the current file; running batches stop at their next frame"""
+        with self._generation.get_lock():
+            self._generation.value += 1
+        self._claimed.clear()
+        self._failed.clear()
+        self._in_flight = 0
+        if self.atlas is not None:
+            self.atlas.close()
+        self.media_path = None
+        self.atlas = None
+
+    def focus(self, time_ms):
+        """Generate around this position next (hover, drag, or where playback seeked to)"""
+        if self.atlas is not None:
+            self._focus = self.slot(time_ms)
+
+    def slot(self, time_ms):
+        return max(0, min(self.atlas.count - 1, int(round(time_ms / self.atlas.interval_ms))))
+
+    def thumbnail(self, time_ms):
+        """QImage for the nearest ready slot around time_ms, or None"""
+        if self.atlas is None:
+            return None
+        slot = self.slot(time_ms)
+        for candidate in (slot, slot - 1, slot + 1):
+            if 0 <= candidate < self.atlas.count and self.atlas.ready(candidate):
+                frame = self.atlas.frames[candidate]
+                # RV32 is B, G, R, X in memory - the same layout as QImage's RGB32 on little-endian hosts
+                return QImage(frame.tobytes(), self.atlas.width, self.atlas.height,
+                              self.atlas.width * 4, QImage.Format.Format_RGB32).copy()
+        return None
+
+    def close(self):
+        self.cancel()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def _next_batch(self):
+        """Missing slots nearest the focus, alternating after and before it"""
+        batch = []
+        for distance in range(self.atlas.count):
+            for slot in (self._focus + distance, self._focus - distance - 1):
+                if (0 <= slot < self.atlas.count and slot not in self._claimed
+                        and slot not in self._failed and not self.atlas.ready(slot)):
+                    batch.append(slot)
+                    if len(batch) == BATCH_SIZE:
+                        return batch
+        return batch
+
+    def _schedule(self):
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(self.workers, mp_context=self._context,
+                                                 initializer=_init_worker, initargs=(self._generation,))
+        while self.atlas is not None and self._in_flight < self.workers:
+            batch = self._next_batch()
+            if not batch:
+                return
+            generation = self._generation.value
+            self._claimed.update(batch)
+            self._in_flight += 1
+            future = self._executor.submit(_extract, self.atlas.path, self.media_path, batch, generation)
+            future.batch = batch
+            future.executor = self._executor
+            # Runs on the executor's thread - hop to the GUI thread through a queued signal
+            future.add_done_callback(lambda done, generation=generation: self._batch_done.emit(generation, done))
+
+    def _on_batch_done(self, generation, future):
+        broken = not future.cancelled() and isinstance(future.exception(), BrokenProcessPool)
+        if broken and future.executor is self._executor:
+            # A worker died (libvlc crash, killed) and took the pool with it. Every batch in
+            # flight fails the same way; the first one shuts it down so _schedule starts a new one
+            print(f"⚠️  Thumbnail worker stopped, restarting: {future.exception()}")
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        if generation != self._generation.value:
+            return  # Batch for a file that is no longer loaded
+        self._in_flight -= 1
+        self._claimed.difference_update(future.batch)
+        if broken:
+            self._failed.update(future.batch)  # Not retried, so a frame that crashes libvlc can't loop
+            self._schedule()
+            return
+        try:
+            written = future.result()
+        except Exception as e:
+            print(f"⚠️  Thumbnail batch failed: {type(e).__name__}: {e}")
+            return
+        self._failed.update(slot for slot in future.batch if not self.atlas.ready(slot))
+        for slot in written:
+            self.thumbnail_ready.emit(slot)
+        self._schedule()
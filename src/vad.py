@@ -0,0 +1,106 @@
+# vad.py - Frame-based voice activity detection for endpointing
+import numpy as np
+
+FRAME_MS = 30
+HANGOVER_MS = 450        # Silence tolerated inside an utterance before it is considered over
+MIN_SPEECH_MS = 90       # Consecutive voiced audio needed to count as speech onset
+NO_SPEECH_TIMEOUT = 3.0  # Give up if nobody starts talking within this many seconds
+THRESHOLD_RATIO = 3.0    # Speech must be this many times louder than the noise floor
+MIN_THRESHOLD = 0.003    # Absolute RMS floor so a silent room does not trigger on hiss
+NOISE_ADAPT_RATE = 0.05  # EMA rate for tracking the noise floor during non-speech frames
+
+
+class EnergyVAD:
+    """Streaming RMS voice activity detector with adaptive noise floor and hangover"""
+
+    def __init__(self, sample_rate=16000, frame_ms=FRAME_MS, hangover_ms=HANGOVER_MS,
+                 min_speech_ms=MIN_SPEECH_MS, threshold_ratio=THRESHOLD_RATIO,
+                 min_threshold=MIN_THRESHOLD, adapt_rate=NOISE_ADAPT_RATE):
+        self.sample_rate = sample_rate
+        self.frame_size = int(sample_rate * frame_ms / 1000)
+        self.hangover_frames = max(1, hangover_ms // frame_ms)
+        self.min_speech_frames = max(1, min_speech_ms // frame_ms)
+        self.threshold_ratio = threshold_ratio
+        self.min_threshold = min_threshold
+        self.adapt_rate = adapt_rate
+        self.reset()
+
+    def reset(self, noise_floor=None):
+        """Forget all state; optionally seed the noise floor"""
+        self.noise_floor = noise_floor if noise_floor is not None else self.min_threshold / self.threshold_ratio
+        self.frames_seen = 0
+        self.in_speech = False
+        self.speech_detected = False
+        self.ended = False
+        self.speech_start_frame = None
+        self.last_speech_frame = None
+        self._voiced_run = 0
+        self._silent_run = 0
+        self._remainder = np.zeros(0, dtype=np.float32)
+
+    def calibrate(self, audio):
+        """Estimate the noise floor from background audio (e.g. the pre-roll)"""
+        rms = self._frame_rms(np.asarray(audio, dtype=np.float32))
+        if len(rms):
+            # A low percentile ignores any speech that slipped into the pre-roll
+            self.noise_floor = max(float(np.percentile(rms, 20)), 1e-6)
+
+    @property
+    def threshold(self):
+        return max(self.noise_floor * self.threshold_ratio, self.min_threshold)
+
+    def process(self, audio):
+        """Feed the next chunk of samples; returns True once the utterance has ended"""
+        if self.ended:
+            return True
+
+        audio = np.asarray(audio, dtype=np.float32)
+        if len(self._remainder):
+            audio = np.concatenate((self._remainder, audio))
+        usable = len(audio) - len(audio) % self.frame_size
+        self._remainder = audio[usable:].copy()
+        rms = self._frame_rms(audio[:usable])
+
+        for value in rms:
+            frame = self.frames_seen
+            self.frames_seen += 1
+            # Hysteresis: once in speech, a quieter level keeps the utterance open
+            threshold = self.threshold * (0.7 if self.in_speech else 1.0)
+
+            if value > threshold:
+                self._voiced_run += 1
+                self._silent_run = 0
+                if not self.in_speech and self._voiced_run >= self.min_speech_frames:
+                    self.in_speech = True
+                    self.speech_detected = True
+                    if self.speech_start_frame is None:
+                        self.speech_start_frame = frame - self._voiced_run + 1
+                if self.in_speech:
+                    self.last_speech_frame = frame
+            else:
+                self._voiced_run = 0
+                self._silent_run += 1
+                if not self.in_speech:
+                    # Only adapt on background audio so speech never raises the floor
+                    self.noise_floor += self.adapt_rate * (value - self.noise_floor)
+                elif self._silent_run >= self.hangover_frames:
+                    self.in_speech = False
+                    self.ended = True
+                    return True
+        return False
+
+    def speech_bounds(self, padding_ms=150):
+        """Sample range [start, end) of detected speech relative to the first processed sample"""
+        if not self.speech_detected:
+            return None
+        pad = int(self.sample_rate * padding_ms / 1000)
+        start = max(0, self.speech_start_frame * self.frame_size - pad)
+        end = min(self.frames_seen * self.frame_size, (self.last_speech_frame + 1) * self.frame_size + pad)
+        return start, end
+
+    def _frame_rms(self, audio):
+        count = len(audio) // self.frame_size
+        if count == 0:
+            return np.zeros(0, dtype=np.float32)
+        frames = audio[:count * self.frame_size].reshape(count, self.frame_size)
+        return np.sqrt(np.mean(frames * frames, axis=1))
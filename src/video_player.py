@@ -1,8 +1,13 @@
 # video_player.py - Core video playback functionality
 import os
 import sys
+from collections import namedtuple
 import vlc
-from PyQt6.QtCore import QTimer, pyqtSignal, QObject
+from PyQt6.QtCore import pyqtSignal, QObject
+import vlc_profiles
+from playback_clock import PlaybackClock
+from seek_scheduler import SeekScheduler
+from watch_history import WatchHistory
 
 # Configure VLC path for Windows
 if sys.platform.startswith('win'):
@@ -25,50 +30,295 @@ if sys.platform.startswith('win'):
         print("Warning: VLC installation not found in common locations")
 
 
+# Playback states, emitted through VideoPlayer.state_changed
+EMPTY = "empty"       # No media loaded
+LOADING = "loading"   # Media handed to libvlc, not playing yet
+READY = "ready"       # Media loaded and stopped; play() starts it without re-creating it
+PLAYING = "playing"
+PAUSED = "paused"
+ENDED = "ended"
+ERROR = "error"
+
+TRANSITIONS = {
+    EMPTY: {LOADING},
+    LOADING: {READY, PLAYING, PAUSED, ERROR, EMPTY},
+    READY: {LOADING, PLAYING, EMPTY},
+    PLAYING: {LOADING, READY, PAUSED, ENDED, ERROR},
+    PAUSED: {LOADING, READY, PLAYING, ENDED, ERROR},
+    ENDED: {LOADING, READY, PLAYING},
+    ERROR: {LOADING, EMPTY},
+}
+
+# A second player holding the next file open and paused, ready to take over
+Standby = namedtuple("Standby", "path player media")
+
+# PlaybackClock's libvlc state names -> player states
+VLC_STATES = {
+    "opening": LOADING,
+    "playing": PLAYING,
+    "paused": PAUSED,
+    "stopped": READY,
+    "ended": ENDED,
+    "error": ERROR,
+}
+
+
 class VideoPlayer(QObject):
     """Core video player functionality using VLC"""
     position_changed = pyqtSignal(int)
     duration_changed = pyqtSignal(int)
     state_changed = pyqtSignal(str)
+    output_swapped = pyqtSignal(object)  # Window id the (new) active player renders into
     
-    def __init__(self):
+    def __init__(self, history=None, profile=None):
         super().__init__()
-        self.instance = vlc.Instance()
+        self.profile = profile or vlc_profiles.current_profile()
+        self.instance = self._create_instance(self.profile)
         self.media_player = self.instance.media_player_new()
-        self.timer = QTimer()
-        self.timer.timeout.connect(self.update_ui)
+        self.window_id = None
+        self.standby_window_id = None  # Where a prefetched next file waits; None disables prefetching
+        self._standby = None           # At most one Standby at a time
+        self.state = EMPTY
+        self.media = None          # Kept after loading so pausing/resuming and reopening never re-create it
+        self.loaded_path = None
+        self.current_path = None   # File whose resume point the clock is updating
+        self._opening_path = None  # Becomes current_path once libvlc has switched to it
+        self.volume = 50
+        self.media_options = []    # Per-media overrides of the open file, reapplied on profile switches
+        # Event-driven time/length/state shared by every view - no polling
+        self.clock = PlaybackClock(self.media_player, self)
+        self.clock.position_changed.connect(self.position_changed)
+        self.clock.duration_changed.connect(self.duration_changed)
+        self.clock.state_changed.connect(self._on_vlc_state)
+        # Slider drags and voice jumps go through here, so libvlc gets one seek at a time
+        self.seeker = SeekScheduler(self, parent=self)
+        # Resume points: updated in memory on every tick, written to disk in batches
+        self.history = history if history is not None else WatchHistory()
+        self.clock.time_changed.connect(self._remember_position)
+        self.clock.state_changed.connect(self._remember_state)
         
-    def load_video(self, file_path):
-        """Load and start playing a video file"""
+    @staticmethod
+    def _create_instance(profile):
+        args = vlc_profiles.instance_args(profile)
+        instance = vlc.Instance(args)
+        if instance is None:
+            # libvlc refuses unknown arguments (e.g. a typo in the config) - still give the user a player
+            print(f"Warning: libvlc rejected profile '{profile}' arguments {args}; using defaults")
+            instance = vlc.Instance()
+        return instance
+
+    @staticmethod
+    def _apply_window(media_player, window_id):
+        if sys.platform.startswith('win'):
+            media_player.set_hwnd(window_id)
+
+    def set_window(self, window_id):
+        """Render into this native window (kept across profile switches)"""
+        self.window_id = window_id
+        self._apply_window(self.media_player, window_id)
+
+    def set_standby_window(self, window_id):
+        """Second native window for a prefetched next file (None turns prefetching off)
+
+        Only wired up where the player renders into our own windows (Windows);
+        elsewhere libvlc would open a window of its own for the standby player.
+        """
+        self.release_standby()
+        self.standby_window_id = window_id if sys.platform.startswith('win') else None
+
+    def load_video(self, file_path, options=()):
+        """Load and start playing a video file, from where it was left last time
+
+        `options` are extra libvlc media options for this file only.
+        Returns the watch-history entry playback resumed from, or None.
+        """
+        if file_path == self.loaded_path and list(options) == self.media_options and self.state != ERROR:
+            # Same file: resume the loaded Media, or replay it from where it was left
+            if self.state in (READY, ENDED):
+                return self._replay()
+            self.play()
+            return None
+        resume = self.history.resume_point(file_path)
+        if resume is not None:
+            self.set_rate(resume.rate)
+            self.volume = resume.volume
+        self._open(file_path, resume.position_ms if resume is not None else 0, options)
+        return resume
+
+    def _new_media(self, file_path, start_ms=0, options=(), paused=False):
         media = self.instance.media_new(file_path)
+        for option in vlc_profiles.media_options(self.profile, file_path, options):
+            media.add_option(option)
+        if start_ms > 0:
+            # Seek as part of opening, so the first frame shown is already the resume point
+            media.add_option(f":start-time={start_ms / 1000:.3f}")
+        if paused:
+            media.add_option(":start-paused")
+        return media
+
+    def _open(self, file_path, start_ms=0, options=(), paused=False):
+        self.seeker.cancel()  # A drag target for the previous file means nothing here
+        media = self._new_media(file_path, start_ms, options, paused)
+        self.media = media
+        self.loaded_path = file_path
+        self.media_options = list(options)
+        # Ticks from the previous file may still be queued - don't file them under this one
+        self.current_path = None
+        self._opening_path = file_path
+        self._set_state(LOADING)
         self.media_player.set_media(media)
         self.media_player.play()
-        self.timer.start(100)  # Update UI every 100ms
         # Ensure volume is applied after media starts
-        current_volume = self.media_player.audio_get_volume()
-        if current_volume != -1:
-            self.media_player.audio_set_volume(current_volume)
+        self.media_player.audio_set_volume(self.volume)
+
+    @property
+    def can_prefetch(self):
+        return self.standby_window_id is not None
+
+    def prepare_standby(self, file_path):
+        """Open file_path paused on a second player from the same Instance, so it can take over without a gap"""
+        if not self.can_prefetch:
+            return False
+        if self._standby is not None:
+            if self._standby.path == file_path:
+                return True
+            self.release_standby()  # Never more than one standby item
+        resume = self.history.resume_point(file_path)
+        player = self.instance.media_player_new()
+        self._apply_window(player, self.standby_window_id)
+        media = self._new_media(file_path, resume.position_ms if resume is not None else 0, paused=True)
+        player.set_media(media)
+        player.play()  # Opens, demuxes and decodes the first frame, then holds it
+        self._standby = Standby(file_path, player, media)
+        return True
+
+    def release_standby(self):
+        if self._standby is not None:
+            self._standby.player.stop()
+            self._standby.player.release()
+            self._standby = None
+
+    def swap_to_standby(self, file_path):
+        """Continue with the prefetched file_path; False if it was not prefetched"""
+        standby = self._standby
+        if standby is None or standby.path != file_path:
+            return False
+        self._standby = None
+        previous, rate = self.media_player, self.media_player.get_rate()
+        self.seeker.cancel()
+        self.clock.detach()
+
+        self.media_player, self.media = standby.player, standby.media
+        self.loaded_path, self.media_options = file_path, []
+        self.window_id, self.standby_window_id = self.standby_window_id, self.window_id
+        # Its "opening" event went by before the clock followed it
+        self.current_path, self._opening_path = file_path, None
+        self.clock.attach(self.media_player)
+        self.clock.sync()
+        self._set_state(LOADING)
+        self.media_player.set_rate(rate)
+        self.media_player.audio_set_volume(self.volume)
+        self.media_player.set_pause(0)
+        self.output_swapped.emit(self.window_id)
+
+        previous.stop()
+        previous.release()
+        return True
+
+    def _replay(self):
+        """Start the loaded media again, from its resume point if it has one"""
+        resume = self.history.resume_point(self.loaded_path)
+        self._restart(resume.position_ms if resume is not None else 0)
+        return resume
+
+    def _restart(self, start_ms=0):
+        """Play the loaded file again from start_ms (after it ended or was stopped)"""
+        self.seeker.cancel()
+        # Media options only accumulate, so the new start point goes on a fresh Media
+        # built from the same file and options rather than onto the one it was opened with
+        self.media = self._new_media(self.loaded_path, start_ms, self.media_options)
+        if self.state == ENDED:
+            self.media_player.stop()  # libvlc keeps the finished input around until stopped
+        self.current_path = None
+        self._opening_path = self.loaded_path
+        self._set_state(LOADING)
+        self.media_player.set_media(self.media)
+        self.media_player.play()
+        self.media_player.audio_set_volume(self.volume)
+
+    def _set_state(self, state):
+        if state == self.state:
+            return
+        if state not in TRANSITIONS[self.state]:
+            return  # Stale libvlc event from before the last load/restart
+        self.state = state
+        self.state_changed.emit(state)
+
+    def _on_vlc_state(self, vlc_state):
+        state = VLC_STATES[vlc_state]
+        if state == READY and (self.state == LOADING or self.media is None):
+            return  # The previous input stopping while the next one opens
+        self._set_state(state)
+
+    def set_profile(self, profile):
+        """Switch performance profile without restarting: new Instance and player, same file and position"""
+        if profile == self.profile:
+            return
+        path = self.loaded_path
+        time_ms, was_playing, rate = self.clock.time_ms, self.state == PLAYING, self.clock.rate
+
+        self.release_standby()  # Belongs to the Instance that is about to go
+        self.clock.detach()
+        self.media_player.stop()
+        self.media_player.release()
+        self.instance.release()
+
+        self.profile = profile
+        self.media = None
+        self.instance = self._create_instance(profile)
+        self.media_player = self.instance.media_player_new()
+        self.clock.attach(self.media_player)
+        if self.window_id is not None:
+            self.set_window(self.window_id)
+        self.media_player.set_rate(rate)
+        if path is not None:
+            self._open(path, time_ms, self.media_options, paused=not was_playing)
+        print(f"Playback profile: {profile}")
         
     def play(self):
-        """Start or resume video playback"""
-        self.media_player.play()
+        """Start or resume playback of the loaded media"""
+        if self.state == PAUSED:
+            self.media_player.set_pause(0)
+        elif self.state in (READY, ENDED):
+            self._replay()
         
     def pause(self):
         """Pause video playback"""
-        self.media_player.pause()
+        if self.state == PLAYING:
+            self.media_player.set_pause(1)  # pause() would toggle - resuming when already paused
         
     def stop(self):
-        """Stop video playback"""
+        """Stop video playback (the media stays loaded)"""
         self.media_player.stop()
         
     def set_position(self, position):
         """Set playback position (0-1000)"""
         self.media_player.set_position(position / 1000.0)
+        if self.clock.duration_ms > 0:
+            self.clock.seek_hint(position * self.clock.duration_ms // 1000)
+            self._remember_position(self.clock.time_ms)
+
+    def set_time(self, time_ms):
+        """Jump to an absolute time in milliseconds"""
+        self.media_player.set_time(int(time_ms))
+        self.clock.seek_hint(time_ms)
+        self._remember_position(self.clock.time_ms)
         
     def set_volume(self, volume):
         """Set playback volume (0-100)"""
         # Ensure volume is within valid range
         volume = max(0, min(100, int(volume)))
+        self.volume = volume
         result = self.media_player.audio_set_volume(volume)
         if result == -1:
             print(f"Warning: Failed to set volume to {volume}")
@@ -78,13 +328,31 @@ class VideoPlayer(QObject):
     def set_rate(self, rate):
         """Set playback speed (0.5 = half speed, 2.0 = double speed)"""
         self.media_player.set_rate(rate)
+        self.clock.set_rate(rate)
     
     def get_rate(self):
         """Get current playback speed"""
         return self.media_player.get_rate()
-        
-    def update_ui(self):
-        """Update UI with current playback position"""
-        if self.media_player.is_playing():
-            position = int(self.media_player.get_position() * 1000)
-            self.position_changed.emit(position)
\ No newline at end of file
+
+    def _remember_position(self, time_ms):
+        """Clock tick or seek: keep the resume point current (a dict update, no disk I/O)"""
+        # The clock also rewinds to 0 when playback stops - that is not a position to resume from
+        if self.current_path is not None and time_ms > 0:
+            self.history.record(self.current_path, time_ms, self.clock.duration_ms, self.clock.rate, self.volume)
+
+    def _remember_state(self, state):
+        if state == "opening" and self._opening_path is not None:
+            self.current_path, self._opening_path = self._opening_path, None
+        if self.current_path is None:
+            return
+        if state == "paused":
+            self.history.record(self.current_path, self.clock.time_ms, self.clock.duration_ms,
+                                self.clock.rate, self.volume)
+        elif state == "ended":
+            self.history.finish(self.current_path, self.clock.duration_ms, self.clock.rate, self.volume)
+
+    def close(self):
+        """Stop playback and write the last resume point"""
+        self.release_standby()
+        self.media_player.stop()
+        self.history.close()
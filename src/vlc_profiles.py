@@ -0,0 +1,90 @@
+# vlc_profiles.py - Named libvlc performance profiles and per-media option overrides
+"""
+A profile is a set of libvlc instance arguments (decoder, caching and
+frame-dropping settings, fixed when the Instance is created) plus media
+options (applied to every media_new). The "playback" config section
+picks the profile and can add more of both:
+
+    "playback": {
+        "profile": "low-cpu",
+        "instance_args": ["--avcodec-threads=4"],
+        "media_options": {"*.ts": [":avcodec-hw=none"], "http*://*": [":network-caching=3000"]}
+    }
+
+media_options keys are fnmatch patterns, tried against the full path
+and then the file name. Later options override earlier ones, so the
+order is profile, then matching patterns, then options passed by the
+caller.
+"""
+import fnmatch
+import os
+
+import app_config
+
+# Every profile: skip modules a Qt-embedded local player never uses, so Instance creation is quicker
+COMMON_ARGS = [
+    "--no-video-title-show",
+    "--no-stats",
+    "--no-media-library",
+    "--no-lua",
+]
+
+PROFILES = {
+    # libvlc's own defaults
+    "default": {
+        "instance": [],
+        "media": [],
+    },
+    # Short buffers and no clock smoothing, so seeks and starts respond quickly
+    "low-latency": {
+        "instance": ["--avcodec-hw=any", "--file-caching=100", "--network-caching=300",
+                     "--live-caching=100", "--clock-jitter=0", "--clock-synchro=0",
+                     "--drop-late-frames", "--skip-frames"],
+        "media": [":file-caching=100", ":network-caching=300"],
+    },
+    # Hardware decoding, cheaper software decoding and frame dropping when behind
+    "low-cpu": {
+        "instance": ["--avcodec-hw=any", "--avcodec-threads=2", "--avcodec-skiploopfilter=4",
+                     "--avcodec-fast", "--avcodec-hurry-up", "--drop-late-frames", "--skip-frames"],
+        "media": [],
+    },
+    # Never skip decoding work, deinterlace when needed, buffer generously
+    "high-quality": {
+        "instance": ["--avcodec-threads=0", "--avcodec-skiploopfilter=0", "--no-avcodec-hurry-up",
+                     "--no-drop-late-frames", "--no-skip-frames", "--deinterlace=-1",
+                     "--deinterlace-mode=yadif", "--file-caching=1000", "--network-caching=3000"],
+        "media": [":file-caching=1000", ":network-caching=3000"],
+    },
+}
+
+DEFAULT_PROFILE = "default"
+
+
+def profile_names():
+    return list(PROFILES)
+
+
+def current_profile():
+    """Profile named in the config, or the default if it is unknown"""
+    name = app_config.get_section("playback").get("profile", DEFAULT_PROFILE)
+    if name not in PROFILES:
+        print(f"Warning: Unknown playback profile '{name}', using '{DEFAULT_PROFILE}'")
+        return DEFAULT_PROFILE
+    return name
+
+
+def instance_args(profile):
+    """Arguments for vlc.Instance(): common, profile, then the user's extra arguments"""
+    extra = app_config.get_section("playback").get("instance_args", [])
+    return COMMON_ARGS + PROFILES[profile]["instance"] + list(extra)
+
+
+def media_options(profile, path, overrides=()):
+    """Options for one media: profile, then config patterns matching the path, then overrides"""
+    options = list(PROFILES[profile]["media"])
+    name = os.path.basename(path)
+    for pattern, pattern_options in app_config.get_section("playback").get("media_options", {}).items():
+        if fnmatch.fnmatch(path, pattern) or fnmatch.fnmatch(name, pattern):
+            options.extend(pattern_options)
+    options.extend(overrides)
+    return options
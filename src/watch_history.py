@@ -0,0 +1,145 @@
+# watch_history.py - Resume positions and watch history, persisted across sessions
+"""
+Every media file that has been played gets one row in a small SQLite
+database (WAL mode) with its last position, length, rate and volume.
+All rows are loaded into a dict at startup, so looking up the resume
+point while a file opens is one dictionary access.
+
+record() only updates that dict and marks the entry pending. It is
+cheap enough to call on every playback clock tick. A background thread
+writes pending entries in one transaction every FLUSH_SECONDS, and
+close() writes whatever is left. A crash loses at most the last few
+seconds of position, and WAL keeps the database itself consistent.
+
+    python src/watch_history.py           # list recently watched files
+    python src/watch_history.py --clear   # forget them all
+"""
+import os
+import sqlite3
+import sys
+import threading
+import time
+from collections import namedtuple
+
+import app_config
+
+HISTORY_FILE = "watch_history.sqlite3"
+FLUSH_SECONDS = 5.0
+MIN_RESUME_MS = 5000     # Closer to the start than this, just start over
+END_MARGIN_MS = 10000    # Stopped this close to the end counts as watched to the end
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS history (
+    path TEXT PRIMARY KEY,
+    position_ms INTEGER NOT NULL,
+    duration_ms INTEGER NOT NULL,
+    rate REAL NOT NULL,
+    volume INTEGER NOT NULL,
+    finished INTEGER NOT NULL,
+    updated_at REAL NOT NULL
+)
+"""
+
+Entry = namedtuple("Entry", "path position_ms duration_ms rate volume finished updated_at")
+
+
+def _key(path):
+    return os.path.normcase(os.path.abspath(path))
+
+
+class WatchHistory:
+    """Per-file playback state with in-memory lookups and batched background writes"""
+
+    def __init__(self, path=None, flush_seconds=FLUSH_SECONDS):
+        self.path = path or app_config.data_path(HISTORY_FILE)
+        self.flush_seconds = flush_seconds
+        self._lock = threading.Lock()     # Guards _entries/_pending; held only for dict updates
+        self._db_lock = threading.Lock()  # The connection, so record() never waits on disk I/O
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")  # Durable at checkpoints, never corrupt
+        self._db.execute(SCHEMA)
+        self._db.commit()
+        self._entries = {row[0]: Entry(*row) for row in self._db.execute("SELECT * FROM history")}
+        self._pending = set()
+        self._stop = threading.Event()
+        self._writer = threading.Thread(target=self._run, name="WatchHistoryWriter", daemon=True)
+        self._writer.start()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, path):
+        return self._entries.get(_key(path))
+
+    def resume_point(self, path):
+        """Entry to resume from, or None to start from the beginning"""
+        entry = self.get(path)
+        if entry is None or entry.finished or entry.position_ms < MIN_RESUME_MS:
+            return None
+        return entry
+
+    def record(self, path, position_ms, duration_ms, rate, volume):
+        """Remember the current playback state (written to disk by the next flush)"""
+        key = _key(path)
+        finished = duration_ms > 0 and position_ms >= duration_ms - END_MARGIN_MS
+        entry = Entry(key, int(position_ms), int(duration_ms), float(rate), int(volume), int(finished), time.time())
+        with self._lock:
+            self._entries[key] = entry
+            self._pending.add(key)
+
+    def finish(self, path, duration_ms, rate, volume):
+        """Playback reached the end - the next open starts from the beginning"""
+        self.record(path, duration_ms, duration_ms, rate, volume)
+
+    def recent(self, limit=20):
+        """Most recently watched entries first"""
+        with self._lock:
+            entries = list(self._entries.values())
+        return sorted(entries, key=lambda entry: entry.updated_at, reverse=True)[:limit]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._pending.clear()
+        with self._db_lock:
+            self._db.execute("DELETE FROM history")
+            self._db.commit()
+
+    def flush(self):
+        """Write pending entries in one transaction"""
+        with self._lock:
+            if not self._pending:
+                return
+            rows = [self._entries[key] for key in self._pending if key in self._entries]
+            self._pending.clear()
+        with self._db_lock:
+            try:
+                with self._db:
+                    self._db.executemany("INSERT OR REPLACE INTO history VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+            except sqlite3.Error as e:
+                print(f"⚠️  Could not save watch history: {e}")
+
+    def close(self):
+        self._stop.set()
+        self._writer.join()
+        self.flush()
+        with self._db_lock:
+            self._db.close()
+
+    def _run(self):
+        while not self._stop.wait(self.flush_seconds):
+            self.flush()
+
+
+if __name__ == "__main__":
+    history = WatchHistory()
+    if "--clear" in sys.argv[1:]:
+        history.clear()
+        print("🗑 Watch history cleared")
+    else:
+        for entry in history.recent(limit=len(history)):
+            state = "watched" if entry.finished else f"{entry.position_ms // 1000}s / {entry.duration_ms // 1000}s"
+            print(f"{time.strftime('%Y-%m-%d %H:%M', time.localtime(entry.updated_at))}  {state:>16}  {entry.path}")
+        print(f"{len(history)} file(s) in {history.path}")
+    history.close()
@@ -0,0 +1,368 @@
+"""
+Offline Voice Benchmark
+Feeds a labelled clip corpus through VoiceEngine and VoiceWorker with the
+microphone replaced by a fake input stream, and prints JSON metrics:
+per-stage latency percentiles, throughput, word error rate and
+command accuracy. No microphone or GUI is needed.
+
+    python tests/benchmark_voice.py [clips_dir] [--jobs 2] [--speed 1.0] [--output run.json]
+    python tests/benchmark_voice.py --capture-only   # no ASR model or Qt needed
+
+Clips are played into the fake stream at `--speed` times real time, with
+silence before and after, so VAD endpointing and streaming partials behave
+as they do live. Clips are spread across a pool of processes. Each process
+loads its own model, so per-clip latencies include contention between jobs.
+Compare runs with the same --jobs value.
+
+--capture-only stops after capture: it times VAD endpointing and checks
+that speech is found in every clip that has any, without loading a model.
+The shipped corpus is synthetic speech (see command_clips/README.md).
+"""
+import argparse
+import collections
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+import threading
+import time
+import types
+
+import numpy as np
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+sys.path.insert(0, SRC_DIR)
+
+DEFAULT_CLIPS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "command_clips")
+PERCENTILES = (50, 90, 99)
+NOISE_LEVEL = 1e-4      # Background hiss fed between clips so the VAD has a noise floor
+TRAILING_SECONDS = 3.0  # Capture limit beyond the clip length
+
+
+class FakeInputStream:
+    """Stands in for sd.InputStream: delivers queued clips, then silence, at a steady pace"""
+    current = None  # The stream the benchmark plays clips into (one per process)
+
+    def __init__(self, samplerate, channels, dtype, blocksize, callback, speed=1.0):
+        self.sample_rate = samplerate
+        self.block_size = blocksize
+        self.callback = callback
+        self.speed = speed
+        self.active = False
+        self._blocks = collections.deque()
+        self._played = threading.Event()
+        self.played_at = None
+        self._thread = None
+        self._rng = np.random.default_rng(0)
+        self._status = types.SimpleNamespace(input_overflow=False)
+        FakeInputStream.current = self
+
+    def start(self):
+        self.active = True
+        self._thread = threading.Thread(target=self._run, name="FakeInputStream", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self.active = False
+        if self._thread is not None:
+            self._thread.join()
+
+    def close(self):
+        pass
+
+    def play(self, audio):
+        """Queue a clip after whatever is still pending; played_at is set when it has been delivered"""
+        self._played.clear()
+        padded = np.pad(audio, (0, -len(audio) % self.block_size))
+        self._blocks.extend(padded.astype(np.float32).reshape(-1, self.block_size))
+        self._blocks.append(None)  # Marker: clip fully delivered
+
+    def wait_played(self, timeout=None):
+        self._played.wait(timeout)
+        return self.played_at
+
+    def _run(self):
+        interval = self.block_size / self.sample_rate / self.speed
+        next_tick = time.perf_counter()
+        while self.active:
+            self._mark_played()
+            if self._blocks:
+                block = self._blocks.popleft()
+            else:
+                block = (self._rng.standard_normal(self.block_size) * NOISE_LEVEL).astype(np.float32)
+            self.callback(block[:, None], self.block_size, None, self._status)
+            self._mark_played()
+            next_tick += interval
+            time.sleep(max(0.0, next_tick - time.perf_counter()))
+
+    def _mark_played(self):
+        if self._blocks and self._blocks[0] is None:
+            self._blocks.popleft()
+            self.played_at = time.perf_counter()
+            self._played.set()
+
+
+def install_fake_microphone(speed):
+    """Route MicrophoneStream through FakeInputStream, even where PortAudio is missing"""
+    try:
+        import sounddevice
+    except (ImportError, OSError):
+        sounddevice = types.ModuleType("sounddevice")
+        sys.modules["sounddevice"] = sounddevice
+    import audio_stream
+    audio_stream.sd.InputStream = lambda **kwargs: FakeInputStream(speed=speed, **kwargs)
+
+
+def word_errors(reference, hypothesis):
+    """Word-level edit distance between two normalized transcripts"""
+    ref, hyp = reference.split(), hypothesis.split()
+    row = list(range(len(hyp) + 1))
+    for i, ref_word in enumerate(ref, 1):
+        previous, row[0] = row[0], i
+        for j, hyp_word in enumerate(hyp, 1):
+            previous, row[j] = row[j], min(row[j] + 1, row[j - 1] + 1, previous + (ref_word != hyp_word))
+    return row[-1]
+
+
+# Per-process state, built once by _init_process
+_worker = None
+_engine = None      # Capture-only runs have no worker
+_clip_state = None  # Stage timings and marks for the clip being run
+
+
+def _timed(stage, function):
+    """Wrap a pipeline step so every call adds its duration to the current clip's stage"""
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        result = None
+        try:
+            result = function(*args, **kwargs)
+            return result
+        finally:
+            end = time.perf_counter()
+            name = "partial_asr" if kwargs.get("partial") else stage
+            _clip_state["timings"].setdefault(name, []).append((end - start) * 1000)
+            _clip_state[f"{name}_end"] = end
+            if name == "asr":
+                _clip_state["transcript"] = result
+    return wrapper
+
+
+def _init_process(asr_config, speed, partials, quick, capture_only=False):
+    """Build one VoiceEngine + VoiceWorker per process and load the model up front"""
+    global _worker, _engine
+    install_fake_microphone(speed)
+    from The_Audio_Engine import VoiceEngine
+    if capture_only:
+        _engine = VoiceEngine(asr_config)
+        _engine.capture = _timed("capture", _engine.capture)
+        return
+    from The_Worker_Thread import VoiceWorker
+    from command_templates import CommandTemplateClassifier
+
+    engine = VoiceEngine(asr_config)
+    worker = VoiceWorker(engine=engine)
+    worker.partial_results = partials
+    if not quick:
+        # Point the fast path at an empty store so the user's enrolled samples don't skew runs
+        worker.quick_commands = CommandTemplateClassifier(
+            path=os.path.join(tempfile.mkdtemp(), "none.npz"), sample_rate=engine.sample_rate)
+        worker.parser.learned = None  # Same for transcripts learned from confirmed commands
+    engine.load_model()
+    if engine.load_error is not None:
+        raise RuntimeError(f"ASR backend failed to load: {engine.load_error}")
+
+    engine.capture = _timed("capture", engine.capture)
+    engine.transcribe = _timed("asr", engine.transcribe)
+    worker.quick_commands.classify = _timed("quick", worker.quick_commands.classify)
+    worker.parser.parse = _timed("parse", worker.parser.parse)
+    _worker = worker
+
+
+def _capture_clip(clip):
+    """Play one clip into the fake microphone and only capture it (no ASR)"""
+    global _clip_state
+    from audio_stream import PRE_ROLL_SECONDS
+    from clip_corpus import read_wav
+
+    engine = _engine
+    stream = FakeInputStream.current
+    audio = read_wav(clip["path"], engine.sample_rate)
+    duration = len(audio) / engine.sample_rate
+    _clip_state = state = {"timings": {}}
+
+    time.sleep(PRE_ROLL_SECONDS / stream.speed)
+    stream.play(audio)
+    speech = engine.capture(max_duration=duration + TRAILING_SECONDS, pre_roll=PRE_ROLL_SECONDS)
+    finished = time.perf_counter()
+    audio_end = stream.wait_played(timeout=1.0) or finished
+
+    stages = {name: round(sum(values), 2) for name, values in state["timings"].items()}
+    stages["endpoint"] = round((state["capture_end"] - audio_end) * 1000, 2)
+    return {
+        "name": clip["name"],
+        "duration_s": round(duration, 3),
+        "reference": clip["text"],
+        "speech_s": round(len(speech) / engine.sample_rate, 3),
+        "stages_ms": stages,
+    }
+
+
+def _run_clip(clip):
+    """Play one clip into the fake microphone and run a full VoiceWorker pass over it"""
+    global _clip_state
+    from audio_stream import PRE_ROLL_SECONDS
+    from clip_corpus import read_wav
+    from The_Worker_Thread import VoiceJob
+
+    worker = _worker
+    stream = FakeInputStream.current
+    audio = read_wav(clip["path"], worker.engine.sample_rate)
+    duration = len(audio) / worker.engine.sample_rate
+    _clip_state = state = {"timings": {}, "transcript": None}
+
+    commands, command_times = [], []
+    def on_command(command):
+        commands.extend(command if isinstance(command, list) else [command])
+        command_times.append(time.perf_counter())
+    worker.command_found.connect(on_command)
+
+    # Let a pre-roll worth of silence pass so the previous clip can't leak in
+    time.sleep(PRE_ROLL_SECONDS / stream.speed)
+    job = VoiceJob(max_duration=duration + TRAILING_SECONDS, pre_roll=PRE_ROLL_SECONDS)
+    stream.play(audio)
+    worker.process_job(job)  # Synchronously on this thread - no Qt event loop needed
+    finished = time.perf_counter()
+    audio_end = stream.wait_played(timeout=1.0) or finished
+
+    worker.command_found.disconnect()
+
+    # None when the quick-command path answered without a transcription
+    transcript = state["transcript"]
+    clean_text = worker.parser.normalize(transcript) if transcript is not None else None
+    timings = state["timings"]
+    stages = {name: round(sum(values), 2) for name, values in timings.items()}
+    stages["partial_decodes"] = len(timings.get("partial_asr", []))
+    if "capture_end" in state:
+        stages["endpoint"] = round((state["capture_end"] - audio_end) * 1000, 2)
+    stages["total_after_speech"] = round((finished - audio_end) * 1000, 2)
+    if command_times:
+        # Negative when a streaming partial fired before the speaker finished
+        stages["first_command"] = round((command_times[0] - audio_end) * 1000, 2)
+    return {
+        "name": clip["name"],
+        "duration_s": round(duration, 3),
+        "reference": clip["text"],
+        "transcript": clean_text,
+        "commands": commands,
+        "expected": clip["command"],
+        "stages_ms": stages,
+    }
+
+
+def summarize(results, wall_seconds, config):
+    from command_parser import CommandParser
+
+    parser = CommandParser()
+    audio_seconds = sum(r["duration_s"] for r in results)
+    throughput = {
+        "clips_per_s": round(len(results) / wall_seconds, 3),
+        "audio_s_per_s": round(audio_seconds / wall_seconds, 3),
+    }
+    stage_names = sorted({name for r in results for name in r["stages_ms"] if name != "partial_decodes"})
+    latency = {}
+    for name in stage_names:
+        values = [r["stages_ms"][name] for r in results if name in r["stages_ms"]]
+        latency[name] = {f"p{p}": round(float(np.percentile(values, p)), 1) for p in PERCENTILES}
+        latency[name]["mean"] = round(float(np.mean(values)), 1)
+
+    if config.get("capture_only"):
+        # Speech found exactly in the clips that have a reference text
+        missed = [r["name"] for r in results if (r["speech_s"] > 0) != bool(r["reference"])]
+        return {
+            "config": config,
+            "clips": len(results),
+            "wall_s": round(wall_seconds, 2),
+            "throughput": throughput,
+            "latency_ms": latency,
+            "speech_detection": round(1 - len(missed) / len(results), 4) if results else None,
+            "mismatches": missed,
+            "results": results,
+        }
+
+    errors = words = 0
+    for r in results:
+        if r["reference"] is not None and r["transcript"] is not None:
+            reference = parser.normalize(r["reference"])
+            errors += word_errors(reference, r["transcript"])
+            words += len(reference.split())
+
+    # A label's "command" is one command, a list for multi-command clips, or null
+    expected_commands = lambda r: (r["expected"] if isinstance(r["expected"], list)
+                                   else [] if r["expected"] is None else [r["expected"]])
+    correct = sum(1 for r in results if r["commands"] == expected_commands(r))
+    return {
+        "config": config,
+        "clips": len(results),
+        "wall_s": round(wall_seconds, 2),
+        "throughput": throughput,
+        "latency_ms": latency,
+        "word_error_rate": round(errors / words, 4) if words else None,
+        "command_accuracy": round(correct / len(results), 4) if results else None,
+        "mismatches": [{"name": r["name"], "expected": r["expected"], "got": r["commands"],
+                        "transcript": r["transcript"]}
+                       for r in results if r["commands"] != expected_commands(r)],
+        "results": results,
+    }
+
+
+def run_benchmark(clips_dir=DEFAULT_CLIPS_DIR, jobs=1, speed=1.0, partials=True, quick=False, asr_config=None,
+                  capture_only=False):
+    import app_config
+    from clip_corpus import load_corpus
+
+    clips = load_corpus(clips_dir)
+    if not clips:
+        raise SystemExit(f"❌ No clips found in {clips_dir} - see command_clips/README.md to regenerate them")
+
+    asr_config = dict(asr_config or app_config.get_section("asr"))
+    asr_config["worker_process"] = False  # The pool already isolates each engine
+    if not asr_config.get("num_threads"):
+        asr_config["num_threads"] = max(1, (os.cpu_count() or 1) // jobs)
+
+    context = multiprocessing.get_context("spawn")
+    start = time.perf_counter()
+    initargs = (asr_config, speed, partials, quick, capture_only)
+    with context.Pool(jobs, initializer=_init_process, initargs=initargs) as pool:
+        run = _capture_clip if capture_only else _run_clip
+        results = sorted(pool.imap_unordered(run, clips), key=lambda r: r["name"])
+    wall_seconds = time.perf_counter() - start
+
+    config = dict(asr_config, jobs=jobs, speed=speed, partials=partials, quick=quick, capture_only=capture_only)
+    return summarize(results, wall_seconds, config)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline voice pipeline benchmark")
+    parser.add_argument("clips_dir", nargs="?", default=DEFAULT_CLIPS_DIR)
+    parser.add_argument("--jobs", type=int, default=1, help="Parallel processes (each loads a model)")
+    parser.add_argument("--speed", type=float, default=1.0, help="Playback speed relative to real time")
+    parser.add_argument("--no-partials", action="store_true", help="Only decode once speech has ended")
+    parser.add_argument("--quick", action="store_true", help="Use the enrolled quick-command samples and learned phrases")
+    parser.add_argument("--capture-only", action="store_true",
+                        help="Only time capture and VAD endpointing - no ASR model needed")
+    parser.add_argument("--output", help="Also write the JSON report to this file")
+    args = parser.parse_args()
+
+    report = run_benchmark(args.clips_dir, jobs=args.jobs, speed=args.speed,
+                           partials=not args.no_partials, quick=args.quick, capture_only=args.capture_only)
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Command Clip Generator
+Synthesises the clips listed in labels.json (and the autotuner's
+reference clip) with the eSpeak NG speech synthesiser, so the accuracy
+check, the benchmark and the autotuner run on a clean checkout.
+
+    pip install espeakng-loader        # bundles libespeak-ng and its voice data
+    python tests/command_clips/generate_clips.py
+
+The output is deterministic for a given eSpeak NG version: 16 kHz mono
+16-bit WAV, the phrase padded with REST_SECONDS of silence on both sides.
+The clip with no text is quiet seeded noise. Synthetic speech is cleaner
+than a real voice; recordings of your own voice can replace any clip
+under the same name.
+"""
+import ctypes
+import json
+import os
+import sys
+import wave
+
+import numpy as np
+
+CLIPS_DIR = os.path.dirname(os.path.abspath(__file__))
+ASSETS_DIR = os.path.join(CLIPS_DIR, "..", "..", "assets")
+REFERENCE_CLIP = ("reference_command.wav", "go to 10 minutes")  # What autotune.py expects
+SAMPLE_RATE = 16000
+REST_SECONDS = 0.3
+VOICE = b"en-us"
+SPEED_WPM = 150
+
+AUDIO_OUTPUT_SYNCHRONOUS = 2
+POS_CHARACTER = 1
+CHARS_UTF8 = 1
+SYNTH_CALLBACK = ctypes.CFUNCTYPE(ctypes.c_int, ctypes.POINTER(ctypes.c_short), ctypes.c_int, ctypes.c_void_p)
+RATE_PARAMETER = 1
+
+
+class Synthesizer:
+    """Minimal ctypes binding: text in, float32 samples at the engine's native rate out"""
+
+    def __init__(self):
+        import espeakng_loader
+
+        self.lib = ctypes.CDLL(espeakng_loader.get_library_path())
+        data_parent = os.path.dirname(espeakng_loader.get_data_path())
+        self.sample_rate = self.lib.espeak_Initialize(AUDIO_OUTPUT_SYNCHRONOUS, 0, data_parent.encode(), 0)
+        if self.sample_rate <= 0:
+            raise RuntimeError("eSpeak NG failed to initialise")
+        self.lib.espeak_SetVoiceByName(VOICE)
+        self.lib.espeak_SetParameter(RATE_PARAMETER, SPEED_WPM, 0)
+        self._chunks = []
+        self._callback = SYNTH_CALLBACK(self._collect)  # Kept referenced for the library's lifetime
+        self.lib.espeak_SetSynthCallback(self._callback)
+
+    def _collect(self, wav, count, events):
+        if count > 0:
+            self._chunks.append(np.ctypeslib.as_array(wav, shape=(count,)).copy())
+        return 0
+
+    def speak(self, text):
+        self._chunks = []
+        encoded = text.encode("utf-8") + b"\0"
+        self.lib.espeak_Synth(encoded, len(encoded), 0, POS_CHARACTER, 0, CHARS_UTF8, None, None)
+        self.lib.espeak_Synchronize()
+        if not self._chunks:
+            return np.zeros(0, dtype=np.float32)
+        return np.concatenate(self._chunks).astype(np.float32) / 32768.0
+
+
+def resample(audio, rate, target=SAMPLE_RATE):
+    if rate == target or not len(audio):
+        return audio
+    positions = np.arange(int(len(audio) * target / rate)) * (rate / target)
+    return np.interp(positions, np.arange(len(audio)), audio).astype(np.float32)
+
+
+def render(synth, text, seed):
+    rest = np.zeros(int(REST_SECONDS * SAMPLE_RATE), dtype=np.float32)
+    if not text:
+        noise = np.random.default_rng(seed).normal(0.0, 1e-3, int(1.5 * SAMPLE_RATE))
+        return noise.astype(np.float32)
+    speech = resample(synth.speak(text), synth.sample_rate)
+    return np.concatenate((rest, speech, rest))
+
+
+def write_wav(path, audio):
+    pcm = (np.clip(audio, -1.0, 1.0) * 32767).astype("<i2")
+    with wave.open(path, "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(SAMPLE_RATE)
+        f.writeframes(pcm.tobytes())
+
+
+def main():
+    with open(os.path.join(CLIPS_DIR, "labels.json"), "r", encoding="utf-8") as f:
+        labels = json.load(f)
+    synth = Synthesizer()
+    targets = [(os.path.join(CLIPS_DIR, name), label.get("text", "")) for name, label in sorted(labels.items())]
+    targets.append((os.path.join(ASSETS_DIR, REFERENCE_CLIP[0]), REFERENCE_CLIP[1]))
+    for seed, (path, text) in enumerate(targets):
+        audio = render(synth, text, seed)
+        write_wav(path, audio)
+        print(f"🔊 {os.path.relpath(path)}: {text or '(silence)'} - {len(audio) / SAMPLE_RATE:.2f} s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
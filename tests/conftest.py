@@ -0,0 +1,8 @@
+# conftest.py - Lets pytest import the app modules from src/
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+# Interactive hardware check, not a test - it records from the microphone at import time
+collect_ignore = ["test_microphone.py"]
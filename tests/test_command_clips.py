@@ -0,0 +1,45 @@
+"""
+Checks the shipped command clip corpus (tests/command_clips)
+
+Every clip in labels.json must exist as a 16 kHz mono WAV with speech in
+it, and its reference text must resolve to its labelled command, so an
+accuracy or benchmark run measures the ASR and not a broken label.
+
+    python -m pytest tests/test_command_clips.py
+"""
+import json
+import os
+import wave
+
+import numpy as np
+import pytest
+
+from command_parser import CommandParser
+
+CLIPS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "command_clips")
+
+with open(os.path.join(CLIPS_DIR, "labels.json"), "r", encoding="utf-8") as f:
+    LABELS = json.load(f)
+
+
+def read_pcm(path):
+    with wave.open(path, "rb") as f:
+        assert (f.getnchannels(), f.getsampwidth(), f.getframerate()) == (1, 2, 16000)
+        return np.frombuffer(f.readframes(f.getnframes()), dtype="<i2").astype(np.float32) / 32768.0
+
+
+@pytest.mark.parametrize("name, label", sorted(LABELS.items()))
+def test_clip_has_audio(name, label):
+    audio = read_pcm(os.path.join(CLIPS_DIR, name))
+    level = float(np.sqrt(np.mean(audio ** 2)))
+    if label["text"]:
+        assert level > 0.01
+    else:
+        assert level < 0.005
+
+
+@pytest.mark.parametrize("name, label", sorted(LABELS.items()))
+def test_label_matches_parser(name, label):
+    parser = CommandParser(phrase_cutoff=0.5, word_cutoff=0.75)
+    commands = parser.parse_all(parser.normalize(label["text"]))
+    assert (commands[0] if len(commands) == 1 else (commands or None)) == label["command"]
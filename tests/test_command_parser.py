@@ -0,0 +1,68 @@
+"""
+Regression tests for CommandParser
+
+The fuzzy strategies must give what the original difflib matcher gave,
+and parse_all() must only split an utterance into several commands when
+every part is a command on its own.
+
+    python -m pytest tests/test_command_parser.py
+"""
+import pytest
+
+from command_parser import CommandParser
+
+# parse() results at the default cutoffs (0.5 / 0.75); None = no command
+PARSE_CASES = {
+    "what time is it": None,   # "what" / "wait" is exactly 0.75, not above it
+    "thank you": None,
+    "stop": "slower",          # "slow" and "fast" tie at 0.5; difflib keeps the later one
+    "down": "volume down",
+    "second": None,
+    "seconds": None,
+    "them": None,
+    "fine": None,
+    "ensure": None,
+    "hello": None,
+    "yes": None,
+    "next": None,
+    "okay": "play",
+    "no": "normal",
+    "loud": "volume up",
+    "quit": "mute",
+    "resumed": "play",
+    "slowly": "slower",
+    "mutes": "mute",
+    "paused": "pause",
+    "hold on": "pause",
+    "go to 1 hour and 30 minutes": {"time_ms": 5400000},
+    "jump to 2 minutes and 15 seconds": {"time_ms": 135000},
+    "skip to 2:30": {"time_ms": 150000},
+    "volume 50 percent": {"volume_percent": 50},
+    "set volume to 75": {"volume_percent": 75},
+}
+
+PARSE_ALL_CASES = {
+    "go to 1 hour and 30 minutes": [{"time_ms": 5400000}],
+    "jump to 2 minutes and 15 seconds": [{"time_ms": 135000}],
+    "rock and roll": [],
+    "pause and volume 40": ["pause", {"volume_percent": 40}],
+    "go to 10 minutes and volume 40": [{"time_ms": 600000}, {"volume_percent": 40}],
+    "go to 1 hour and 30 minutes and pause": [{"time_ms": 5400000}, "pause"],
+    "play and then faster": ["play", "faster"],
+}
+
+
+@pytest.fixture(scope="module")
+def parser():
+    return CommandParser(phrase_cutoff=0.5, word_cutoff=0.75)
+
+
+@pytest.mark.parametrize("text, expected", PARSE_CASES.items())
+def test_parse(parser, text, expected):
+    assert parser.parse(text) == expected
+
+
+@pytest.mark.parametrize("text, expected", PARSE_ALL_CASES.items())
+def test_parse_all(parser, text, expected):
+    assert parser.parse_all(text) == expected
+